@@ -24,6 +24,13 @@ if config.config_file_name is not None:
 from backend.database import Base
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    """The search index is managed by hand-written DDL, so autogenerate leaves it alone."""
+    if type_ == "table":
+        return not name.startswith(("search_fts", "search_documents"))
+    return True
+
 # Use DATABASE_URL from environment if available, otherwise use alembic.ini
 database_url = os.environ.get(
     "DATABASE_URL",
@@ -50,6 +57,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -71,7 +79,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
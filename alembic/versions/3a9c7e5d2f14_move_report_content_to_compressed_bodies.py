@@ -0,0 +1,88 @@
+"""Move report content to a compressed report_bodies table
+
+Revision ID: 3a9c7e5d2f14
+Revises: 8e2d4b6c1a37
+Create Date: 2026-10-17 13:02:51.337420
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9c7e5d2f14'
+down_revision: Union[str, Sequence[str], None] = '8e2d4b6c1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+
+reports = sa.table('reports', sa.column('id', sa.Integer), sa.column('content', sa.Text))
+report_bodies = sa.table(
+    'report_bodies',
+    sa.column('report_id', sa.Integer),
+    sa.column('data', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+)
+
+
+def _body(report_id: int, content: str) -> dict:
+    raw = content.encode('utf-8')
+    return {'report_id': report_id, 'data': zlib.compress(raw, 6), 'size': len(raw)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('report_bodies',
+    sa.Column('report_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('report_id')
+    )
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # The data is already compressed; keep TOAST from trying again
+        op.execute('ALTER TABLE report_bodies ALTER COLUMN data SET STORAGE EXTERNAL')
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(reports.c.id, reports.c.content)
+            .where(reports.c.id > last_id, reports.c.content.isnot(None))
+            .order_by(reports.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(report_bodies.insert(), [_body(row.id, row.content) for row in rows])
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('content')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('reports', sa.Column('content', sa.Text(), nullable=True))
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(report_bodies.c.report_id, report_bodies.c.data)
+            .where(report_bodies.c.report_id > last_id)
+            .order_by(report_bodies.c.report_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            bind.execute(
+                reports.update().where(reports.c.id == row.report_id)
+                .values(content=zlib.decompress(row.data).decode('utf-8'))
+            )
+        last_id = rows[-1].report_id
+    op.drop_table('report_bodies')
@@ -0,0 +1,36 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: 5c1f0e7a9b21
+Revises: dd218e9b8804
+Create Date: 2026-10-17 10:12:44.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f0e7a9b21'
+down_revision: Union[str, Sequence[str], None] = 'dd218e9b8804'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reports_created_at_id', 'reports', ['created_at', 'id'], unique=False)
+    op.create_index('ix_hooks_created_at_id', 'hooks', ['created_at', 'id'], unique=False)
+    op.create_index('ix_project_folders_created_at_id', 'project_folders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_chat_sessions_folder_id_created_at', 'chat_sessions', ['folder_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_messages_session_id_created_at_id', 'chat_messages', ['session_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_messages_session_id_created_at_id', table_name='chat_messages')
+    op.drop_index('ix_chat_sessions_folder_id_created_at', table_name='chat_sessions')
+    op.drop_index('ix_project_folders_created_at_id', table_name='project_folders')
+    op.drop_index('ix_hooks_created_at_id', table_name='hooks')
+    op.drop_index('ix_reports_created_at_id', table_name='reports')
@@ -0,0 +1,31 @@
+"""Add rolling summary columns to chat sessions
+
+Revision ID: 8e2d4b6c1a37
+Revises: 5c1f0e7a9b21
+Create Date: 2026-10-17 11:03:27.904115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d4b6c1a37'
+down_revision: Union[str, Sequence[str], None] = '5c1f0e7a9b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_through_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chat_sessions') as batch_op:
+        batch_op.drop_column('summary_through_id')
+        batch_op.drop_column('summary')
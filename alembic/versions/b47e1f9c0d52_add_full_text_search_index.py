@@ -0,0 +1,121 @@
+"""Add full-text search index over reports, hooks and chat messages
+
+Revision ID: b47e1f9c0d52
+Revises: 3a9c7e5d2f14
+Create Date: 2026-10-17 13:48:12.660193
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b47e1f9c0d52'
+down_revision: Union[str, Sequence[str], None] = '3a9c7e5d2f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# The DDL as of this revision, kept here so later changes to backend.search_index cannot alter it
+CREATE = {
+    'postgresql': [
+        """
+        CREATE TABLE IF NOT EXISTS search_documents (
+            kind VARCHAR(16) NOT NULL,
+            ref_id INTEGER NOT NULL,
+            parent_id INTEGER,
+            title TEXT,
+            body TEXT NOT NULL,
+            tsv tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', body), 'B')
+            ) STORED,
+            PRIMARY KEY (kind, ref_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+    ],
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+            title, body, kind UNINDEXED, ref_id UNINDEXED, parent_id UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+        """,
+    ],
+}
+INSERT = {
+    'postgresql': (
+        "INSERT INTO search_documents (kind, ref_id, parent_id, title, body) "
+        "VALUES (:kind, :ref_id, :parent_id, :title, :body)"
+    ),
+    # SQLite rows are keyed by rowid = ref_id * 4 + kind code
+    'sqlite': (
+        "INSERT INTO search_fts (rowid, title, body, kind, ref_id, parent_id) "
+        "VALUES (:rowid, :title, :body, :kind, :ref_id, :parent_id)"
+    ),
+}
+TABLE_NAMES = {'postgresql': 'search_documents', 'sqlite': 'search_fts'}
+KIND_CODES = {'report': 1, 'hook': 2, 'message': 3}
+
+reports = sa.table('reports', sa.column('id', sa.Integer), sa.column('topic', sa.String))
+report_bodies = sa.table('report_bodies', sa.column('report_id', sa.Integer), sa.column('data', sa.LargeBinary))
+hooks = sa.table('hooks', sa.column('id', sa.Integer), sa.column('content', sa.Text))
+chat_messages = sa.table(
+    'chat_messages',
+    sa.column('id', sa.Integer),
+    sa.column('session_id', sa.Integer),
+    sa.column('content', sa.Text),
+)
+
+
+def _backfill(bind, kind, stmt, id_column, fields):
+    insert = sa.text(INSERT[bind.dialect.name])
+    last_id = 0
+    while True:
+        rows = bind.execute(stmt.where(id_column > last_id).order_by(id_column).limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        documents = []
+        for row in rows:
+            document = {'kind': kind, 'ref_id': row.id, 'rowid': row.id * 4 + KIND_CODES[kind],
+                        'title': None, 'parent_id': None}
+            document.update(fields(row))
+            document['body'] = document['body'] or ''
+            documents.append(document)
+        bind.execute(insert, documents)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name not in CREATE:
+        return
+    for statement in CREATE[bind.dialect.name]:
+        bind.execute(sa.text(statement))
+    _backfill(
+        bind, 'report',
+        sa.select(reports.c.id, reports.c.topic, report_bodies.c.data)
+        .join(report_bodies, report_bodies.c.report_id == reports.c.id),
+        reports.c.id,
+        lambda row: {'body': zlib.decompress(row.data).decode('utf-8'), 'title': row.topic},
+    )
+    _backfill(bind, 'hook', sa.select(hooks.c.id, hooks.c.content), hooks.c.id, lambda row: {'body': row.content})
+    _backfill(
+        bind, 'message',
+        sa.select(chat_messages.c.id, chat_messages.c.content, chat_messages.c.session_id),
+        chat_messages.c.id,
+        lambda row: {'body': row.content, 'parent_id': row.session_id},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name in TABLE_NAMES:
+        bind.execute(sa.text(f"DROP TABLE IF EXISTS {TABLE_NAMES[bind.dialect.name]}"))
@@ -0,0 +1,29 @@
+"""Add per-report LLM usage breakdown
+
+Revision ID: c81d5e2a7f36
+Revises: b47e1f9c0d52
+Create Date: 2026-10-17 15:21:40.318772
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d5e2a7f36'
+down_revision: Union[str, Sequence[str], None] = 'b47e1f9c0d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reports', sa.Column('llm_usage', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.drop_column('llm_usage')
@@ -1,7 +1,8 @@
 import os
+import time
+import asyncio
+import threading
 
-from docx import Document
-import httpx
 from bs4 import BeautifulSoup
 import json
 import re
@@ -9,19 +10,40 @@ import matplotlib
 matplotlib.use('Agg') 
 import matplotlib.pyplot as plt
 import pandas as pd
-import fitz 
 
 from .report_formats import get_template_instructions
 from .logging_config import setup_logging
+from . import http_client
+from . import search
+from . import report_events
+from . import blob_store
+from . import extraction
+from . import doc_index
+from . import section_context
+from . import pipeline_graph
+from . import llm_usage
+from . import model_router
+from .rate_limiter import limiter, reserve_tokens, retry_after
+from .cache import llm_cache, llm_cache_key
 
 logger = setup_logging("scholarforge.ai_engine")
 
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+LLM_TIMEOUT = 120.0
+
 SMART_MODEL = "google/gemini-2.0-flash-exp:free"
 BACKUP_MODEL = "nvidia/llama-3.1-nemotron-70b-instruct:free"
 
 SEARCH_RESULTS_COUNT = 10
 MAX_RESULTS_TO_SCRAPE = 4
 WORDS_PER_PAGE = 450
+# Max sections written at once. 1 restores the old one-by-one behaviour.
+SECTION_CONCURRENCY = int(os.environ.get("SECTION_CONCURRENCY", "4"))
+# Per-document extraction budget for report uploads
+REPORT_FILE_CHAR_LIMIT = 15000
+REPORT_FILE_MAX_PAGES = 26
+# Uploads are indexed for per-section retrieval up to this many characters each
+RETRIEVAL_FILE_CHAR_LIMIT = 400000
 
 def clean_ai_output(text: str) -> str:
     if not text: return ""
@@ -47,91 +69,120 @@ def clean_section_output(text: str, section_title: str) -> str:
         return "\n".join(lines[1:]).strip()
     return text.strip()
 
-def call_llm(target_model: str, system_prompt: str, user_prompt: str, temp: float = 0.4, attempt: int = 1) -> str:
-    current_model = target_model
-    if attempt == 2:
-        current_model = BACKUP_MODEL
-        logger.info(f"Model Switch: {current_model}")
-    elif attempt > 2:
-        return "Error: AI models unavailable."
-
-    try:
-        api_key = os.environ.get("OPENROUTER_API_KEY")
-        timeout = 120.0
-        
-        system_prompt += " Output raw Markdown only. No code blocks."
-
-        with httpx.Client(timeout=timeout) as client:
-            response = client.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}", 
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "http://localhost:5000",
-                    "X-Title": "ScholarForge"
-                },
-                json={
-                    "model": current_model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt}, 
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "temperature": temp,
-                    "max_tokens": 5000 
-                }
+def _llm_request(model: str, system_prompt: str, user_prompt: str, temp: float) -> tuple[dict, dict]:
+    """Headers and JSON body for one OpenRouter completion call."""
+    headers = {
+        "Authorization": f"Bearer {os.environ.get('OPENROUTER_API_KEY')}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:5000",
+        "X-Title": "ScholarForge"
+    }
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt + " Output raw Markdown only. No code blocks."},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": temp,
+        "max_tokens": 5000
+    }
+    return headers, payload
+
+async def call_llm_async(target_model: str, system_prompt: str, user_prompt: str, temp: float = 0.4, use_cache: bool = True) -> str:
+    """One completion from `target_model` (BACKUP_MODEL if it fails) on the pooled async client, cached."""
+    key = llm_cache_key(target_model, system_prompt, user_prompt, temp)
+    if use_cache:
+        cached = await llm_cache.aget(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit ({target_model})")
+            llm_usage.record_cache_hit(target_model)
+            return cached
+
+    result = "Error: AI models unavailable."
+    for current_model in model_router.router.order((target_model, BACKUP_MODEL), pin_first=True):
+        if not model_router.router.admit(current_model):
+            # A trial call is already probing this model's half-open circuit
+            continue
+        if current_model != target_model:
+            logger.info(f"Model Switch: {current_model}")
+        reserved = reserve_tokens(system_prompt, user_prompt, max_tokens=5000)
+        await limiter.acquire(current_model, reserved)
+        settled = False
+        started = time.perf_counter()
+        try:
+            headers, payload = _llm_request(current_model, system_prompt, user_prompt, temp)
+            response = await http_client.get_async_client(OPENROUTER_URL).post(
+                url=OPENROUTER_URL, headers=headers, json=payload, timeout=LLM_TIMEOUT
             )
             if response.status_code != 200:
                 logger.error(f"AI Error ({current_model}): {response.status_code}")
-                return call_llm(target_model, system_prompt, user_prompt, temp, attempt + 1)
-                
-            return clean_ai_output(response.json()['choices'][0]['message']['content'])
-    except Exception as e:
-        logger.error(f"Exception ({current_model}): {e}", exc_info=e)
-        return call_llm(target_model, system_prompt, user_prompt, temp, attempt + 1)
+                llm_usage.record_error(current_model, time.perf_counter() - started, response.status_code)
+                if response.status_code == 429:
+                    await limiter.apenalize(current_model, retry_after(response))
+                continue
+            body = response.json()
+            result = clean_ai_output(body['choices'][0]['message']['content'])
+            llm_usage.record_call(current_model, time.perf_counter() - started, body, requested=target_model)
+            settled = True
+            await limiter.asettle(current_model, reserved, body)
+            break
+        except Exception as e:
+            logger.error(f"Exception ({current_model}): {e}", exc_info=e)
+            llm_usage.record_error(current_model, time.perf_counter() - started, llm_usage.error_code(e))
+        finally:
+            if not settled:
+                await limiter.arefund(current_model, reserved)
+
+    if use_cache and result and not result.startswith("Error:"):
+        await llm_cache.aset(key, result)
+    return result
+
+
+def extract_documents(file_data_list: list, max_chars: int, max_pages: int = None) -> list:
+    """Extracts each uploaded file, returning (position, filename, text) for the ones that could be read."""
+    loaded = []
+    for idx, file_data in enumerate(file_data_list):
+        filename = file_data.get('filename', f'Document_{idx+1}')
+        try:
+            loaded.append((idx, filename, blob_store.read_file_data(file_data)))
+        except Exception as e:
+            logger.error(f"Error processing {filename}: {e}", exc_info=e)
+
+    results = extraction.extract_many(
+        [(filename, content) for _, filename, content in loaded], max_chars=max_chars, max_pages=max_pages
+    )
+    documents = []
+    for (idx, filename, _), doc_text in zip(loaded, results):
+        if isinstance(doc_text, extraction.UnsupportedFileType):
+            doc_text = ""
+        elif isinstance(doc_text, Exception):
+            logger.error(f"Error processing {filename}: {doc_text}", exc_info=doc_text)
+            continue
+        documents.append((idx, filename, doc_text))
+    return documents
+
+
+def format_documents(documents: list, per_document_chars: int = REPORT_FILE_CHAR_LIMIT) -> str:
+    combined_text = ["\n\n--- USER UPLOADED DOCUMENTS ---\n"]
+    for idx, filename, doc_text in documents:
+        combined_text.append(f"\n[Document {idx+1} - {filename}]:\n{doc_text[:per_document_chars]}\n")
+    combined_text.append("\n------------------------------\n")
+    return "".join(combined_text)
 
 
 def extract_text_from_files(file_data_list: list) -> str:
     """Feature: Extract text from MULTIPLE uploaded files (PDF, DOCX, TXT)"""
-    combined_text = "\n\n--- USER UPLOADED DOCUMENTS ---\n"
-    
     try:
-        for idx, file_data in enumerate(file_data_list):
-            filename = file_data.get('filename', f'Document_{idx+1}')
-            content = file_data.get('content')
-            doc_text = ""
-
-            try:
-                if filename.lower().endswith('.pdf'):
-                    with fitz.open(stream=content, filetype="pdf") as doc:
-                        for i, page in enumerate(doc):
-                            if i > 25:
-                                    break
-                            doc_text += page.get_text()
-                elif filename.lower().endswith('.docx'):
-                    from io import BytesIO
-                    # Document is already imported from docx at top level
-                    doc = Document(BytesIO(content))
-                    for para in doc.paragraphs:
-                        doc_text += para.text + "\n"
-                elif filename.lower().endswith('.txt') or filename.lower().endswith('.md'):
-                    doc_text = content.decode('utf-8', errors='ignore')
-                
-                combined_text += f"\n[Document {idx+1} - {filename}]:\n{doc_text[:15000]}\n"
-            except Exception as e:
-                logger.error(f"Error processing {filename}: {e}", exc_info=e)
-                continue
-        
-        combined_text += "\n------------------------------\n"
-        return combined_text
+        return format_documents(extract_documents(file_data_list, REPORT_FILE_CHAR_LIMIT, REPORT_FILE_MAX_PAGES))
     except Exception as e:
         logger.error(f"File Extraction Error: {e}", exc_info=e)
         return ""
 
+
 def _get_article_text(url: str) -> str:
     try:
         headers = {'User-Agent': 'Mozilla/5.0'}
-        with httpx.Client(timeout=10.0, follow_redirects=True) as client:
-            response = client.get(url, headers=headers)
+        response = http_client.get_client(url).get(url, headers=headers, timeout=10.0)
         if response.status_code != 200:
             return ""
         
@@ -146,63 +197,30 @@ def _get_article_text(url: str) -> str:
 
         return ""
 
-def get_search_results(query: str, max_results: int = SEARCH_RESULTS_COUNT) -> str:
-    """Feature: Structured Source Verification with Tavily"""
+def _format_search_results(results: list) -> str:
+    formatted_output = ["--- VERIFIED SOURCES ---\n"]
+    for i, result in enumerate(results[:MAX_RESULTS_TO_SCRAPE]):
+        link = result.get("url", "")
+        title = result.get('title', 'Unknown Title')
+        snippet = result.get("content", "")
+        # Tavily's content is used as the primary context; _get_article_text remains
+        # available for deeper scrapes if snippets prove too short.
+        formatted_output.append(f"SOURCE [{i+1}]\nTitle: {title}\nURL: {link}\nSummary: {snippet}\n\n")
+    return "".join(formatted_output)
+
+async def get_search_results_async(query: str, max_results: int = SEARCH_RESULTS_COUNT) -> str:
+    """Feature: Structured Source Verification with Tavily (cached, with in-flight deduplication)."""
     try:
-        api_key = os.environ.get("SERP_KEY")
-        if not api_key:
-            return "Error: SERP_KEY not set."
-        
-        logger.info(f"Searching Tavily for: {query}")
-        
-        url = "https://api.tavily.com/search"
-        payload = {
-            "api_key": api_key,
-            "query": query,
-            "search_depth": "basic",
-            "include_answer": False,
-            "include_images": False,
-            "include_item_list": False,
-            "max_results": 5
-        }
-        
         try:
-            with httpx.Client(timeout=15.0) as client:
-                response = client.post(url, json=payload)
-                
-            if response.status_code != 200:
-                return f"Tavily Search Error: {response.status_code} - {response.text}"
-                
-            results = response.json()
-            formatted_output = "--- VERIFIED SOURCES ---\n"
-            
-            if "results" in results:
-                for i, result in enumerate(results["results"]):
-                    if i >= MAX_RESULTS_TO_SCRAPE:
-                        break
-                    
-                    link = result.get("url", "")
-                    title = result.get('title', 'Unknown Title')
-                    snippet = result.get("content", "")
-                    
-                    full_content = ""
-                    # Optional: still try to scrape if Tavily's content is too short, 
-                    # but Tavily usually gives good context. 
-                    # We can retain the _get_article_text for deeper dives if needed,
-                    # but for now we'll trust Tavily's snippet/content as primary.
-                    
-                    formatted_output += f"SOURCE [{i+1}]\nTitle: {title}\nURL: {link}\nSummary: {snippet}{full_content}\n\n"
-                    
-            return formatted_output
-            
-        except Exception as http_err:
-            return f"Tavily Request Error: {http_err}"
-            
+            results = await search.tavily_search_async(query)
+        except search.SearchError as search_err:
+            return str(search_err)
+        return _format_search_results(results)
     except Exception as e:
         return f"Search Error: {e}"
 
 
-def recursive_gap_analysis(section_title: str, existing_summary: str, topic: str) -> str:
+async def recursive_gap_analysis_async(section_title: str, existing_summary: str, topic: str) -> str:
     """Feature: Recursive Research. Checks if we need more info."""
     logger.info(f"Analyzing gap for: {section_title}")
     prompt = (
@@ -213,16 +231,16 @@ def recursive_gap_analysis(section_title: str, existing_summary: str, topic: str
         "If YES, output 'PASS'.\n"
         "If NO, output a Google Search Query to find the missing specific info."
     )
-    decision = call_llm(SMART_MODEL, "You are a Research Director.", prompt, temp=0.1)
+    decision = await call_llm_async(SMART_MODEL, "You are a Research Director.", prompt, temp=0.1)
     
     if "PASS" in decision or len(decision) > 100:
         return "" 
     
     new_query = decision.strip().replace('"', '')
     logger.info(f"Recursive search triggered for: {new_query}")
-    return get_search_results(new_query, max_results=2)
+    return await get_search_results_async(new_query, max_results=2)
 
-def assess_search_need(query: str, existing_context: str) -> str:
+async def assess_search_need_async(query: str, existing_context: str) -> str:
     """Feature: Check if we actually need to search the web."""
     logger.debug(f"Assessing search need for: {query}")
     prompt = (
@@ -238,25 +256,25 @@ def assess_search_need(query: str, existing_context: str) -> str:
         "- If NO (we can skip search): Output 'SKIP_SEARCH'.\n"
         "- If YES (we need search): Output a specific, optimized Google Search Query."
     )
-    decision = call_llm(SMART_MODEL, "You are a Research Director.", prompt, temp=0.1)
+    decision = await call_llm_async(SMART_MODEL, "You are a Research Director.", prompt, temp=0.1)
     
     clean_decision = decision.strip().replace('"', '')
     if 'SKIP_SEARCH' in clean_decision:
         return 'SKIP_SEARCH'
     return clean_decision
 
-def generate_summary(search_content: str, topic: str, user_pdf_text: str = "") -> str:
+async def generate_summary_async(search_content: str, topic: str, user_pdf_text: str = "") -> str:
     context = search_content
     if user_pdf_text:
         context = user_pdf_text + "\n\n" + search_content
         
-    return call_llm(
+    return await call_llm_async(
         SMART_MODEL,
         "You are a Senior Research Analyst.",
         f"Topic: {topic}\n\nData:\n{context[:35000]}\n\nTask: Synthesize a master summary of key facts, numbers, and sources. Group them by themes.\nIMPORTANT: If the Data seems empty or insufficient, rely on your extensive INTERNAL KNOWLEDGE to generate the summary."
     )
 
-def generate_outline(topic: str, summary: str, format_type: str, target_pages: int) -> list:
+async def generate_outline_async(topic: str, summary: str, format_type: str, target_pages: int) -> list:
     format_data = get_template_instructions(format_type, target_pages)
     
     target_count = format_data['target_sections']
@@ -272,7 +290,7 @@ def generate_outline(topic: str, summary: str, format_type: str, target_pages: i
         "2. Return exactly the number of sections requested.\n"
         "Output: A JSON list of strings ONLY. Example: [\"1. The Awakening\", \"2. Market Forces\"]"
     )
-    content = call_llm(SMART_MODEL, "Return JSON only.", prompt, temp=0.3)
+    content = await call_llm_async(SMART_MODEL, "Return JSON only.", prompt, temp=0.3)
     match = re.search(r'\[.*\]', content.replace('\n', ' '), re.DOTALL)
     
     if match: 
@@ -281,8 +299,9 @@ def generate_outline(topic: str, summary: str, format_type: str, target_pages: i
         
     return ["1. Executive Overview", "2. Core Analysis", "3. Strategic Implications", "4. Conclusion"]
 
-def write_section(section_title: str, topic: str, summary: str, full_report_context: str, word_limit: int) -> str:
-    new_data = recursive_gap_analysis(section_title, summary, topic)
+async def write_section_async(section_title: str, topic: str, summary: str, full_report_context: str, word_limit: int) -> str:
+    with llm_usage.stage("gap_analysis"):
+        new_data = await recursive_gap_analysis_async(section_title, summary, topic)
     
     combined_data = summary
     if new_data:
@@ -302,10 +321,28 @@ def write_section(section_title: str, topic: str, summary: str, full_report_cont
         "7. REFERENCES: Do NOT output a 'References' list at the end of this section. Citations [x] are sufficient."
     )
     
-    content = call_llm(SMART_MODEL, "You are a Report Writer. Use Markdown Tables and Charts.", base_prompt, temp=0.4)
+    with llm_usage.stage("section"):
+        content = await call_llm_async(SMART_MODEL, "You are a Report Writer. Use Markdown Tables and Charts.", base_prompt, temp=0.4)
     return clean_section_output(content, section_title)
 
-def generate_chart_from_data(summary: str, topic: str) -> str:
+# pyplot keeps global state, so concurrent reports in one process render one chart at a time
+_chart_lock = threading.Lock()
+
+def _render_chart(chart_data: dict, filepath: str):
+    with _chart_lock:
+        df = pd.DataFrame(chart_data['data'])
+        fig, ax = plt.subplots(figsize=(10, 6))
+        plt.style.use('ggplot')
+        ax.bar(df['label'], df['value'], color='#4f46e5', alpha=0.8)
+        ax.set_title(chart_data.get('title', 'Analysis'), fontsize=14, pad=20)
+        ax.set_xlabel(chart_data.get('x_label', ''), fontsize=12)
+        ax.set_ylabel(chart_data.get('y_label', ''), fontsize=12)
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        fig.tight_layout()
+        fig.savefig(filepath, dpi=100)
+        plt.close(fig)
+
+async def generate_chart_from_data_async(summary: str, topic: str) -> str:
     try:
         chart_dir = os.path.join("static", "charts")
         if not os.path.exists(chart_dir): os.makedirs(chart_dir, exist_ok=True)
@@ -317,23 +354,13 @@ def generate_chart_from_data(summary: str, topic: str) -> str:
             f"Topic: {topic}\nContext: {summary[:3000]}\n"
             "Extract key numeric trends. Return JSON: {\"title\": \"...\", \"x_label\": \"...\", \"y_label\": \"...\", \"data\": [{\"label\": \"A\", \"value\": 10}]}"
         )
-        content = call_llm(SMART_MODEL, "Return JSON only.", prompt, temp=0.1)
+        content = await call_llm_async(SMART_MODEL, "Return JSON only.", prompt, temp=0.1)
         match = re.search(r'\{.*\}', content.replace('\n', ' '), re.DOTALL)
         if not match: return None
         chart_data = json.loads(match.group(0))
         if not chart_data or 'data' not in chart_data: return None
 
-        df = pd.DataFrame(chart_data['data'])
-        fig, ax = plt.subplots(figsize=(10, 6))
-        plt.style.use('ggplot')
-        ax.bar(df['label'], df['value'], color='#4f46e5', alpha=0.8)
-        ax.set_title(chart_data.get('title', 'Analysis'), fontsize=14, pad=20)
-        ax.set_xlabel(chart_data.get('x_label', ''), fontsize=12)
-        ax.set_ylabel(chart_data.get('y_label', ''), fontsize=12)
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
-        fig.tight_layout()
-        fig.savefig(filepath, dpi=100)
-        plt.close(fig)
+        await asyncio.to_thread(_render_chart, chart_data, filepath)
         return filepath
     except Exception:
 
@@ -341,76 +368,189 @@ def generate_chart_from_data(summary: str, topic: str) -> str:
 
 from . import council
 
-def run_ai_engine_with_return(query: str, user_format: str, page_count: int = 15, file_data_list: list = None, task=None, use_council: bool = False) -> tuple[str, str, str]: 
+async def _write_sections(outline: list, write_one, update_status, concurrency: int = None, on_section=None) -> list:
+    """
+    Runs write_one(section) for every outline entry, at most `concurrency` at a time,
+    returning the contents in outline order. A failing section is left empty.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency or SECTION_CONCURRENCY))
+    done = 0
+
+    async def _run(index: int, section: str) -> str:
+        nonlocal done
+        async with semaphore:
+            try:
+                content = await write_one(section)
+            except Exception as e:
+                logger.error(f"Section '{section}' failed: {e}", exc_info=e)
+                content = ""
+        done += 1
+        update_status(f"Step 6/7: Wrote Section {done}/{len(outline)}: {section}")
+        if on_section: on_section(index, section, content)
+        return content
+
+    return await asyncio.gather(*(_run(i, section) for i, section in enumerate(outline)))
+
+async def run_ai_engine_async(query: str, user_format: str, page_count: int = 15, file_data_list: list = None, task=None, use_council: bool = False, section_concurrency: int = None) -> tuple[str, str, str]:
+    """
+    The report pipeline on a single event loop, run as a task graph: uploads are indexed while
+    search and summary run, and once the summary exists the chart runs alongside the outline and
+    section writing. The critical path is reported per run.
+    """
+    events = report_events.ReportEventPublisher.for_task(task)
+    # Both writes go to Redis, so they run on the writer's thread; Celery's request context is
+    # per thread, hence the explicit task_id
+    writer = report_events.StatusWriter()
+    outline = []
+    documents = []
+
     def _update_status(message: str):
         logger.info(message) 
-        if task: task.update_state(state='PROGRESS', meta={'message': message})
+        if task: writer.submit(task.update_state, task_id=events.task_id, state='PROGRESS', meta={'message': message})
+        writer.submit(events, report_events.STATUS, {"message": message})
 
-    _update_status("Step 1/7: Processing Inputs...")
-    
-    user_pdf_text = ""
-    if file_data_list:
-        user_pdf_text = extract_text_from_files(file_data_list)
+    def _on_section(index: int, title: str, content: str):
+        writer.submit(events, report_events.SECTION, {"index": index, "total": len(outline), "title": title, "content": content})
+
+    async def _inputs() -> str:
+        nonlocal documents
+        _update_status("Step 1/7: Processing Inputs...")
+        if not file_data_list:
+            return ""
+        if doc_index.DOC_INDEX_ENABLED:
+            # One extraction serves both the summary prefix and the retrieval index
+            try:
+                documents = await asyncio.to_thread(extract_documents, file_data_list, RETRIEVAL_FILE_CHAR_LIMIT)
+                user_pdf_text = format_documents(documents)
+            except Exception as e:
+                logger.error(f"File Extraction Error: {e}", exc_info=e)
+                user_pdf_text = ""
+        else:
+            user_pdf_text = await asyncio.to_thread(extract_text_from_files, file_data_list)
         _update_status(f"    > Analyzed {len(file_data_list)} uploaded documents.")
+        return user_pdf_text
 
-    _update_status("Step 2/7: Checking Information Needs...")
-    
-    search_decision = assess_search_need(query, user_pdf_text)
-    
-    search_content = ""
-    if search_decision == 'SKIP_SEARCH':
-        _update_status("    > Sufficient internal/provided info. Skipping Web Search.")
-        search_content = "[Internal Knowledge & User Documents Mode Active - Web Search Skipped]"
-    else:
+    async def _doc_index(user_pdf_text: str):
+        if not documents:
+            return None
+        try:
+            index = await asyncio.to_thread(doc_index.build_index, [(name, text) for _, name, text in documents])
+        except Exception as e:
+            logger.error(f"Document indexing failed: {e}", exc_info=e)
+            return None
+        if index is not None:
+            _update_status(f"    > Indexed {len(index)} passages from uploaded documents.")
+        return index
+
+    async def _search(user_pdf_text: str) -> str:
+        _update_status("Step 2/7: Checking Information Needs...")
+        with llm_usage.stage("search_decision"):
+            search_decision = await assess_search_need_async(query, user_pdf_text)
+        if search_decision == 'SKIP_SEARCH':
+            _update_status("    > Sufficient internal/provided info. Skipping Web Search.")
+            return "[Internal Knowledge & User Documents Mode Active - Web Search Skipped]"
         _update_status(f"    > Web Search Required: {search_decision}")
-        search_content = get_search_results(search_decision)
-    
-    _update_status("Step 3/7: Synthesizing Data...")
-    summary = generate_summary(search_content, query, user_pdf_text)
-    
-    _update_status("Step 4/7: Generating Visuals...")
-    chart_path = generate_chart_from_data(summary, query)
-    
-    _update_status("Step 5/7: Planning Structure...")
-    outline = generate_outline(query, summary, user_format, page_count)
-
-    total_words = page_count * WORDS_PER_PAGE 
-    words_per_section = max(400, int(total_words / max(1, len(outline))))
-    
-    full_report = f"# {query.upper()}\n\n"
-    for i, section in enumerate(outline):
-        _update_status(f"Step 6/7: Writing Section {i+1}/{len(outline)}: {section}...")
-        
+        return await get_search_results_async(search_decision)
+
+    async def _summary(user_pdf_text: str, search_content: str) -> str:
+        _update_status("Step 3/7: Synthesizing Data...")
+        with llm_usage.stage("summary"):
+            return await generate_summary_async(search_content, query, user_pdf_text)
+
+    async def _chart(summary: str):
+        _update_status("Step 4/7: Generating Visuals...")
+        with llm_usage.stage("chart"):
+            return await generate_chart_from_data_async(summary, query)
+
+    async def _outline(summary: str) -> list:
+        nonlocal outline
+        _update_status("Step 5/7: Planning Structure...")
+        with llm_usage.stage("outline"):
+            outline = await generate_outline_async(query, summary, user_format, page_count)
+        writer.submit(events, report_events.OUTLINE, {"sections": outline})
+        return outline
+
+    async def _sections(summary: str, search_content: str, outline: list, index) -> list:
+        total_words = page_count * WORDS_PER_PAGE 
+        words_per_section = max(400, int(total_words / max(1, len(outline))))
+        report_header = f"# {query.upper()}\n\n"
+        _update_status(f"Step 6/7: Writing {len(outline)} Sections...")
+        excerpts = [""] * len(outline)
+        if index is not None:
+            # Upload passages closest to each section's own title
+            excerpts = await asyncio.to_thread(index.excerpts_for, [f"{section} {query}" for section in outline])
+        if section_context.SECTION_CONTEXT_ENABLED:
+            contexts = await asyncio.to_thread(
+                section_context.build_contexts, outline, query, summary, search_content, excerpts
+            )
+        else:
+            contexts = {
+                section: f"{found}\n\n{summary}" if found else summary
+                for section, found in zip(outline, excerpts)
+            }
         if use_council:
             # COUNCIL MODE: Use the multi-agent recursive loop
-            import asyncio
-            # We need to run async council in this sync function
-            # Since this is running in Celery, we can use asyncio.run or similar
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            section_content = loop.run_until_complete(
-                council.run_council(section, query, summary, _update_status)
-            )
+            write_one = lambda section: council.run_council(section, query, contexts[section], _update_status)
         else:
-            # STANDARD MODE
-            section_content = write_section(section, query, summary, full_report, words_per_section)
-            
-        full_report += f"\n\n## {section}\n{section_content}\n"
-    
-    # Append Consolidated References
-    full_report += "\n\n# References\n"
-    # Process search_content to look nice
-    clean_refs = search_content.replace("--- VERIFIED SOURCES ---", "").strip()
-    full_report += clean_refs
-
-    _update_status("Step 7/7: Finalizing...")
-    full_report = clean_ai_output(full_report)
-    
-    return search_content + "\n" + user_pdf_text, full_report, chart_path
+            # STANDARD MODE: gap analysis and writing for each section run concurrently
+            write_one = lambda section: write_section_async(section, query, contexts[section], report_header, words_per_section)
+        return await _write_sections(outline, write_one, _update_status, section_concurrency, _on_section)
+
+    graph = (
+        pipeline_graph.PipelineGraph()
+        .add("inputs", _inputs)
+        .add("doc_index", _doc_index, deps=("inputs",))
+        .add("search", _search, deps=("inputs",))
+        .add("summary", _summary, deps=("inputs", "search"))
+        .add("chart", _chart, deps=("summary",))
+        .add("outline", _outline, deps=("summary",))
+        .add("sections", _sections, deps=("summary", "search", "outline", "doc_index"))
+    )
+    try:
+        results = await graph.run()
+        search_content, user_pdf_text = results["search"], results["inputs"]
+
+        full_report = f"# {query.upper()}\n\n"
+        full_report += "".join(
+            f"\n\n## {section}\n{section_content}\n"
+            for section, section_content in zip(outline, results["sections"])
+        )
+
+        # Append Consolidated References
+        full_report += "\n\n# References\n"
+        # Process search_content to look nice
+        clean_refs = search_content.replace("--- VERIFIED SOURCES ---", "").strip()
+        full_report += clean_refs
+
+        _update_status("Step 7/7: Finalizing...")
+        full_report = clean_ai_output(full_report)
+        _update_status(f"    > Critical path: {graph.describe_critical_path()}")
+        ledger = llm_usage.current_ledger()
+        if ledger is not None:
+            totals = ledger.to_dict()["totals"]
+            _update_status(
+                f"    > LLM usage: {totals['calls']} calls, {totals['prompt_tokens']} prompt + "
+                f"{totals['completion_tokens']} completion tokens, {totals['fallbacks']} fallbacks, {totals['errors']} errors"
+            )
+
+        return search_content + "\n" + user_pdf_text, full_report, results["chart"]
+    finally:
+        # Queued writes land before the task publishes its terminal event
+        await asyncio.to_thread(writer.close)
+
+async def _run_ai_engine_on_own_loop(*args, **kwargs) -> tuple[str, str, str]:
+    try:
+        return await run_ai_engine_async(*args, **kwargs)
+    finally:
+        # Async clients are bound to this loop, which asyncio.run closes next
+        await http_client.aclose_clients()
+
+def run_ai_engine_with_return(query: str, user_format: str, page_count: int = 15, file_data_list: list = None, task=None, use_council: bool = False, section_concurrency: int = None) -> tuple[str, str, str]: 
+    """Sync entry point for Celery: runs the async pipeline on a fresh event loop for this task."""
+    return asyncio.run(_run_ai_engine_on_own_loop(
+        query, user_format, page_count, file_data_list,
+        task=task, use_council=use_council, section_concurrency=section_concurrency
+    ))
 
 def convert_to_txt(content, path):
     with open(path, "w", encoding="utf-8") as f: f.write(content)
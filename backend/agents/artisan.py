@@ -17,4 +17,5 @@ async def agent_artisan(content: str, critique: str = "") -> str:
         "4. Output ONLY the final polished markdown."
     )
     
-    return await call_model_async(LEGION_MODELS[3], "You are The Artisan, a Master Writer.", content + "\n\n" + prompt)
+    # Part of the review loop: each pass must rewrite, not replay an earlier one
+    return await call_model_async(LEGION_MODELS[3], "You are The Artisan, a Master Writer.", content + "\n\n" + prompt, use_cache=False)
@@ -1,10 +1,50 @@
+import os
+import time
 from typing import List
 import asyncio
 from .utils import call_model_async, LEGION_MODELS
 
-async def agent_legion(section_title: str, topic: str, context: str) -> List[str]:
+# Nexus gets the first LEGION_QUORUM valid drafts, or whatever is valid once LEGION_DEADLINE_SECONDS
+# have passed; the remaining models are cancelled. A quorum of 0 waits for every model until the deadline.
+LEGION_QUORUM = int(os.environ.get("LEGION_QUORUM", "3"))
+LEGION_DEADLINE_SECONDS = float(os.environ.get("LEGION_DEADLINE_SECONDS", "90"))
+
+
+def _is_valid(result: str) -> bool:
+    return bool(result) and "Agent Failure" not in result and len(result) > 100
+
+
+async def _gather_quorum(tasks: List[asyncio.Future], quorum: int, deadline: float) -> List[str]:
+    """
+    Valid results of `tasks`, in task order, as soon as `quorum` are in or, after `deadline`
+    seconds, as soon as there is at least one. Tasks still running then are cancelled.
+    """
+    order = {task: i for i, task in enumerate(tasks)}
+    pending = set(tasks)
+    valid = {}
+    started = time.perf_counter()
+    try:
+        while pending and len(valid) < quorum:
+            elapsed = time.perf_counter() - started
+            if valid and elapsed >= deadline:
+                break
+            timeout = max(0.0, deadline - elapsed) if elapsed < deadline else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None and _is_valid(task.result()):
+                    valid[order[task]] = task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+    if pending:
+        print(f"    >>> The Legion moves on with {len(valid)} drafts, cancelling {len(pending)} stragglers")
+    return [valid[i] for i in sorted(valid)]
+
+
+async def agent_legion(section_title: str, topic: str, context: str,
+                       quorum: int = LEGION_QUORUM, deadline: float = LEGION_DEADLINE_SECONDS) -> List[str]:
     print(f"    >>> The Legion is mobilizing for: {section_title}")
-    
+
     prompt = (
         f"Write a detailed, academic section titled '{section_title}' for a report on '{topic}'.\n"
         f"Context:\n{context[:10000]}\n\n"
@@ -13,17 +53,19 @@ async def agent_legion(section_title: str, topic: str, context: str) -> List[str
         "2. Use Markdown formatting (## Headers, Tables).\n"
         "3. Focus on specific stats, numbers, and case studies found in the context."
     )
-    
+
     tasks = []
-    for model in LEGION_MODELS:
-        tasks.append(call_model_async(model, "You are a specialized Research Agent.", prompt))
-    
-    results = await asyncio.gather(*tasks)
-    # Filter out failures
-    valid_results = [r for r in results if r and "Agent Failure" not in r and len(r) > 100]
-    
+    for slot, model in enumerate(LEGION_MODELS):
+        # Each slot caches its own draft, so a model listed twice still gives two drafts
+        tasks.append(asyncio.ensure_future(
+            call_model_async(model, "You are a specialized Research Agent.", prompt, cache_slot=f"legion-{slot}")
+        ))
+
+    # Failures never count towards the quorum
+    valid_results = await _gather_quorum(tasks, quorum if quorum > 0 else len(tasks), deadline)
+
     if not valid_results:
         # Fallback if all fail
         return [await call_model_async(LEGION_MODELS[0], "Research Agent", prompt)]
-        
+
     return valid_results
@@ -1,7 +1,12 @@
 import os
-import httpx
+import time
 import asyncio
 import random
+from .. import http_client
+from .. import llm_usage
+from .. import model_router
+from ..rate_limiter import limiter, reserve_tokens, retry_after
+from ..cache import llm_cache, llm_cache_key
 from ..logging_config import setup_logging
 
 logger = setup_logging("scholarforge.agents")
@@ -16,8 +21,31 @@ LEGION_MODELS = [
     "llama-3.1-8b-instant"                     # [4] The Inquisitor (Fact Checker via Groq)
 ]
 
-async def call_model_async(model: str, system_prompt: str, user_prompt: str) -> str:
-    """Helper to call OpenRouter or Groq async with retries"""
+COUNCIL_TEMPERATURE = 0.7
+
+async def call_model_async(model: str, system_prompt: str, user_prompt: str, use_cache: bool = True,
+                           cache_slot: str = "") -> str:
+    """
+    Helper to call OpenRouter or Groq async with retries. Calls are sampled, so agents that must
+    give independent answers pass their own `cache_slot`, and those that must rewrite pass use_cache=False.
+    """
+    if use_cache:
+        key = llm_cache_key(model, system_prompt, user_prompt, COUNCIL_TEMPERATURE, cache_slot)
+        cached = await llm_cache.aget(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit ({model})")
+            llm_usage.record_cache_hit(model)
+            return cached
+        result = await call_model_async(model, system_prompt, user_prompt, use_cache=False)
+        if result and not result.startswith("Error:") and "Agent Failure" not in result:
+            await llm_cache.aset(key, result)
+        return result
+
+    if not model_router.router.available(model) or not model_router.router.admit(model):
+        # Fail fast instead of paying timeouts; the council already copes with a missing agent
+        logger.warning(f"Skipping {model}: circuit open")
+        return f"[Agent Failure: {model}]"
+
     is_groq = model.startswith("llama-")
     
     if is_groq:
@@ -39,30 +67,45 @@ async def call_model_async(model: str, system_prompt: str, user_prompt: str) ->
             "X-Title": "ScholarForge Council"
         }
     
-    data = {"model": model, "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], "temperature": 0.7, "max_tokens": 4000}
+    data = {"model": model, "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}], "temperature": COUNCIL_TEMPERATURE, "max_tokens": 4000}
 
+    reserved = reserve_tokens(system_prompt, user_prompt, max_tokens=data["max_tokens"])
     for attempt in range(3):
+        await limiter.acquire(model, reserved)
+        settled = False
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                resp = await client.post(api_url, headers=headers, json=data)
-                
-                if resp.status_code == 200:
-                    try:
-                        return resp.json()['choices'][0]['message']['content']
-                    except Exception:
-
-                        return ""
-                
-                # Rate limit handling
-                if resp.status_code == 429:
-                    await asyncio.sleep((2 ** attempt) + random.uniform(1, 3))
-                    continue
-                
-                # Try next attempt on error
-                logger.error(f"Council Agent Error ({model}): {resp.status_code}")
-                await asyncio.sleep(2)
+            client = http_client.get_async_client(api_url)
+            resp = await client.post(api_url, headers=headers, json=data, timeout=120.0)
+            
+            if resp.status_code == 200:
+                try:
+                    body = resp.json()
+                    content = body['choices'][0]['message']['content']
+                except Exception as e:
+                    llm_usage.record_error(model, time.perf_counter() - started, llm_usage.error_code(e))
+                    return ""
+                llm_usage.record_call(model, time.perf_counter() - started, body)
+                settled = True
+                await limiter.asettle(model, reserved, body)
+                return content
+            
+            llm_usage.record_error(model, time.perf_counter() - started, resp.status_code)
+            # Rate limit handling: the limiter holds back every caller of this model until Retry-After
+            if resp.status_code == 429:
+                await limiter.backoff(model, retry_after(resp, (2 ** attempt) + random.uniform(1, 3)))
+                continue
+            
+            # Try next attempt on error
+            logger.error(f"Council Agent Error ({model}): {resp.status_code}")
+            await asyncio.sleep(2)
         except Exception as e:
             logger.error(f"Council Exception ({model}): {e}", exc_info=e)
+            llm_usage.record_error(model, time.perf_counter() - started, llm_usage.error_code(e))
             await asyncio.sleep(2)
+        finally:
+            # Failed, throttled and cancelled calls (e.g. Legion stragglers) give their tokens back
+            if not settled:
+                await limiter.arefund(model, reserved)
             
     return f"[Agent Failure: {model}]"
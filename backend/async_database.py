@@ -0,0 +1,220 @@
+"""
+Async Database Layer for ScholarForge
+AsyncEngine (aiosqlite / asyncpg) and async counterparts of the `database` functions used on the
+FastAPI request path. Celery workers keep the sync engine; both share the models and statements.
+"""
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy import select, text
+
+from . import database
+from . import search_index
+from .database import ChatMessage, Hook, ReportBody, ReportDB
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.async_database")
+
+ASYNC_DB_ENABLED = os.environ.get("ASYNC_DB_ENABLED", "true").lower() != "false"
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+engine = None
+AsyncSessionLocal = None
+
+
+def async_url(url: str) -> Optional[str]:
+    """The async-driver form of a sync database URL, or None for unsupported backends."""
+    scheme, sep, rest = url.partition("://")
+    driver = _ASYNC_DRIVERS.get(scheme)
+    return f"{driver}{sep}{rest}" if driver and sep else None
+
+
+def init_async_engine(url: str = None) -> bool:
+    """
+    Creates the AsyncEngine for `url` (by default derived from DATABASE_URL).
+    Returns False, leaving the sync fallback in place, if the async driver is not installed.
+    """
+    global engine, AsyncSessionLocal
+    try:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    except ImportError as e:
+        logger.warning(f"SQLAlchemy asyncio extension unavailable, using the sync database path: {e}")
+        return False
+
+    url = url or async_url(database.SQLALCHEMY_DATABASE_URL)
+    if not url:
+        logger.info("No async driver for this database URL; using the sync database path")
+        return False
+    try:
+        if url.startswith("sqlite"):
+            new_engine = create_async_engine(url, echo=False)
+        else:
+            new_engine = create_async_engine(
+                url,
+                pool_size=10,
+                max_overflow=20,
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                echo=False
+            )
+    except ImportError as e:
+        logger.warning(f"Async database driver not installed, using the sync database path: {e}")
+        return False
+
+    engine = new_engine
+    AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    logger.info(f"Async database engine ready ({engine.url.drivername})")
+    return True
+
+
+async def dispose():
+    global engine, AsyncSessionLocal
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    AsyncSessionLocal = None
+
+
+def _use_async() -> bool:
+    """Whether init_async_engine has run; otherwise calls run the sync functions on a worker thread."""
+    return AsyncSessionLocal is not None
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncGenerator:
+    """
+    Async counterpart of database.get_db_session: commits on success, rolls back on error.
+
+    Usage:
+        async with get_async_db_session() as db:
+            await db.execute(...)
+    """
+    db = AsyncSessionLocal()
+    try:
+        yield db
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Database transaction error: {e}", exc_info=e)
+        raise
+    finally:
+        await db.close()
+
+
+# ============================================================================
+# ASYNC OPERATIONS
+# ============================================================================
+
+async def ping():
+    if not _use_async():
+        return await asyncio.to_thread(_sync_ping)
+    async with get_async_db_session() as db:
+        await db.execute(text("SELECT 1"))
+
+
+def _sync_ping():
+    with database.get_db_session() as db:
+        db.execute(text("SELECT 1"))
+
+
+async def get_chat_context(session_id: int, limit: int):
+    """See database.get_chat_context."""
+    if not _use_async():
+        return await asyncio.to_thread(database.get_chat_context, session_id, limit)
+    try:
+        async with get_async_db_session() as db:
+            session = (await db.execute(database.chat_summary_stmt(session_id))).first()
+            summary, through_id = (session.summary, session.summary_through_id) if session else (None, None)
+            stmt = database.unsummarized_messages_stmt(session_id, through_id).limit(limit)
+            recent = (await db.execute(stmt)).all()
+            return summary, through_id, list(reversed(recent))
+    except Exception as e:
+        logger.error(f"Error retrieving chat context {session_id}: {e}")
+        raise
+
+
+async def get_messages_to_fold(session_id: int, keep: int, limit: int):
+    """See database.get_messages_to_fold."""
+    if not _use_async():
+        return await asyncio.to_thread(database.get_messages_to_fold, session_id, keep, limit)
+    try:
+        async with get_async_db_session() as db:
+            session = (await db.execute(database.chat_summary_stmt(session_id))).first()
+            summary, through_id = (session.summary, session.summary_through_id) if session else (None, None)
+            stmt = database.messages_to_fold_stmt(session_id, through_id, keep, limit)
+            older = (await db.execute(stmt)).all()
+            return summary, through_id, list(older)
+    except Exception as e:
+        logger.error(f"Error retrieving messages to fold {session_id}: {e}")
+        raise
+
+
+async def update_session_summary(session_id: int, summary: str, through_id: int, expected_through_id: Optional[int]) -> bool:
+    """See database.update_session_summary."""
+    if not _use_async():
+        return await asyncio.to_thread(
+            database.update_session_summary, session_id, summary, through_id, expected_through_id
+        )
+    try:
+        async with get_async_db_session() as db:
+            result = await db.execute(
+                database.session_summary_update_stmt(session_id, summary, through_id, expected_through_id)
+            )
+            return result.rowcount == 1
+    except Exception as e:
+        logger.error(f"Error updating summary for session {session_id}: {e}")
+        raise
+
+
+async def save_chat_messages(session_id: int, messages: list):
+    """See database.save_chat_messages."""
+    if not _use_async():
+        return await asyncio.to_thread(database.save_chat_messages, session_id, messages)
+    try:
+        async with get_async_db_session() as db:
+            db.add_all([ChatMessage(session_id=session_id, role=role, content=content) for role, content in messages])
+            logger.debug(f"Saved {len(messages)} messages to session {session_id}")
+    except Exception as e:
+        logger.error(f"Error saving chat messages: {e}")
+        raise
+
+
+async def save_hook(content: str):
+    """See database.save_hook."""
+    if not _use_async():
+        return await asyncio.to_thread(database.save_hook, content)
+    try:
+        async with get_async_db_session() as db:
+            db.add(Hook(content=content))
+            logger.info("Saved hook")
+    except Exception as e:
+        logger.error(f"Error saving hook: {e}")
+        raise
+
+
+async def update_report_content(report_id: int, content: str) -> bool:
+    """See database.update_report_content."""
+    if not _use_async():
+        return await asyncio.to_thread(database.update_report_content, report_id, content)
+    try:
+        async with get_async_db_session() as db:
+            report = (await db.execute(select(ReportDB.topic).where(ReportDB.id == report_id))).first()
+            if report is None:
+                return False
+            if (await db.execute(database.report_body_update_stmt(report_id, content))).rowcount == 1:
+                connection = await db.connection()
+                await connection.run_sync(search_index.index_document, "report", report_id, content, report.topic)
+            else:
+                db.add(ReportBody(report_id=report_id, **database.compress_content(content)))
+            return True
+    except Exception as e:
+        logger.error(f"Error updating report {report_id}: {e}")
+        raise
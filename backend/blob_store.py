@@ -0,0 +1,138 @@
+"""
+Upload Blob Store for ScholarForge
+Content-addressed spool directory for uploaded files. The API streams uploads to disk and
+passes only {filename, sha256, size} references through Celery; workers read bytes lazily.
+The spool must be on storage shared by the API and the workers (./data in docker-compose).
+"""
+import os
+import re
+import time
+import uuid
+import asyncio
+import hashlib
+
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.blob_store")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR", os.path.join(BASE_DIR, "data", "uploads"))
+# Blobs older than this are purged; reports are expected to pick up their files well within it.
+BLOB_TTL_SECONDS = int(os.environ.get("UPLOAD_BLOB_TTL", str(24 * 3600)))
+CHUNK_SIZE = 1024 * 1024
+PURGE_INTERVAL = 600.0
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+_last_purge = 0.0
+
+
+class BlobNotFound(Exception):
+    """Raised when a referenced blob is missing or has expired."""
+
+
+def _ensure_dir():
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+
+
+def blob_path(sha256: str) -> str:
+    if not _SHA256_RE.match(sha256 or ""):
+        raise ValueError(f"Invalid blob reference: {sha256!r}")
+    return os.path.join(SPOOL_DIR, sha256)
+
+
+def _commit(tmp_path: str, sha256: str):
+    """Moves a finished temp file into place, or drops it if the blob already exists."""
+    final_path = blob_path(sha256)
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        os.utime(final_path)  # refresh TTL for a re-upload
+    else:
+        os.replace(tmp_path, final_path)
+
+
+async def save_upload(upload) -> dict:
+    """
+    Streams a FastAPI UploadFile into the spool in chunks without holding it in memory.
+    Returns a reference dict that is safe to send through Celery.
+    """
+    await asyncio.to_thread(_ensure_dir)
+    await asyncio.to_thread(_maybe_purge)
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = os.path.join(SPOOL_DIR, f".tmp-{uuid.uuid4().hex}")
+    f = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        f.close()
+        os.remove(tmp_path)
+        raise
+    await asyncio.to_thread(f.close)
+    sha256 = digest.hexdigest()
+    await asyncio.to_thread(_commit, tmp_path, sha256)
+    logger.info(f"Spooled upload {upload.filename} ({size} bytes) as {sha256[:12]}")
+    return {"filename": upload.filename, "sha256": sha256, "size": size}
+
+
+def save_bytes(filename: str, content: bytes) -> dict:
+    """Synchronous variant of save_upload for callers that already hold the bytes."""
+    _ensure_dir()
+    sha256 = hashlib.sha256(content).hexdigest()
+    tmp_path = os.path.join(SPOOL_DIR, f".tmp-{uuid.uuid4().hex}")
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    _commit(tmp_path, sha256)
+    return {"filename": filename, "sha256": sha256, "size": len(content)}
+
+
+def read_blob(sha256: str) -> bytes:
+    try:
+        with open(blob_path(sha256), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        raise BlobNotFound(f"Uploaded file {sha256[:12]} is no longer available")
+
+
+def read_file_data(file_data: dict) -> bytes:
+    """Returns the bytes for a file_data entry, accepting inline 'content' or a blob reference."""
+    content = file_data.get("content")
+    if content is not None:
+        return content
+    return read_blob(file_data["sha256"])
+
+
+def purge_expired(ttl: int = None) -> int:
+    """Deletes blobs (and abandoned temp files) older than `ttl` seconds."""
+    ttl = BLOB_TTL_SECONDS if ttl is None else ttl
+    if not os.path.isdir(SPOOL_DIR):
+        return 0
+    cutoff = time.time() - ttl
+    removed = 0
+    for name in os.listdir(SPOOL_DIR):
+        path = os.path.join(SPOOL_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    if removed:
+        logger.info(f"Purged {removed} expired upload blobs")
+    return removed
+
+
+def _maybe_purge():
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge > PURGE_INTERVAL:
+        _last_purge = now
+        try:
+            purge_expired()
+        except Exception as e:
+            logger.warning(f"Blob purge failed: {e}")
@@ -0,0 +1,196 @@
+"""
+Response Cache for ScholarForge
+Two-tier content-addressed cache: an in-process LRU with TTL and size-based eviction,
+backed by an optional Redis tier shared by the API and every Celery worker.
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .logging_config import setup_logging
+from .metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+logger = setup_logging("scholarforge.cache")
+
+CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "true").lower() != "false"
+CACHE_REDIS_ENABLED = os.environ.get("CACHE_REDIS_ENABLED", "true").lower() != "false"
+CACHE_REDIS_URL = os.environ.get(
+    "CACHE_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
+)
+# After a Redis failure the tier is skipped for this long instead of timing out on every call.
+REDIS_RETRY_AFTER = 60.0
+
+_MISSING = object()
+
+
+def make_key(*parts: Any) -> str:
+    """SHA-256 over the JSON encoding of `parts`."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache with an optional Redis tier.
+
+    The memory tier is bounded by entry count and by total value size. The Redis
+    tier relies on per-key TTLs; global eviction there is left to Redis' maxmemory policy.
+    Values must be JSON-serializable.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int, max_bytes: int, use_redis: bool = True):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.use_redis = use_redis and CACHE_REDIS_ENABLED
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_down_until = 0.0
+
+    # ------------------------------------------------------------------ memory tier
+
+    def _memory_get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def _memory_set(self, key: str, value: Any, ttl: float):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                CACHE_EVICTIONS.labels(cache=self.name).inc()
+
+    # ------------------------------------------------------------------ redis tier
+
+    def _get_redis(self):
+        if not self.use_redis or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(
+                    CACHE_REDIS_URL, socket_connect_timeout=0.5, socket_timeout=1.0
+                )
+            except Exception as e:
+                logger.warning(f"Cache '{self.name}': Redis tier unavailable: {e}")
+                self.use_redis = False
+                return None
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        logger.warning(f"Cache '{self.name}': Redis error, skipping tier for {REDIS_RETRY_AFTER:.0f}s: {e}")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+    def _redis_key(self, key: str) -> str:
+        return f"scholarforge:cache:{self.name}:{key}"
+
+    def _redis_get(self, key: str):
+        client = self._get_redis()
+        if client is None:
+            return _MISSING
+        try:
+            raw = client.get(self._redis_key(key))
+        except Exception as e:
+            self._redis_failed(e)
+            return _MISSING
+        return _MISSING if raw is None else json.loads(raw)
+
+    def _redis_set(self, key: str, value: Any, ttl: float):
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            client.set(self._redis_key(key), json.dumps(value, default=str), ex=max(1, int(ttl)))
+        except Exception as e:
+            self._redis_failed(e)
+
+    # ------------------------------------------------------------------ public API
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not CACHE_ENABLED:
+            return default
+        value = self._memory_get(key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.labels(cache=self.name, result="hit_memory").inc()
+            return value
+        value = self._redis_get(key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.labels(cache=self.name, result="hit_redis").inc()
+            self._memory_set(key, value, self.ttl)
+            return value
+        CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if not CACHE_ENABLED:
+            return
+        ttl = ttl or self.ttl
+        self._memory_set(key, value, ttl)
+        self._redis_set(key, value, ttl)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Async `get`: memory hits return inline, Redis lookups run off the event loop."""
+        if not CACHE_ENABLED:
+            return default
+        value = self._memory_get(key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.labels(cache=self.name, result="hit_memory").inc()
+            return value
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        if not CACHE_ENABLED:
+            return
+        ttl = ttl or self.ttl
+        self._memory_set(key, value, ttl)
+        if self._get_redis() is not None:
+            await asyncio.to_thread(self._redis_set, key, value, ttl)
+
+    def clear(self):
+        """Clear the memory tier (the shared Redis tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+llm_cache = ResponseCache(
+    "llm",
+    ttl=float(os.environ.get("LLM_CACHE_TTL", "86400")),
+    max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "2048")),
+    max_bytes=int(os.environ.get("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+
+def llm_cache_key(model: str, system_prompt: str, user_prompt: str, temperature: float, slot: str = "") -> str:
+    """`slot` separates sampled calls that share a model and prompt but must not share an answer."""
+    if slot:
+        return make_key("llm", model, system_prompt, user_prompt, temperature, slot)
+    return make_key("llm", model, system_prompt, user_prompt, temperature)
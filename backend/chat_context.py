@@ -0,0 +1,129 @@
+"""
+Chat History Context for ScholarForge
+Builds a bounded prompt history for each chat turn: the newest messages that fit a token
+budget, preceded by a rolling summary of everything older, which is stored on the session.
+Messages that have left the window stay in the prompt verbatim until they are folded in.
+"""
+import os
+import asyncio
+
+from . import async_database
+from . import AI_engine
+from . import llm_usage
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.chat_context")
+
+# Newest messages that are never folded into the summary
+HISTORY_WINDOW_MESSAGES = int(os.environ.get("CHAT_HISTORY_WINDOW", "12"))
+# Token budget for summary + verbatim history; oldest messages in the window are dropped first
+HISTORY_TOKEN_BUDGET = int(os.environ.get("CHAT_HISTORY_TOKEN_BUDGET", "6000"))
+# Older messages are folded into the summary once this many have accumulated
+FOLD_BATCH_MESSAGES = int(os.environ.get("CHAT_FOLD_BATCH", "8"))
+# Long pre-existing sessions are caught up over several turns rather than in one huge prompt
+FOLD_MAX_MESSAGES = 40
+SUMMARY_MAX_TOKENS = 600
+SUMMARY_MODEL = AI_engine.SMART_MODEL
+
+_folding: set = set()
+_background_tasks: set = set()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return len(text or "") // 4 + 1
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    return text[:max_tokens * 4]
+
+
+def _summary_turn(summary: str) -> dict:
+    return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+
+def fit_history(summary: str, messages: list, budget: int = None) -> list:
+    """
+    Returns prompt history turns: the summary (if any) followed by the newest messages
+    that fit in `budget` tokens. The newest message is always kept, truncated if needed.
+    """
+    budget = HISTORY_TOKEN_BUDGET if budget is None else budget
+    turns = []
+    used = 0
+    if summary:
+        summary = _truncate_to_tokens(summary, SUMMARY_MAX_TOKENS)
+        used = estimate_tokens(summary)
+    for message in reversed(messages):
+        cost = estimate_tokens(message["content"])
+        if used + cost > budget:
+            if not turns:
+                turns.append({"role": message["role"], "content": _truncate_to_tokens(message["content"], max(1, budget - used))})
+            break
+        turns.append({"role": message["role"], "content": message["content"]})
+        used += cost
+    turns.reverse()
+    if summary:
+        turns.insert(0, _summary_turn(summary))
+    return turns
+
+
+async def build_history(session_id: int) -> list:
+    """
+    History turns for the next chat turn of a session, bounded in messages and tokens. Older
+    messages waiting to be folded are included, so nothing drops out before it is summarized.
+    """
+    limit = HISTORY_WINDOW_MESSAGES + FOLD_MAX_MESSAGES
+    summary, _, recent = await async_database.get_chat_context(session_id, limit)
+    messages = [{"role": m.role, "content": m.content} for m in recent]
+    return fit_history(summary, messages)
+
+
+async def _summarize(previous_summary: str, messages: list) -> str:
+    transcript = "\n\n".join(f"{m.role.upper()}: {m.content}" for m in messages)
+    prompt = (
+        f"Existing summary of the conversation so far:\n{previous_summary or '(none)'}\n\n"
+        f"New conversation turns to fold in:\n{transcript[:40000]}\n\n"
+        "TASK: Write an updated summary of the whole conversation in under 300 words. Keep names, "
+        "facts, numbers, decisions and open questions the assistant may need later. Output the summary only."
+    )
+    with llm_usage.stage("chat_summary"):
+        return await AI_engine.call_llm_async(SUMMARY_MODEL, "You maintain concise conversation memory.", prompt, temp=0.2)
+
+
+async def fold_history(session_id: int) -> bool:
+    """
+    Folds unsummarized messages that have fallen out of the history window into the
+    session's rolling summary. Returns whether the summary was updated.
+    """
+    if session_id in _folding:
+        return False
+    _folding.add(session_id)
+    try:
+        summary, through_id, to_fold = await async_database.get_messages_to_fold(
+            session_id, HISTORY_WINDOW_MESSAGES, FOLD_MAX_MESSAGES
+        )
+        if len(to_fold) < FOLD_BATCH_MESSAGES:
+            return False
+        new_summary = await _summarize(summary, to_fold)
+        if not new_summary or new_summary.startswith("Error:"):
+            logger.warning(f"Chat summary failed for session {session_id}; keeping the previous summary")
+            return False
+        new_summary = _truncate_to_tokens(new_summary, SUMMARY_MAX_TOKENS)
+        updated = await async_database.update_session_summary(
+            session_id, new_summary, to_fold[-1].id, through_id
+        )
+        if updated:
+            logger.info(f"Folded {len(to_fold)} messages into the summary of session {session_id}")
+        return updated
+    except Exception as e:
+        logger.error(f"Chat history fold failed for session {session_id}: {e}", exc_info=e)
+        return False
+    finally:
+        _folding.discard(session_id)
+
+
+def schedule_fold(session_id: int):
+    """Runs fold_history in the background so the summary never delays a response."""
+    task = asyncio.get_running_loop().create_task(fold_history(session_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
@@ -1,6 +1,12 @@
 import os
+import time
 import httpx 
 
+from . import http_client
+from . import llm_usage
+from . import model_router
+from .rate_limiter import limiter, reserve_tokens, retry_after
+
 AVAILABLE_MODELS = {
     "default": "nvidia/nemotron-nano-12b-v2-vl:free",
     "llama-70b": "llama-3.3-70b-versatile",
@@ -42,18 +48,13 @@ DEEP_DIVE_PROMPT = (
 )
 
 import asyncio
+import json
 import random
 
 # Fallback order for models (will try these if primary model fails)
 FALLBACK_ORDER = ["llama-70b", "llama-8b", "gpt-oss", "gemma", "default"]
 
-async def get_chat_response_async(user_message: str, history: list, model: str = "default", mode: str = "normal", file_context: str = "") -> str:
-    """
-    Async version of chat response using HTTPX.
-    Supports model selection, response modes, file context, and automatic retry with fallback.
-    """
-    # API keys resolved dynamically per model in the loop below
-
+def _build_messages(user_message: str, history: list, mode: str, file_context: str) -> list:
     # Choose system prompt based on mode
     if mode == "deep_dive":
         system_instruction = DEEP_DIVE_PROMPT
@@ -73,77 +74,268 @@ async def get_chat_response_async(user_message: str, history: list, model: str =
             messages.append({"role": api_role, "content": content})
 
     messages.append({"role": "user", "content": user_message})
+    return messages
 
+def _models_to_try(model: str) -> list:
     # Build list of models to try (primary first, then fallbacks)
     models_to_try = [model]
     for fb in FALLBACK_ORDER:
         if fb != model and fb not in models_to_try:
             models_to_try.append(fb)
+    return models_to_try
+
+def _provider_for(selected_model: str):
+    """Returns (api_key, api_url, headers) for the provider serving `selected_model`."""
+    is_groq = selected_model.startswith("llama-")
+    if is_groq:
+        api_key = os.environ.get("GROQ_API_KEY")
+        api_url = "https://api.groq.com/openai/v1/chat/completions"
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    else:
+        api_key = os.environ.get("OPENROUTER_API_KEY")
+        api_url = "https://openrouter.ai/api/v1/chat/completions"
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", "HTTP-Referer": "http://localhost:5000"}
+    return api_key, api_url, headers
+
+async def get_chat_response_async(user_message: str, history: list, model: str = "default", mode: str = "normal", file_context: str = "") -> str:
+    """
+    Async version of chat response using HTTPX.
+    Supports model selection, response modes, file context, and automatic retry with fallback.
+    Fallbacks are ordered by the model router, and a backup model is raced against one that is
+    slower than usual (hedging).
+    """
+    # API keys resolved dynamically per model in _try_model below
+    messages = _build_messages(user_message, history, mode, file_context)
+    requested = AVAILABLE_MODELS.get(model, AVAILABLE_MODELS["default"])
+    stage_name = llm_usage.current_stage("chat")
+    reserved = reserve_tokens(*(str(message["content"]) for message in messages))
+
+    def _model_for(model_key: str) -> str:
+        return AVAILABLE_MODELS.get(model_key, AVAILABLE_MODELS["default"])
+
+    async def _try_model(model_key: str) -> tuple:
+        """(True, content) or (False, error message) for one model."""
+        selected_model = _model_for(model_key)
+        if not model_router.router.admit(selected_model):
+            return False, f"Model {model_key} unavailable (circuit half-open)"
+        api_key, api_url, headers = _provider_for(selected_model)
+
+        if not api_key:
+            return False, f"API Key missing for {selected_model}"
+
+        last_error = None
+        # Try up to 3 times per model with exponential backoff
+        for attempt in range(3):
+            await limiter.acquire(selected_model, reserved)
+            settled = False
+            started = time.perf_counter()
+            try:
+                client = http_client.get_async_client(api_url)
+                response = await client.post(
+                    url=api_url,
+                    headers=headers,
+                    json={"model": selected_model, "messages": messages, "temperature": 0.7},
+                    timeout=90.0
+                )
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    content = result.get('choices', [{}])[0].get('message', {}).get('content')
+                    if content:
+                        llm_usage.record_call(selected_model, time.perf_counter() - started, result, requested, stage_name)
+                        settled = True
+                        await limiter.asettle(selected_model, reserved, result)
+                        return True, content
+                    # If no content, try again
+                    llm_usage.record_error(selected_model, time.perf_counter() - started, "empty", stage_name)
+                    continue
+
+                llm_usage.record_error(selected_model, time.perf_counter() - started, response.status_code, stage_name)
+                
+                # Rate limit - wait and retry
+                if response.status_code == 429:
+                    wait_time = retry_after(response, (2 ** attempt) + random.uniform(0.5, 1.5))
+                    await limiter.backoff(selected_model, wait_time)
+                    continue
+                
+                # Server error - try next model
+                if response.status_code in [502, 503, 504]:
+                    return False, f"Model {model_key} unavailable (Error {response.status_code})"
+                
+                # Other errors
+                response.raise_for_status()
+                    
+            except httpx.TimeoutException as e:
+                llm_usage.record_error(selected_model, time.perf_counter() - started, llm_usage.error_code(e), stage_name)
+                return False, f"Request timed out for model {model_key}"
+            except httpx.HTTPStatusError as e:
+                last_error = f"API Error: {e.response.status_code}"
+                if e.response.status_code == 429:
+                    wait_time = retry_after(e.response, (2 ** attempt) + random.uniform(0.5, 1.5))
+                    await limiter.backoff(selected_model, wait_time)
+                    continue
+                return False, last_error
+            except Exception as e:
+                llm_usage.record_error(selected_model, time.perf_counter() - started, llm_usage.error_code(e), stage_name)
+                return False, f"Error: {str(e)}"
+            finally:
+                # Failed, throttled and cancelled calls (e.g. the loser of a hedge) give their tokens back
+                if not settled:
+                    await limiter.arefund(selected_model, reserved)
+        return False, last_error
 
+    models_to_try = model_router.router.order(_models_to_try(model), key=_model_for, pin_first=True)
+    delay_for = None
+    if model_router.CHAT_HEDGE_ENABLED:
+        delay_for = lambda model_key: model_router.router.hedge_delay(_model_for(model_key))
+    ok, value = await model_router.hedged(_try_model, models_to_try, delay_for)
+    if ok:
+        return value
+    return value or "All models are currently unavailable. Please try again in a few moments."
+
+
+class ThinkTagFilter:
+    """
+    Incrementally strips <think>...</think> blocks from streamed text.
+    Tags may be split across chunks, so a possible partial tag is held back until resolved.
+    """
+    OPEN, CLOSE = "<think>", "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        visible = ""
+        while self._buffer:
+            tag = self.CLOSE if self._inside else self.OPEN
+            idx = self._buffer.find(tag)
+            if idx >= 0:
+                if not self._inside:
+                    visible += self._buffer[:idx]
+                self._buffer = self._buffer[idx + len(tag):]
+                self._inside = not self._inside
+                continue
+            # Hold back the longest suffix that could still become the tag
+            keep = 0
+            for n in range(min(len(tag) - 1, len(self._buffer)), 0, -1):
+                if tag.startswith(self._buffer[-n:]):
+                    keep = n
+                    break
+            if not self._inside:
+                visible += self._buffer[:len(self._buffer) - keep]
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return visible
+
+    def flush(self) -> str:
+        rest = "" if self._inside else self._buffer
+        self._buffer = ""
+        return rest
+
+
+class ChatStreamError(Exception):
+    """Raised by stream_chat_response_async when no model could produce a response."""
+
+
+async def stream_chat_response_async(user_message: str, history: list, model: str = "default", mode: str = "normal", file_context: str = ""):
+    """
+    Streaming counterpart of get_chat_response_async.
+    Yields visible text deltas as they arrive (OpenAI-compatible `stream: true`), with
+    <think> blocks removed. Falls back to the next model only while nothing has been
+    yielded yet; raises ChatStreamError if every model fails.
+    """
+    messages = _build_messages(user_message, history, mode, file_context)
+    requested = AVAILABLE_MODELS.get(model, AVAILABLE_MODELS["default"])
+    stage_name = llm_usage.current_stage("chat")
+    reserved = reserve_tokens(*(str(message["content"]) for message in messages))
     last_error = None
-    
+
+    models_to_try = model_router.router.order(
+        _models_to_try(model), key=lambda key: AVAILABLE_MODELS.get(key, AVAILABLE_MODELS["default"]), pin_first=True
+    )
     for model_key in models_to_try:
         selected_model = AVAILABLE_MODELS.get(model_key, AVAILABLE_MODELS["default"])
-        
-        is_groq = selected_model.startswith("llama-")
-        if is_groq:
-            api_key = os.environ.get("GROQ_API_KEY")
-            api_url = "https://api.groq.com/openai/v1/chat/completions"
-            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-        else:
-            api_key = os.environ.get("OPENROUTER_API_KEY")
-            api_url = "https://openrouter.ai/api/v1/chat/completions"
-            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", "HTTP-Referer": "http://localhost:5000"}
+        if not model_router.router.admit(selected_model):
+            last_error = f"Model {model_key} unavailable (circuit half-open)"
+            continue
+        api_key, api_url, headers = _provider_for(selected_model)
 
         if not api_key:
             last_error = f"API Key missing for {selected_model}"
             continue
 
-        # Try up to 3 times per model with exponential backoff
         for attempt in range(3):
+            think_filter = ThinkTagFilter()
+            emitted = False
+            usage_chunk = None
+            await limiter.acquire(selected_model, reserved)
+            started = time.perf_counter()
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        url=api_url,
-                        headers=headers,
-                        json={"model": selected_model, "messages": messages, "temperature": 0.7},
-                        timeout=90.0
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        content = result.get('choices', [{}])[0].get('message', {}).get('content')
-                        if content:
-                            return content
-                        # If no content, try again
-                        continue
-                    
-                    # Rate limit - wait and retry
+                client = http_client.get_async_client(api_url)
+                async with client.stream(
+                    "POST",
+                    api_url,
+                    headers=headers,
+                    json={"model": selected_model, "messages": messages, "temperature": 0.7, "stream": True},
+                    timeout=90.0
+                ) as response:
+                    if response.status_code != 200:
+                        llm_usage.record_error(selected_model, time.perf_counter() - started, response.status_code, stage_name)
                     if response.status_code == 429:
-                        wait_time = (2 ** attempt) + random.uniform(0.5, 1.5)
-                        await asyncio.sleep(wait_time)
+                        await limiter.backoff(selected_model, retry_after(response, (2 ** attempt) + random.uniform(0.5, 1.5)))
                         continue
-                    
-                    # Server error - try next model
-                    if response.status_code in [502, 503, 504]:
+                    if response.status_code != 200:
                         last_error = f"Model {model_key} unavailable (Error {response.status_code})"
                         break  # Try next model
-                    
-                    # Other errors
-                    response.raise_for_status()
-                    
-            except httpx.TimeoutException:
+
+                    async for line in response.aiter_lines():
+                        # Skip keep-alive comments (": OPENROUTER PROCESSING") and blank separators
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                        except ValueError:
+                            continue
+                        if chunk.get("usage"):
+                            # Providers that report usage send it with the final chunk
+                            usage_chunk = chunk
+                        choices = chunk.get("choices") or [{}]
+                        delta = (choices[0].get("delta") or {}).get("content")
+                        if delta:
+                            visible = think_filter.feed(delta)
+                            if visible:
+                                emitted = True
+                                yield visible
+
+                tail = think_filter.flush()
+                if tail:
+                    emitted = True
+                    yield tail
+                if emitted:
+                    llm_usage.record_call(selected_model, time.perf_counter() - started, usage_chunk, requested, stage_name)
+                    await limiter.asettle(selected_model, reserved, usage_chunk)
+                    return
+                # Empty completion - try again
+                llm_usage.record_error(selected_model, time.perf_counter() - started, "empty", stage_name)
+                continue
+            except httpx.TimeoutException as e:
+                llm_usage.record_error(selected_model, time.perf_counter() - started, llm_usage.error_code(e), stage_name)
                 last_error = f"Request timed out for model {model_key}"
-                break  # Try next model
-            except httpx.HTTPStatusError as e:
-                last_error = f"API Error: {e.response.status_code}"
-                if e.response.status_code == 429:
-                    wait_time = (2 ** attempt) + random.uniform(0.5, 1.5) 
-                    await asyncio.sleep(wait_time)
-                    continue
-                break  # Try next model
             except Exception as e:
+                llm_usage.record_error(selected_model, time.perf_counter() - started, llm_usage.error_code(e), stage_name)
                 last_error = f"Error: {str(e)}"
-                break  # Try next model
-    
-    return last_error or "All models are currently unavailable. Please try again in a few moments."
\ No newline at end of file
+            finally:
+                # Nothing was streamed, so the provider billed nothing; a partial answer keeps its reservation
+                if not emitted:
+                    await limiter.arefund(selected_model, reserved)
+            if emitted:
+                # Part of the answer is already on the client; switching models would splice two answers.
+                raise ChatStreamError(last_error)
+            break  # Try next model
+
+    raise ChatStreamError(last_error or "All models are currently unavailable. Please try again in a few moments.")
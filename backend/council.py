@@ -1,39 +1,115 @@
+import os
+import time
+from dataclasses import dataclass
+
 from .agents.legion import agent_legion
 from .agents.nexus import agent_nexus
 from .agents.inquisitor import agent_inquisitor
 from .agents.artisan import agent_artisan
+from . import llm_usage
+
+# Per-section budget of the council. A full run is Legion (5 calls) + Nexus (2) + up to
+# COUNCIL_MAX_LOOPS review cycles (Inquisitor 2 + Artisan 1), so 16 leaves room for every cycle.
+COUNCIL_MAX_CALLS = int(os.environ.get("COUNCIL_MAX_CALLS", "16"))
+COUNCIL_MAX_SECONDS = float(os.environ.get("COUNCIL_MAX_SECONDS", "300"))
+# The Inquisitor's prompt shows 85 as its example score, so a copied example does not pass
+COUNCIL_TARGET_SCORE = float(os.environ.get("COUNCIL_TARGET_SCORE", "86"))
+COUNCIL_MAX_LOOPS = 3
+# Calls one Inquisitor + Artisan cycle takes, when nothing is retried
+CYCLE_CALLS = 3
+
+
+@dataclass
+class CouncilBudget:
+    """Limits on one section's council run; the review loop ends early once target_score is met."""
+    max_calls: int = COUNCIL_MAX_CALLS
+    max_seconds: float = COUNCIL_MAX_SECONDS
+    target_score: float = COUNCIL_TARGET_SCORE
+    max_loops: int = COUNCIL_MAX_LOOPS
+
+
+def _score(review: dict) -> float:
+    try:
+        return float(review.get('score', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _out_of_budget(budget: CouncilBudget, calls: int, elapsed: float, cycle_seconds: float, calls_needed: int):
+    """Why the next step would overrun the budget, or None if it fits."""
+    if calls + calls_needed > budget.max_calls:
+        return "max_calls"
+    if elapsed + cycle_seconds > budget.max_seconds:
+        return "max_seconds"
+    return None
+
+
+async def run_council(section_title: str, topic: str, context: str, update_status_callback=None,
+                      budget: CouncilBudget = None) -> str:
+    """
+    The recursive loop of the Council. The review loop stops as soon as the Inquisitor approves
+    the draft at budget.target_score, or before a cycle that would overrun the budget.
+    """
+    budget = budget or CouncilBudget()
+    started = time.perf_counter()
+
+    with llm_usage.meter() as calls:
+        if update_status_callback: update_status_callback(f"The Legion is generating variants for '{section_title}'...")
+
+        # Step 1: Legion
+        with llm_usage.stage("legion"):
+            drafts = await agent_legion(section_title, topic, context)
+
+        if update_status_callback: update_status_callback(f"The Nexus is merging {len(drafts)} drafts...")
+
+        # Step 2: Nexus
+        with llm_usage.stage("nexus"):
+            master_draft = await agent_nexus(drafts, section_title)
+
+        # Step 3: Optimization Loop (Inquisitor <-> Artisan)
+        current_content = master_draft
+        polished = False
+        stop_reason, score, cycles = "max_loops", None, 0
+        cycle_seconds = 0.0
+
+        for i in range(budget.max_loops):
+            stop_reason = _out_of_budget(budget, calls.calls, time.perf_counter() - started, cycle_seconds, CYCLE_CALLS)
+            if stop_reason:
+                break
+            stop_reason = "max_loops"
+            cycle_started = time.perf_counter()
+            cycles += 1
+            if update_status_callback: update_status_callback(f"Council Review Cycle {i+1}: Inquisitor & Artisan working...")
+
+            # Inquisitor Check
+            with llm_usage.stage("inquisitor"):
+                review = await agent_inquisitor(current_content, topic)
+            score = _score(review)
+            print(f"    >>> Inquisitor Status: {review.get('status')} (Score: {review.get('score')})")
+
+            if review.get('status') == 'APPROVED' and score >= budget.target_score:
+                stop_reason = "target_score"
+                # The Nexus draft still gets one polish pass; an Artisan rewrite has had it already
+                if not polished and not _out_of_budget(budget, calls.calls, time.perf_counter() - started, 0.0, 1):
+                    with llm_usage.stage("artisan"):
+                        current_content = await agent_artisan(current_content)
+                break
+
+            # If Rejected or Low Score, Artisan fixes it based on critique
+            critique = review.get('critique', 'Improve verification and flow.')
+            with llm_usage.stage("artisan"):
+                current_content = await agent_artisan(current_content, critique)
+            polished = True
+            cycle_seconds = time.perf_counter() - cycle_started
 
-async def run_council(section_title: str, topic: str, context: str, update_status_callback=None) -> str:
-    """The recursive loop of the Council"""
-    
-    if update_status_callback: update_status_callback(f"The Legion is generating variants for '{section_title}'...")
-    
-    # Step 1: Legion
-    drafts = await agent_legion(section_title, topic, context)
-    
-    if update_status_callback: update_status_callback(f"The Nexus is merging {len(drafts)} drafts...")
-    
-    # Step 2: Nexus
-    master_draft = await agent_nexus(drafts, section_title)
-    
-    # Step 3: Optimization Loop (Inquisitor <-> Artisan)
-    max_loops = 3
-    current_content = master_draft
-    
-    for i in range(max_loops):
-        if update_status_callback: update_status_callback(f"Council Review Cycle {i+1}: Inquisitor & Artisan working...")
-        
-        # Inquisitor Check
-        review = await agent_inquisitor(current_content, topic)
-        print(f"    >>> Inquisitor Status: {review.get('status')} (Score: {review.get('score')})")
-        
-        if review.get('status') == 'APPROVED' and review.get('score', 0) > 85:
-            # Final Polish pass even if approved
-            final_polish = await agent_artisan(current_content)
-            return final_polish
-            
-        # If Rejected or Low Score, Artisan fixes it based on critique
-        critique = review.get('critique', 'Improve verification and flow.')
-        current_content = await agent_artisan(current_content, critique)
-    
+    seconds = time.perf_counter() - started
+    if update_status_callback:
+        update_status_callback(
+            f"    > Council finished '{section_title}': {calls.calls} calls, {cycles} review cycles, "
+            f"{seconds:.0f}s (stopped: {stop_reason})"
+        )
+    ledger = llm_usage.current_ledger()
+    if ledger is not None:
+        ledger.add_section(section_title, calls=calls.calls, cache_hits=calls.cache_hits, review_cycles=cycles,
+                           score=score, stop_reason=stop_reason, seconds=round(seconds, 3))
     return current_content
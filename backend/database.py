@@ -1,12 +1,16 @@
 import os
+import json
+import zlib
+import base64
 from datetime import datetime, timezone
 from contextlib import contextmanager
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, event
-from sqlalchemy.orm import sessionmaker, relationship, declarative_base, Session
+from sqlalchemy import create_engine, Column, Integer, String, Text, LargeBinary, DateTime, JSON, ForeignKey, Index, event, and_, or_, select, update
+from sqlalchemy.orm import sessionmaker, relationship, declarative_base, joinedload, Session
 from sqlalchemy.engine import Engine
 from sqlalchemy.pool import QueuePool, StaticPool
-from typing import Generator
+from typing import Generator, Optional, Tuple
 
+from . import search_index
 from .logging_config import setup_logging
 
 logger = setup_logging("scholarforge.database")
@@ -49,15 +53,55 @@ else:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+REPORT_COMPRESSION_LEVEL = int(os.environ.get("REPORT_COMPRESSION_LEVEL", "6"))
+
+
+def compress_content(content: str) -> dict:
+    """Column values for a ReportBody holding `content`."""
+    raw = content.encode("utf-8")
+    return {"data": zlib.compress(raw, REPORT_COMPRESSION_LEVEL), "size": len(raw)}
+
+
+def decompress_content(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
 class ReportDB(Base):
     __tablename__ = "reports"
+    __table_args__ = (Index("ix_reports_created_at_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     topic = Column(String, index=True)
-    content = Column(Text)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Per-stage LLM calls, tokens, latency, fallbacks and errors of the run that produced the report
+    llm_usage = Column(JSON, nullable=True)
+    # Loaded only when the content is read, so listings never touch report bodies
+    body = relationship("ReportBody", back_populates="report", uselist=False, cascade="all, delete-orphan")
+
+    @property
+    def content(self) -> Optional[str]:
+        return decompress_content(self.body.data) if self.body is not None else None
+
+    @content.setter
+    def content(self, value: Optional[str]):
+        if value is None:
+            self.body = None
+        elif self.body is None:
+            self.body = ReportBody(**compress_content(value))
+        else:
+            for key, column_value in compress_content(value).items():
+                setattr(self.body, key, column_value)
+
+class ReportBody(Base):
+    """zlib-compressed report markdown, one row per report."""
+    __tablename__ = "report_bodies"
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed UTF-8 bytes
+    report = relationship("ReportDB", back_populates="body")
 
 class ProjectFolder(Base):
     __tablename__ = "project_folders"
+    __table_args__ = (Index("ix_project_folders_created_at_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -65,15 +109,20 @@ class ProjectFolder(Base):
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (Index("ix_chat_sessions_folder_id_created_at", "folder_id", "created_at"),)
     id = Column(Integer, primary_key=True, index=True)
     folder_id = Column(Integer, ForeignKey("project_folders.id")) 
     title = Column(String)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Rolling summary of every message up to and including summary_through_id
+    summary = Column(Text, nullable=True)
+    summary_through_id = Column(Integer, nullable=True)
     folder = relationship("ProjectFolder", back_populates="sessions")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (Index("ix_chat_messages_session_id_created_at_id", "session_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("chat_sessions.id"))
     role = Column(String)
@@ -83,11 +132,88 @@ class ChatMessage(Base):
 
 class Hook(Base):
     __tablename__ = "hooks"
+    __table_args__ = (Index("ix_hooks_created_at_id", "created_at", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
+# ============================================================================
+# SEARCH INDEX MAINTENANCE
+# ============================================================================
+
+SEARCH_REBUILD_BATCH = 500
+
+
+def rebuild_search_index(connection):
+    """Indexes every report, hook and message; used when the index is created on an existing database."""
+    sources = [
+        ("report", select(ReportDB.id, ReportDB.topic, ReportBody.data).join(ReportBody, ReportBody.report_id == ReportDB.id),
+         ReportDB.id, lambda row: dict(body=decompress_content(row.data), title=row.topic)),
+        ("hook", select(Hook.id, Hook.content), Hook.id, lambda row: dict(body=row.content)),
+        ("message", select(ChatMessage.id, ChatMessage.content, ChatMessage.session_id), ChatMessage.id,
+         lambda row: dict(body=row.content, parent_id=row.session_id)),
+    ]
+    for kind, stmt, id_column, fields in sources:
+        last_id = 0
+        while True:
+            rows = connection.execute(stmt.where(id_column > last_id).order_by(id_column).limit(SEARCH_REBUILD_BATCH)).all()
+            if not rows:
+                break
+            for row in rows:
+                search_index.index_document(connection, kind, row.id, **fields(row))
+            last_id = rows[-1].id
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    if not search_index.is_supported(connection) or search_index.exists(connection):
+        return
+    search_index.create(connection)
+    rebuild_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    search_index.drop(connection)
+
+
+@event.listens_for(ReportBody, "after_insert")
+@event.listens_for(ReportBody, "after_update")
+def _index_report_body(mapper, connection, target):
+    topic = connection.execute(select(ReportDB.topic).where(ReportDB.id == target.report_id)).scalar()
+    search_index.index_document(connection, "report", target.report_id, decompress_content(target.data), title=topic)
+
+
+@event.listens_for(ReportBody, "after_delete")
+@event.listens_for(ReportDB, "after_delete")
+def _unindex_report(mapper, connection, target):
+    report_id = target.report_id if isinstance(target, ReportBody) else target.id
+    search_index.remove_documents(connection, "report", [report_id])
+
+
+@event.listens_for(Hook, "after_insert")
+@event.listens_for(Hook, "after_update")
+def _index_hook(mapper, connection, target):
+    search_index.index_document(connection, "hook", target.id, target.content)
+
+
+@event.listens_for(Hook, "after_delete")
+def _unindex_hook(mapper, connection, target):
+    search_index.remove_documents(connection, "hook", [target.id])
+
+
+@event.listens_for(ChatMessage, "after_insert")
+@event.listens_for(ChatMessage, "after_update")
+def _index_message(mapper, connection, target):
+    search_index.index_document(connection, "message", target.id, target.content, parent_id=target.session_id)
+
+
+@event.listens_for(ChatMessage, "after_delete")
+def _unindex_message(mapper, connection, target):
+    search_index.remove_documents(connection, "message", [target.id])
+
+
 # ============================================================================
 # DATABASE SESSION MANAGEMENT
 # ============================================================================
@@ -130,6 +256,74 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# ============================================================================
+# KEYSET PAGINATION
+# ============================================================================
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except Exception:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+
+
+def _page_limit(limit: Optional[int]) -> int:
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def _keyset_order(query, model, cursor: Optional[str], descending: bool = True):
+    """
+    Orders `query` by (created_at, id) and, given a cursor, keeps only the rows after it.
+    The range predicate is served by the composite index, so a page costs the same
+    however deep into the list it is.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > row_id)
+            ))
+    if descending:
+        return query.order_by(model.created_at.desc(), model.id.desc())
+    return query.order_by(model.created_at.asc(), model.id.asc())
+
+
+def _split_page(rows: list, limit: int, key=lambda row: (row.created_at, row.id)):
+    """Trims the extra look-ahead row and returns (rows, next_cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+def _keyset_page(query, model, limit: int, cursor: Optional[str], descending: bool = True):
+    """Returns (rows, next_cursor) for one page of `query` ordered by (created_at, id)."""
+    limit = _page_limit(limit)
+    rows = _keyset_order(query, model, cursor, descending).limit(limit + 1).all()
+    return _split_page(rows, limit)
+
+
 def init_db():
     """Initialize database: create tables if they don't exist."""
     try:
@@ -185,23 +379,60 @@ def delete_folder(folder_id: int):
         logger.error(f"Error deleting folder {folder_id}: {e}")
         raise
 
+def _folders_with_sessions(db: Session, folders) -> list:
+    """
+    Loads `folders` (a table or subquery with id, name and created_at) and their sessions in one
+    outer-joined column query, ordered by the database: folders newest first, and each
+    folder's sessions newest first.
+    """
+    rows = (
+        db.query(folders.c.id, folders.c.name, folders.c.created_at, ChatSession.id, ChatSession.title, ChatSession.created_at)
+        .outerjoin(ChatSession, ChatSession.folder_id == folders.c.id)
+        .order_by(folders.c.created_at.desc(), folders.c.id.desc(), ChatSession.created_at.desc(), ChatSession.id.desc())
+        .all()
+    )
+    result = {}
+    for folder_id, name, folder_created_at, session_id, title, session_created_at in rows:
+        folder = result.get(folder_id)
+        if folder is None:
+            folder = result[folder_id] = {"id": folder_id, "name": name, "created_at": folder_created_at, "sessions": []}
+        if session_id is not None:
+            folder["sessions"].append({
+                "id": session_id,
+                "title": title,
+                "created_at": session_created_at.strftime("%b %d, %H:%M") if session_created_at else None
+            })
+    return list(result.values())
+
 def get_folders_with_sessions():
     try:
         with get_db_session() as db:
-            folders = db.query(ProjectFolder).order_by(ProjectFolder.created_at.desc()).all()
-            result = []
-            for f in folders:
-                sessions = sorted(f.sessions, key=lambda s: s.created_at, reverse=True)
-                result.append({
-                    "id": f.id,
-                    "name": f.name,
-                    "sessions": [{"id": s.id, "title": s.title, "created_at": s.created_at.strftime("%b %d, %H:%M") if s.created_at else None} for s in sessions]
-                })
+            result = _folders_with_sessions(db, ProjectFolder.__table__)
+            for folder in result:
+                del folder["created_at"]
             return result
     except Exception as e:
         logger.error(f"Error fetching folders: {e}")
         raise
 
+def get_folders_page(limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+    """One page of folders (newest first) with their sessions, and the cursor for the next page."""
+    try:
+        with get_db_session() as db:
+            limit = _page_limit(limit)
+            page = _keyset_order(
+                db.query(ProjectFolder.id, ProjectFolder.name, ProjectFolder.created_at), ProjectFolder, cursor
+            ).limit(limit + 1).subquery()
+            folders, next_cursor = _split_page(
+                _folders_with_sessions(db, page), limit, key=lambda f: (f["created_at"], f["id"])
+            )
+            for folder in folders:
+                del folder["created_at"]
+            return folders, next_cursor
+    except Exception as e:
+        logger.error(f"Error fetching folders page: {e}")
+        raise
+
 def create_chat_session(folder_id: int, title: str):
     try:
         with get_db_session() as db:
@@ -263,6 +494,102 @@ def get_session_messages(session_id: int):
         logger.error(f"Error retrieving session messages {session_id}: {e}")
         raise
 
+def get_session_messages_page(session_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None,
+                              newest_first: bool = False):
+    """
+    One page of a session's messages in chronological order (or newest first, for loading
+    a long chat from its end), and the cursor for the next page.
+    """
+    try:
+        with get_db_session() as db:
+            query = db.query(ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.created_at).filter(
+                ChatMessage.session_id == session_id
+            )
+            return _keyset_page(query, ChatMessage, limit, cursor, descending=newest_first)
+    except Exception as e:
+        logger.error(f"Error retrieving session messages page {session_id}: {e}")
+        raise
+
+def chat_summary_stmt(session_id: int):
+    return select(ChatSession.summary, ChatSession.summary_through_id).where(ChatSession.id == session_id)
+
+def unsummarized_messages_stmt(session_id: int, through_id: Optional[int], oldest_first: bool = False):
+    """Messages not yet folded into the rolling summary, newest first unless `oldest_first`."""
+    stmt = select(ChatMessage.id, ChatMessage.role, ChatMessage.content).where(ChatMessage.session_id == session_id)
+    if through_id is not None:
+        stmt = stmt.where(ChatMessage.id > through_id)
+    if oldest_first:
+        return stmt.order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+    return stmt.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+
+def messages_to_fold_stmt(session_id: int, through_id: Optional[int], keep: int, limit: int):
+    """The oldest `limit` unsummarized messages outside the newest `keep`, oldest first."""
+    newest = unsummarized_messages_stmt(session_id, through_id).with_only_columns(ChatMessage.id).limit(keep)
+    return (
+        unsummarized_messages_stmt(session_id, through_id, oldest_first=True)
+        .where(ChatMessage.id.not_in(newest))
+        .limit(limit)
+    )
+
+def session_summary_update_stmt(session_id: int, summary: str, through_id: int, expected_through_id: Optional[int]):
+    current = ChatSession.summary_through_id
+    condition = current.is_(None) if expected_through_id is None else current == expected_through_id
+    return (
+        update(ChatSession)
+        .where(ChatSession.id == session_id, condition)
+        .values(summary=summary, summary_through_id=through_id)
+        .execution_options(synchronize_session=False)
+    )
+
+def report_body_update_stmt(report_id: int, content: str):
+    return update(ReportBody).where(ReportBody.report_id == report_id).values(**compress_content(content))
+
+def report_with_body_stmt(report_id: int):
+    return select(ReportDB).options(joinedload(ReportDB.body)).where(ReportDB.id == report_id)
+
+def get_chat_context(session_id: int, limit: int):
+    """
+    Returns (summary, summary_through_id, messages) for building a chat prompt: the session's
+    rolling summary and at most `limit` of the newest messages not yet folded into it, oldest first.
+    """
+    try:
+        with get_db_session() as db:
+            session = db.execute(chat_summary_stmt(session_id)).first()
+            summary, through_id = (session.summary, session.summary_through_id) if session else (None, None)
+            recent = db.execute(unsummarized_messages_stmt(session_id, through_id).limit(limit)).all()
+            return summary, through_id, list(reversed(recent))
+    except Exception as e:
+        logger.error(f"Error retrieving chat context {session_id}: {e}")
+        raise
+
+def get_messages_to_fold(session_id: int, keep: int, limit: int):
+    """
+    Returns (summary, summary_through_id, messages) where messages are the oldest `limit`
+    unsummarized messages older than the newest `keep`, oldest first.
+    """
+    try:
+        with get_db_session() as db:
+            session = db.execute(chat_summary_stmt(session_id)).first()
+            summary, through_id = (session.summary, session.summary_through_id) if session else (None, None)
+            older = db.execute(messages_to_fold_stmt(session_id, through_id, keep, limit)).all()
+            return summary, through_id, list(older)
+    except Exception as e:
+        logger.error(f"Error retrieving messages to fold {session_id}: {e}")
+        raise
+
+def update_session_summary(session_id: int, summary: str, through_id: int, expected_through_id: Optional[int]) -> bool:
+    """
+    Stores a new rolling summary, unless another writer has moved summary_through_id
+    since `expected_through_id` was read. Returns whether the update was applied.
+    """
+    try:
+        with get_db_session() as db:
+            result = db.execute(session_summary_update_stmt(session_id, summary, through_id, expected_through_id))
+            return result.rowcount == 1
+    except Exception as e:
+        logger.error(f"Error updating summary for session {session_id}: {e}")
+        raise
+
 def save_chat_message(session_id: int, role: str, content: str):
     try:
         with get_db_session() as db:
@@ -273,10 +600,20 @@ def save_chat_message(session_id: int, role: str, content: str):
         logger.error(f"Error saving chat message: {e}")
         raise
 
-def save_report(topic: str, content: str):
+def save_chat_messages(session_id: int, messages: list):
+    """Appends (role, content) pairs to a session in one transaction, keeping their order."""
     try:
         with get_db_session() as db:
-            new_report = ReportDB(topic=topic, content=content)
+            db.add_all([ChatMessage(session_id=session_id, role=role, content=content) for role, content in messages])
+            logger.debug(f"Saved {len(messages)} messages to session {session_id}")
+    except Exception as e:
+        logger.error(f"Error saving chat messages: {e}")
+        raise
+
+def save_report(topic: str, content: str, llm_usage: dict = None):
+    try:
+        with get_db_session() as db:
+            new_report = ReportDB(topic=topic, content=content, llm_usage=llm_usage)
             db.add(new_report)
             logger.info(f"Saved report: {topic}")
     except Exception as e:
@@ -293,22 +630,75 @@ def get_all_reports():
         logger.error(f"Error retrieving reports: {e}")
         raise
 
+def get_reports_page(limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+    """One page of report metadata (newest first, no content), and the cursor for the next page."""
+    try:
+        with get_db_session() as db:
+            query = db.query(ReportDB.id, ReportDB.topic, ReportDB.created_at)
+            return _keyset_page(query, ReportDB, limit, cursor)
+    except Exception as e:
+        logger.error(f"Error retrieving reports page: {e}")
+        raise
+
+def get_report_meta(report_id: int):
+    """A report's id, topic, creation time and uncompressed content size, without reading its body."""
+    try:
+        with get_db_session() as db:
+            return (
+                db.query(ReportDB.id, ReportDB.topic, ReportDB.created_at, ReportBody.size)
+                .outerjoin(ReportBody, ReportBody.report_id == ReportDB.id)
+                .filter(ReportDB.id == report_id)
+                .first()
+            )
+    except Exception as e:
+        logger.error(f"Error retrieving report {report_id}: {e}")
+        raise
+
+def get_report_usage(report_id: int):
+    """A report's id, topic and stored LLM usage breakdown, without reading its body."""
+    try:
+        with get_db_session() as db:
+            return db.query(ReportDB.id, ReportDB.topic, ReportDB.llm_usage).filter(ReportDB.id == report_id).first()
+    except Exception as e:
+        logger.error(f"Error retrieving usage for report {report_id}: {e}")
+        raise
+
 def get_report_content(report_id: int):
+    """The report with its body loaded, detached so `content` stays readable after the session closes."""
     try:
         with get_db_session() as db:
-            report = db.query(ReportDB).filter(ReportDB.id == report_id).first()
+            report = db.execute(report_with_body_stmt(report_id)).scalars().first()
+            if report is not None:
+                db.expunge(report)
             logger.debug(f"Retrieved report content: {report_id}")
             return report
     except Exception as e:
         logger.error(f"Error retrieving report {report_id}: {e}")
         raise
 
+def update_report_content(report_id: int, content: str) -> bool:
+    """Replaces a report's content. Returns False if the report does not exist."""
+    try:
+        with get_db_session() as db:
+            report = db.query(ReportDB.topic).filter(ReportDB.id == report_id).first()
+            if report is None:
+                return False
+            if db.execute(report_body_update_stmt(report_id, content)).rowcount == 1:
+                # Bulk updates skip mapper events, so the search document is refreshed here
+                search_index.index_document(db.connection(), "report", report_id, content, title=report.topic)
+            else:
+                db.add(ReportBody(report_id=report_id, **compress_content(content)))
+            return True
+    except Exception as e:
+        logger.error(f"Error updating report {report_id}: {e}")
+        raise
+
 def delete_report(report_id: int):
     try:
         with get_db_session() as db:
-            report = db.query(ReportDB).filter(ReportDB.id == report_id).first()
-            if report:
-                db.delete(report)
+            db.query(ReportBody).filter(ReportBody.report_id == report_id).delete()
+            search_index.remove_documents(db.connection(), "report", [report_id])
+            if db.query(ReportDB).filter(ReportDB.id == report_id).delete():
                 logger.info(f"Deleted report: {report_id}")
                 return True
             logger.warning(f"Report not found: {report_id}")
@@ -320,6 +710,8 @@ def delete_report(report_id: int):
 def delete_all_reports():
     try:
         with get_db_session() as db:
+            db.query(ReportBody).delete()
+            search_index.clear(db.connection(), "report")
             count = db.query(ReportDB).delete()
             logger.info(f"Deleted all reports: {count} records")
             return True
@@ -347,6 +739,16 @@ def get_all_hooks():
         logger.error(f"Error retrieving hooks: {e}")
         raise
 
+def get_hooks_page(limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+    """One page of hooks (newest first), and the cursor for the next page."""
+    try:
+        with get_db_session() as db:
+            query = db.query(Hook.id, Hook.content, Hook.created_at)
+            return _keyset_page(query, Hook, limit, cursor)
+    except Exception as e:
+        logger.error(f"Error retrieving hooks page: {e}")
+        raise
+
 def delete_hook(hook_id: int):
     try:
         with get_db_session() as db:
@@ -359,4 +761,38 @@ def delete_hook(hook_id: int):
             return False
     except Exception as e:
         logger.error(f"Error deleting hook {hook_id}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+# ============================================================================
+# FULL-TEXT SEARCH
+# ============================================================================
+
+# Ranked results are paged by offset; deep pages are refused rather than scanned
+MAX_SEARCH_OFFSET = 1000
+
+
+def search_documents(query: str, kinds=search_index.KINDS, limit: int = 20, cursor: str = None):
+    """One page of ranked full-text hits over reports, hooks and messages, and the cursor for the next page."""
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    if not 0 <= offset <= MAX_SEARCH_OFFSET:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    limit = _page_limit(limit)
+    try:
+        with get_db_session() as db:
+            hits = search_index.search(db.connection(), query, kinds, limit + 1, offset)
+            hits, has_more = hits[:limit], len(hits) > limit
+            session_ids = {h.parent_id for h in hits if h.kind == "message"}
+            if session_ids:
+                titles = dict(db.query(ChatSession.id, ChatSession.title).filter(ChatSession.id.in_(session_ids)).all())
+                for hit in hits:
+                    if hit.kind == "message":
+                        hit.title = titles.get(hit.parent_id)
+            next_offset = offset + limit
+            return hits, (str(next_offset) if has_more and next_offset <= MAX_SEARCH_OFFSET else None)
+    except Exception as e:
+        logger.error(f"Error searching for {query!r}: {e}")
+        raise
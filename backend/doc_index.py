@@ -0,0 +1,290 @@
+"""
+Document Retrieval Index for ScholarForge
+Splits uploaded documents into overlapping chunks, embeds them on the CPU and answers top-k
+similarity queries, so each report section sees the passages relevant to it rather than the
+first pages of every file. Chunk vectors are stored on disk by the SHA-256 of the document text.
+"""
+import io
+import os
+import re
+import json
+import math
+import uuid
+import zlib
+import hashlib
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import extraction
+from .logging_config import setup_logging
+from .metrics import CACHE_REQUESTS
+
+logger = setup_logging("scholarforge.doc_index")
+
+DOC_INDEX_ENABLED = os.environ.get("DOC_INDEX_ENABLED", "true").lower() != "false"
+# A sentence-transformers model run on the CPU (install the `semantic` extra). "hashing" selects
+# the built-in hashing embedder, which is also the fallback when the model cannot be loaded:
+# no download, but lexical, so it adds little to the BM25 context selection.
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+HASHING_DIM = 1024
+
+CHUNK_CHARS = 1200
+CHUNK_OVERLAP = 200
+RETRIEVAL_TOP_K = int(os.environ.get("RETRIEVAL_TOP_K", "6"))
+# Excerpts sent with one section are capped at this many characters
+RETRIEVAL_MAX_CHARS = int(os.environ.get("RETRIEVAL_MAX_CHARS", "6000"))
+# Excerpts scoring below this are dropped; the cosine scale differs between the embedders
+RETRIEVAL_MIN_SCORE = 0.05
+SEMANTIC_MIN_SCORE = float(os.environ.get("SEMANTIC_MIN_SCORE", "0.25"))
+
+VECTOR_STORE_ENABLED = os.environ.get("VECTOR_STORE_ENABLED", "true").lower() != "false"
+VECTOR_STORE_DIR = os.environ.get("VECTOR_STORE_DIR", os.path.join(extraction.BASE_DIR, "data", "vectors"))
+VECTOR_STORE_MAX_BYTES = int(os.environ.get("VECTOR_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have in into is it its of on or that the their "
+    "there these this those to was were which with will not can also than then such".split()
+)
+
+_embedder = None
+_embedder_lock = threading.Lock()
+_store_lock = threading.Lock()
+_writes_since_check = 0
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords."""
+    return [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+
+
+@dataclass
+class Chunk:
+    doc: str
+    index: int
+    text: str
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Splits text into chunks of at most `size` characters that overlap by about `overlap`.
+    Chunks end at a paragraph, sentence or word boundary where one is available.
+    """
+    text = re.sub(r"[ \t]+", " ", text or "").strip()
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            for separator in ("\n\n", ". ", "\n", " "):
+                cut = text.rfind(separator, start + size // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+        space = text.find(" ", start, end)
+        if space != -1:
+            start = space + 1
+    return chunks
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of word unigrams and bigrams with sublinear term weights.
+    Deterministic across processes (crc32, not the salted built-in hash), so stored vectors stay valid.
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self.min_score = RETRIEVAL_MIN_SCORE
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        words = tokenize(text)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in Counter(self._features(text)).items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign * (1.0 + math.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    """A local sentence-transformers model on the CPU, producing normalised embeddings."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = "st-" + re.sub(r"\W+", "-", model_name)
+        self.min_score = SEMANTIC_MIN_SCORE
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def get_embedder():
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            if EMBEDDING_MODEL and EMBEDDING_MODEL != "hashing":
+                try:
+                    _embedder = SentenceTransformerEmbedder(EMBEDDING_MODEL)
+                    logger.info(f"Document retrieval uses {EMBEDDING_MODEL}")
+                except ImportError as e:
+                    logger.warning(
+                        f"sentence-transformers is not installed (pip install 'scholarforge[semantic]'); "
+                        f"document retrieval falls back to the lexical hashing embedder: {e}"
+                    )
+                except Exception as e:
+                    logger.warning(f"Embedding model {EMBEDDING_MODEL} unavailable, using hashing embedder: {e}")
+            if _embedder is None:
+                _embedder = HashingEmbedder()
+        return _embedder
+
+
+class VectorIndex:
+    """
+    Exact inner-product search over normalised chunk vectors. A report's uploads come to a few
+    thousand chunks at most, where one matrix product beats building an approximate index.
+    """
+
+    def __init__(self, vectors: np.ndarray, chunks: List[Chunk], embedder):
+        self.vectors = vectors.astype(np.float32, copy=False)
+        self.chunks = chunks
+        self.embedder = embedder
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def search_many(self, queries: Sequence[str], k: int = RETRIEVAL_TOP_K) -> List[List[Tuple[float, Chunk]]]:
+        """The top `k` (score, chunk) pairs for each query, best first."""
+        if not queries or not self.chunks:
+            return [[] for _ in queries]
+        k = min(k, len(self.chunks))
+        scores = self.embedder.embed(queries) @ self.vectors.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ranked = sorted(candidates, key=lambda i: -scores[row, i])
+            results.append([(float(scores[row, i]), self.chunks[i]) for i in ranked])
+        return results
+
+    def excerpts_for(self, queries: Sequence[str], k: int = RETRIEVAL_TOP_K, max_chars: int = RETRIEVAL_MAX_CHARS) -> List[str]:
+        """Formatted excerpts for each query, empty where nothing scores above the embedder's min_score."""
+        min_score = getattr(self.embedder, "min_score", RETRIEVAL_MIN_SCORE)
+        return [format_excerpts(hits, max_chars, min_score) for hits in self.search_many(queries, k)]
+
+
+def format_excerpts(hits: List[Tuple[float, Chunk]], max_chars: int = RETRIEVAL_MAX_CHARS,
+                    min_score: float = RETRIEVAL_MIN_SCORE) -> str:
+    parts, used = [], 0
+    for score, chunk in hits:
+        if score < min_score:
+            break
+        entry = f"[{chunk.doc}, passage {chunk.index + 1}]\n{chunk.text}\n"
+        if used + len(entry) > max_chars:
+            break
+        parts.append(entry)
+        used += len(entry)
+    if not parts:
+        return ""
+    return "--- RELEVANT EXCERPTS FROM UPLOADED DOCUMENTS ---\n" + "\n".join(parts)
+
+
+def _store_path(digest: str, embedder_name: str) -> str:
+    return os.path.join(VECTOR_STORE_DIR, digest[:2], f"{digest}-{embedder_name}-{CHUNK_CHARS}-{CHUNK_OVERLAP}.npz")
+
+
+def store_get(digest: str, embedder_name: str) -> Optional[Tuple[np.ndarray, List[str]]]:
+    """Stored (vectors, chunk texts) for a document digest, or None. A hit refreshes the entry's LRU position."""
+    if not VECTOR_STORE_ENABLED:
+        return None
+    path = _store_path(digest, embedder_name)
+    try:
+        with np.load(path) as data:
+            vectors = data["vectors"].astype(np.float32)
+            texts = json.loads(data["texts"].tobytes().decode("utf-8"))
+        os.utime(path)
+    except FileNotFoundError:
+        CACHE_REQUESTS.labels(cache="vectors", result="miss").inc()
+        return None
+    except Exception as e:
+        logger.warning(f"Vector store read failed for {digest[:12]}: {e}")
+        return None
+    CACHE_REQUESTS.labels(cache="vectors", result="hit_disk").inc()
+    return vectors, texts
+
+
+def store_set(digest: str, embedder_name: str, vectors: np.ndarray, texts: List[str]):
+    global _writes_since_check
+    if not VECTOR_STORE_ENABLED:
+        return
+    path = _store_path(digest, embedder_name)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    buffer = io.BytesIO()
+    # float16 halves the footprint; the rounding is far below what changes a ranking
+    np.savez(buffer, vectors=vectors.astype(np.float16),
+             texts=np.frombuffer(json.dumps(texts).encode("utf-8"), dtype=np.uint8))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Vector store write failed for {digest[:12]}: {e}")
+        return
+    with _store_lock:
+        _writes_since_check += 1
+        due = _writes_since_check >= extraction.EVICTION_CHECK_INTERVAL
+        if due:
+            _writes_since_check = 0
+    if due:
+        evict()
+
+
+def evict(max_bytes: int = None) -> int:
+    max_bytes = VECTOR_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    return extraction.evict_directory(VECTOR_STORE_DIR, max_bytes, "vectors")
+
+
+def build_index(documents: Sequence[Tuple[str, str]], embedder=None) -> Optional[VectorIndex]:
+    """
+    Chunks and embeds each (name, text) document, reusing stored vectors for documents seen
+    before. Returns None if there is nothing to index.
+    """
+    embedder = embedder or get_embedder()
+    all_vectors, all_chunks = [], []
+    for name, text in documents:
+        if not text or not text.strip():
+            continue
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        stored = store_get(digest, embedder.name)
+        if stored is not None:
+            vectors, texts = stored
+        else:
+            texts = chunk_text(text)
+            if not texts:
+                continue
+            vectors = embedder.embed(texts)
+            store_set(digest, embedder.name, vectors, texts)
+        all_vectors.append(vectors)
+        all_chunks.extend(Chunk(name, i, chunk) for i, chunk in enumerate(texts))
+    if not all_chunks:
+        return None
+    return VectorIndex(np.vstack(all_vectors), all_chunks, embedder)
@@ -0,0 +1,218 @@
+"""
+Document Text Extraction for ScholarForge
+Shared PDF/DOCX/TXT extraction for chat attachments and report uploads. Parsing runs in a
+process pool (a thread pool inside daemonic Celery workers, which cannot fork children),
+files are parsed in parallel, and each parser stops as soon as its character budget is met.
+Extracted text is cached on disk by the SHA-256 of the file bytes, so repeat uploads skip parsing.
+"""
+import os
+import uuid
+import asyncio
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from .logging_config import setup_logging
+from .metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+logger = setup_logging("scholarforge.extraction")
+
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt", ".md")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXTRACTION_CACHE_ENABLED = os.environ.get("EXTRACTION_CACHE_ENABLED", "true").lower() != "false"
+EXTRACTION_CACHE_DIR = os.environ.get("EXTRACTION_CACHE_DIR", os.path.join(BASE_DIR, "data", "extracted"))
+# Least recently used entries are evicted once the directory grows past this size.
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+EVICTION_CHECK_INTERVAL = 50
+
+_executor = None
+_cache_lock = threading.Lock()
+_writes_since_check = 0
+
+
+class UnsupportedFileType(Exception):
+    """Raised for uploads whose extension has no parser."""
+
+
+def is_supported(filename: str) -> bool:
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def _extract_pdf(content: bytes, max_chars: int, max_pages: Optional[int]) -> str:
+    import fitz
+    parts, total = [], 0
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        for i, page in enumerate(doc):
+            if max_pages is not None and i >= max_pages:
+                break
+            text = page.get_text() + "\n"
+            parts.append(text)
+            total += len(text)
+            if total >= max_chars:
+                break
+    return "".join(parts)
+
+
+def _extract_docx(content: bytes, max_chars: int) -> str:
+    from docx import Document
+    parts, total = [], 0
+    for para in Document(BytesIO(content)).paragraphs:
+        parts.append(para.text + "\n")
+        total += len(para.text) + 1
+        if total >= max_chars:
+            break
+    return "".join(parts)
+
+
+def extract_text(filename: str, content: bytes, max_chars: int, max_pages: Optional[int] = None) -> str:
+    """
+    Extracts at most `max_chars` characters from one file. Runs inside pool workers,
+    so it only takes picklable arguments. Raises UnsupportedFileType for unknown extensions.
+    """
+    name = filename.lower()
+    if name.endswith(".pdf"):
+        text = _extract_pdf(content, max_chars, max_pages)
+    elif name.endswith(".docx"):
+        text = _extract_docx(content, max_chars)
+    elif name.endswith((".txt", ".md")):
+        # UTF-8 needs at most 4 bytes per character, so this slice always covers the budget
+        text = content[:max_chars * 4].decode("utf-8", errors="ignore")
+    else:
+        raise UnsupportedFileType(filename)
+    return text[:max_chars]
+
+
+def _cache_path(digest: str, max_chars: int, max_pages: Optional[int]) -> str:
+    # Budgets are part of the key: the same file extracted with a larger budget yields more text
+    return os.path.join(EXTRACTION_CACHE_DIR, digest[:2], f"{digest}-{max_chars}-{max_pages or 0}.txt")
+
+
+def cache_get(digest: str, max_chars: int, max_pages: Optional[int] = None) -> Optional[str]:
+    """Returns cached text for a file digest and budget, or None. A hit refreshes the entry's LRU position."""
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    path = _cache_path(digest, max_chars, max_pages)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        os.utime(path)
+    except FileNotFoundError:
+        CACHE_REQUESTS.labels(cache="extraction", result="miss").inc()
+        return None
+    except OSError as e:
+        logger.warning(f"Extraction cache read failed for {digest[:12]}: {e}")
+        return None
+    CACHE_REQUESTS.labels(cache="extraction", result="hit_disk").inc()
+    return text
+
+
+def cache_set(digest: str, max_chars: int, max_pages: Optional[int], text: str):
+    global _writes_since_check
+    if not EXTRACTION_CACHE_ENABLED:
+        return
+    path = _cache_path(digest, max_chars, max_pages)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Extraction cache write failed for {digest[:12]}: {e}")
+        return
+    with _cache_lock:
+        _writes_since_check += 1
+        due = _writes_since_check >= EVICTION_CHECK_INTERVAL
+        if due:
+            _writes_since_check = 0
+    if due:
+        evict()
+
+
+def evict_directory(directory: str, max_bytes: int, cache: str) -> int:
+    """
+    Deletes the least recently used files under `directory` until it fits in `max_bytes`.
+    Returns the number removed. Shared by the on-disk caches, which touch entries on every hit.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    entries, total = [], 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    if removed:
+        CACHE_EVICTIONS.labels(cache=cache).inc(removed)
+        logger.info(f"Evicted {removed} {cache} cache entries")
+    return removed
+
+
+def evict(max_bytes: int = None) -> int:
+    """Deletes least recently used entries until the cache fits in `max_bytes`. Returns the number removed."""
+    max_bytes = EXTRACTION_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    return evict_directory(EXTRACTION_CACHE_DIR, max_bytes, "extraction")
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        workers = max(1, EXTRACTION_WORKERS)
+        if EXTRACTION_WORKERS <= 0 or multiprocessing.current_process().daemon:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract")
+        else:
+            # spawn avoids forking a process that already runs threads and an event loop
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def extract_many(files: List[Tuple[str, bytes]], max_chars: int, max_pages: Optional[int] = None) -> List:
+    """
+    Extracts every (filename, content) pair in parallel. Returns one entry per file, in
+    order: the extracted text, or the exception raised for that file.
+    """
+    digests = [hashlib.sha256(content).hexdigest() for _, content in files]
+    results = [cache_get(d, max_chars, max_pages) for d in digests]
+    executor = _get_executor()
+    futures = {
+        i: executor.submit(extract_text, name, content, max_chars, max_pages)
+        for i, (name, content) in enumerate(files) if results[i] is None
+    }
+    for i, future in futures.items():
+        try:
+            results[i] = future.result()
+            cache_set(digests[i], max_chars, max_pages, results[i])
+        except Exception as e:
+            results[i] = e
+    return results
+
+
+async def extract_many_async(files: List[Tuple[str, bytes]], max_chars: int, max_pages: Optional[int] = None) -> List:
+    """Async counterpart of extract_many; the event loop only awaits the pool."""
+    return await asyncio.to_thread(extract_many, files, max_chars, max_pages)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
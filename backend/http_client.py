@@ -0,0 +1,107 @@
+"""
+Shared HTTP Client Registry for ScholarForge
+Process-wide pooled httpx clients so LLM and search calls reuse keep-alive connections
+instead of paying a fresh TCP+TLS handshake per request.
+"""
+import os
+import asyncio
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.http")
+
+# Per-host pool sizing. Every host gets its own client, so these limits apply per host.
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+MAX_KEEPALIVE_PER_HOST = int(os.environ.get("HTTP_MAX_KEEPALIVE_PER_HOST", "10"))
+KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "60"))
+DEFAULT_TIMEOUT = 120.0
+
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "true").lower() != "false"
+except ImportError:
+    HTTP2_ENABLED = False
+
+_lock = threading.Lock()
+_sync_clients: dict = {}
+# Async clients are bound to the event loop that created them, so they are kept per loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else "default"
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=MAX_KEEPALIVE_PER_HOST,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client(url: str) -> httpx.Client:
+    """Return the shared sync client for the host of `url`."""
+    key = _host_key(url)
+    client = _sync_clients.get(key)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _sync_clients.get(key)
+            if client is None or client.is_closed:
+                client = httpx.Client(
+                    http2=HTTP2_ENABLED, limits=_limits(), timeout=DEFAULT_TIMEOUT, follow_redirects=True
+                )
+                _sync_clients[key] = client
+                logger.debug(f"Opened pooled sync client for {key} (http2={HTTP2_ENABLED})")
+    return client
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """Return the shared async client for the host of `url` on the running event loop."""
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    key = _host_key(url)
+    client = clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED, limits=_limits(), timeout=DEFAULT_TIMEOUT, follow_redirects=True
+        )
+        clients[key] = client
+        logger.debug(f"Opened pooled async client for {key} (http2={HTTP2_ENABLED})")
+    return client
+
+
+def close_clients():
+    """Close every pooled sync client. Safe to call more than once."""
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client: {e}")
+
+
+async def aclose_clients():
+    """Close the pooled async clients owned by the running event loop."""
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing async HTTP client: {e}")
+
+
+def reset_after_fork():
+    """Drop clients inherited from a parent process without closing their sockets."""
+    with _lock:
+        _sync_clients.clear()
+    _async_clients.clear()
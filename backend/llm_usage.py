@@ -0,0 +1,180 @@
+"""
+LLM Usage Accounting for ScholarForge
+Records tokens, latency, fallbacks and errors of every model call, labelled by the pipeline stage
+held in a context variable, and totals them per report while a ledger is being tracked.
+"""
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import Counter
+from typing import Optional, Tuple
+
+import httpx
+
+from .model_router import router
+from .metrics import LLM_CALLS, LLM_ERRORS, LLM_FALLBACKS, LLM_LATENCY, LLM_TOKENS
+
+DEFAULT_STAGE = "other"
+FIELDS = ("calls", "errors", "fallbacks", "cache_hits", "prompt_tokens", "completion_tokens")
+
+# Context variables are copied into tasks and to_thread calls, so a stage set around a step
+# labels every call made under it, and concurrent sections each keep their own
+_stage: ContextVar[Optional[str]] = ContextVar("llm_stage", default=None)
+_ledger: ContextVar[Optional["UsageLedger"]] = ContextVar("llm_ledger", default=None)
+_meter: ContextVar[Optional["CallMeter"]] = ContextVar("llm_meter", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Labels LLM calls made inside the block, including tasks started from it, with `name`."""
+    token = _stage.set(name)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def current_stage(default: str = DEFAULT_STAGE) -> str:
+    return _stage.get() or default
+
+
+class UsageLedger:
+    """
+    Per-stage totals for one report run. `seconds` sums call latencies, so concurrent calls
+    can add up to more than the wall time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._models = Counter()
+        self._sections = {}
+        self._started = time.perf_counter()
+
+    def add(self, stage_name: str, model: str, seconds: float = 0.0, **counts):
+        with self._lock:
+            entry = self._stages.setdefault(stage_name, {**dict.fromkeys(FIELDS, 0), "seconds": 0.0})
+            entry["seconds"] += seconds
+            for field, value in counts.items():
+                entry[field] += value
+            if counts.get("calls"):
+                self._models[model] += counts["calls"]
+
+    def add_section(self, section: str, **info):
+        """Per-section details, such as the calls the council spent on it."""
+        with self._lock:
+            self._sections[section] = info
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = {name: {**entry, "seconds": round(entry["seconds"], 3)} for name, entry in sorted(self._stages.items())}
+            totals = {field: sum(entry[field] for entry in stages.values()) for field in FIELDS}
+            totals["llm_seconds"] = round(sum(entry["seconds"] for entry in stages.values()), 3)
+            totals["wall_seconds"] = round(time.perf_counter() - self._started, 3)
+            return {"stages": stages, "models": dict(self._models), "totals": totals, "sections": dict(self._sections)}
+
+
+@contextmanager
+def track():
+    """Collects the usage of every LLM call made inside the block into a new UsageLedger."""
+    ledger = UsageLedger()
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+
+def current_ledger() -> Optional[UsageLedger]:
+    return _ledger.get()
+
+
+class CallMeter:
+    """Calls made inside a meter() block, failed ones included; cache hits are counted apart."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.cache_hits = 0
+
+    def _add(self, calls: int = 0, cache_hits: int = 0):
+        with self._lock:
+            self.calls += calls
+            self.cache_hits += cache_hits
+
+
+@contextmanager
+def meter():
+    """Counts the LLM calls made inside the block, including tasks started from it."""
+    call_meter = CallMeter()
+    token = _meter.set(call_meter)
+    try:
+        yield call_meter
+    finally:
+        _meter.reset(token)
+
+
+def usage_tokens(body: Optional[dict]) -> Tuple[int, int]:
+    """(prompt, completion) tokens from an OpenAI-style response or final stream chunk."""
+    usage = (body or {}).get("usage") or {}
+    return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+
+
+def error_code(exc: BaseException) -> str:
+    return "timeout" if isinstance(exc, httpx.TimeoutException) else type(exc).__name__
+
+
+def record_call(model: str, seconds: float, body: dict = None, requested: str = None, stage_name: str = None):
+    """
+    A call that returned a completion. `body` is the provider's JSON (its usage block is read)
+    and `requested` the model first asked for, if this one answered as a fallback.
+    """
+    stage_name = stage_name or current_stage()
+    prompt_tokens, completion_tokens = usage_tokens(body)
+    fallback = bool(requested and requested != model)
+    router.record(model, True, seconds)
+    LLM_CALLS.labels(stage=stage_name, model=model, outcome="ok").inc()
+    LLM_LATENCY.labels(stage=stage_name, model=model).observe(seconds)
+    LLM_TOKENS.labels(stage=stage_name, model=model, type="prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(stage=stage_name, model=model, type="completion").inc(completion_tokens)
+    if fallback:
+        LLM_FALLBACKS.labels(stage=stage_name, requested=requested, served=model).inc()
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.add(stage_name, model, seconds, calls=1, fallbacks=int(fallback),
+                   prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    call_meter = _meter.get()
+    if call_meter is not None:
+        call_meter._add(calls=1)
+
+
+def record_error(model: str, seconds: float, code, stage_name: str = None):
+    """
+    A failed call; `code` is the HTTP status or error_code() of the exception. A 429 is
+    pacing, which the rate limiter handles, so it does not count against the model's health.
+    """
+    stage_name = stage_name or current_stage()
+    if str(code) == "429":
+        router.end_trial(model)
+    else:
+        router.record(model, False, seconds)
+    LLM_CALLS.labels(stage=stage_name, model=model, outcome="error").inc()
+    LLM_LATENCY.labels(stage=stage_name, model=model).observe(seconds)
+    LLM_ERRORS.labels(stage=stage_name, model=model, code=str(code)).inc()
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.add(stage_name, model, seconds, calls=1, errors=1)
+    call_meter = _meter.get()
+    if call_meter is not None:
+        call_meter._add(calls=1)
+
+
+def record_cache_hit(model: str, stage_name: str = None):
+    """A call answered from the LLM cache; Prometheus already counts these as cache requests."""
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.add(stage_name or current_stage(), model, cache_hits=1)
+    call_meter = _meter.get()
+    if call_meter is not None:
+        call_meter._add(cache_hits=1)
@@ -1,19 +1,20 @@
 import os
+import json
+import asyncio
+import anyio
 import urllib.parse
 import tempfile
-from typing import List 
+from typing import List, Optional
 from dotenv import load_dotenv
 load_dotenv()
-from fastapi import FastAPI, Request, Form, BackgroundTasks, HTTPException, UploadFile, File
+from fastapi import FastAPI, Request, Response, Query, Form, BackgroundTasks, HTTPException, UploadFile, File
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from celery.result import AsyncResult
-import fitz
-from docx import Document as DocxDocument
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -24,8 +25,16 @@ from prometheus_fastapi_instrumentator.metrics import default
 from .task import generate_report_task, celery_app
 from . import AI_engine 
 from . import chat_engine 
+from . import chat_context
 from . import report_formats
 from . import database
+from . import async_database
+from . import http_client
+from . import extraction
+from . import search_index
+from . import report_events
+from . import blob_store
+from . import llm_usage
 from .logging_config import setup_logging
 
 # Setup structured logging
@@ -40,6 +49,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Setup rate limiting
@@ -49,6 +59,10 @@ app.add_exception_handler(RateLimitExceeded, lambda request, exc: JSONResponse(
     status_code=429,
     content={"error": "Rate limit exceeded. Please try again later."}
 ))
+app.add_exception_handler(database.InvalidCursor, lambda request, exc: JSONResponse(
+    status_code=400,
+    content={"error": str(exc)}
+))
 
 app.add_middleware(SessionMiddleware, secret_key=os.environ.get("APP_SECRET_KEY", "super-secret-key"))
 
@@ -120,6 +134,16 @@ def startup():
     
     database.init_db()
     logger.info("Database initialized successfully")
+    if async_database.ASYNC_DB_ENABLED:
+        async_database.init_async_engine()
+
+@app.on_event("shutdown")
+async def shutdown():
+    logger.info("ScholarForge API shutting down...")
+    await http_client.aclose_clients()
+    http_client.close_clients()
+    extraction.shutdown()
+    await async_database.dispose()
 
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=5000, description="Chat message (1-5000 chars)")
@@ -156,9 +180,7 @@ async def health_check():
     
     try:
         # Check database connectivity
-        session = database.SessionLocal()
-        session.execute("SELECT 1")
-        session.close()
+        await async_database.ping()
         health_status["components"]["database"] = {"status": "ok"}
         logger.debug("Health check: Database OK")
     except Exception as e:
@@ -214,8 +236,18 @@ def reset_database():
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+PageLimit = Query(database.DEFAULT_PAGE_SIZE, ge=1, le=database.MAX_PAGE_SIZE)
+
+def _set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Pages keep their plain list bodies; the cursor for the next page travels in a header."""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
 @app.get("/api/folders")
-def get_folders(): return database.get_folders_with_sessions()
+def get_folders(response: Response, limit: int = PageLimit, cursor: Optional[str] = None):
+    folders, next_cursor = database.get_folders_page(limit, cursor)
+    _set_next_cursor(response, next_cursor)
+    return folders
 
 @app.post("/api/folders")
 def create_new_folder(data: CreateFolderRequest):
@@ -252,8 +284,10 @@ def delete_session(session_id: int):
     return JSONResponse(status_code=404, content={"error": "Not found"})
 
 @app.get("/api/sessions/{session_id}/messages")
-def get_history(session_id: int):
-    msgs = database.get_session_messages(session_id)
+def get_history(session_id: int, response: Response, limit: int = PageLimit, cursor: Optional[str] = None,
+                order: str = Query("asc", pattern="^(asc|desc)$")):
+    msgs, next_cursor = database.get_session_messages_page(session_id, limit, cursor, newest_first=order == "desc")
+    _set_next_cursor(response, next_cursor)
     return [{"role": m.role, "content": m.content} for m in msgs]
 
 @app.get("/api/sessions/{session_id}/info")
@@ -263,29 +297,26 @@ def get_session_info(session_id: int):
         return {"id": session.id, "title": session.title, "folder_id": session.folder_id}
     return JSONResponse(status_code=404, content={"error": "Session not found"})
 
-async def extract_text_from_file(file: UploadFile) -> str:
-    content = ""
-    try:
-        if file.filename.lower().endswith('.pdf'):
-            pdf_bytes = await file.read()
-            with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-                for page in doc:
-                    content += page.get_text() + "\n"
-        elif file.filename.lower().endswith('.docx'):
-            file_bytes = await file.read()
-            from io import BytesIO
-            doc = DocxDocument(BytesIO(file_bytes))
-            for para in doc.paragraphs:
-                content += para.text + "\n"
-        elif file.filename.lower().endswith('.txt') or file.filename.lower().endswith('.md'):
-            content = (await file.read()).decode('utf-8', errors='ignore')
+CHAT_FILE_CHAR_LIMIT = 20000
+
+async def extract_text_from_files(files: List[UploadFile]) -> str:
+    """Extracts all chat attachments in parallel, off the event loop."""
+    uploads = [f for f in files if f.filename]
+    contents = await asyncio.gather(*[f.read() for f in uploads])
+    results = await extraction.extract_many_async(
+        [(f.filename, content) for f, content in zip(uploads, contents)],
+        max_chars=CHAT_FILE_CHAR_LIMIT
+    )
+    parts = []
+    for file, result in zip(uploads, results):
+        if isinstance(result, extraction.UnsupportedFileType):
+            parts.append(f"[Unsupported file type: {file.filename}]")
+        elif isinstance(result, Exception):
+            logger.error(f"Error reading file {file.filename}: {result}", exc_info=result)
+            parts.append(f"[Error reading {file.filename}]")
         else:
-            return f"[Unsupported file type: {file.filename}]"
-            
-        return f"\n--- FILE: {file.filename} ---\n{content[:20000]}\n--------------------------\n"
-    except Exception as e:
-        logger.error(f"Error reading file {file.filename}: {e}", exc_info=e)
-        return f"[Error reading {file.filename}]"
+            parts.append(f"\n--- FILE: {file.filename} ---\n{result}\n--------------------------\n")
+    return "".join(parts)
 
 @app.post("/chat")
 @limiter.limit("30/minute")
@@ -301,12 +332,9 @@ async def chat(
         logger.info(f"Chat request: session_id={session_id}, model={model}, mode={mode}")
         file_context = ""
         if files:
-            for file in files:
-                if file.filename: 
-                    file_context += await extract_text_from_file(file)
+            file_context = await extract_text_from_files(files)
 
-        msgs = database.get_session_messages(session_id)
-        ctx = [{"role": m.role, "content": m.content} for m in msgs]
+        ctx = await chat_context.build_history(session_id)
         
         resp = await chat_engine.get_chat_response_async(
             user_message=message, 
@@ -321,8 +349,8 @@ async def chat(
             file_names = ", ".join([f.filename for f in files if f.filename])
             user_msg_content += f"\n\n[Attached: {file_names}]"
 
-        database.save_chat_message(session_id, "user", user_msg_content)
-        database.save_chat_message(session_id, "assistant", resp)
+        await async_database.save_chat_messages(session_id, [("user", user_msg_content), ("assistant", resp)])
+        chat_context.schedule_fold(session_id)
         
         logger.info(f"Chat response generated successfully for session {session_id}")
         return {'response': resp}
@@ -330,16 +358,111 @@ async def chat(
         logger.error(f"Chat Error: {e}", exc_info=e)
         raise  # Let the global exception handler catch it
 
+def _sse(event: str, data: dict) -> str:
+    """Formats one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+@limiter.limit("30/minute")
+async def chat_stream(
+    request: Request,
+    message: str = Form(...),
+    session_id: int = Form(...),
+    model: str = Form("default"),
+    mode: str = Form("normal"),
+    files: List[UploadFile] = File(None)
+):
+    """
+    Streaming variant of /chat. Emits `delta` events with text as it is generated,
+    then a single `done` (or `error`) event. The exchange is saved once the stream ends.
+    """
+    logger.info(f"Chat stream request: session_id={session_id}, model={model}, mode={mode}")
+    file_context = ""
+    if files:
+        file_context = await extract_text_from_files(files)
+
+    ctx = await chat_context.build_history(session_id)
+
+    user_msg_content = message
+    if file_context:
+        file_names = ", ".join([f.filename for f in files if f.filename])
+        user_msg_content += f"\n\n[Attached: {file_names}]"
+
+    async def event_stream():
+        parts = []
+        error = None
+        try:
+            async for delta in chat_engine.stream_chat_response_async(
+                user_message=message,
+                history=ctx,
+                model=model,
+                mode=mode,
+                file_context=file_context
+            ):
+                parts.append(delta)
+                yield _sse("delta", {"text": delta})
+        except chat_engine.ChatStreamError as e:
+            error = str(e)
+            yield _sse("error", {"error": error})
+        except Exception as e:
+            logger.error(f"Chat Stream Error: {e}", exc_info=e)
+            error = "An internal server error occurred. Please try again later."
+            yield _sse("error", {"error": error})
+        finally:
+            # Runs on normal completion, upstream failure and client disconnect alike
+            resp = "".join(parts).strip() or error
+            if resp:
+                # Shielded so the exchange is still saved when a client disconnect cancels the stream
+                with anyio.CancelScope(shield=True):
+                    await async_database.save_chat_messages(session_id, [("user", user_msg_content), ("assistant", resp)])
+                chat_context.schedule_fold(session_id)
+                logger.info(f"Chat stream saved for session {session_id}")
+        if error is None:
+            yield _sse("done", {"length": len("".join(parts))})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/history")
-def history():
-    reports = database.get_all_reports()
+def history(response: Response, limit: int = PageLimit, cursor: Optional[str] = None):
+    reports, next_cursor = database.get_reports_page(limit, cursor)
+    _set_next_cursor(response, next_cursor)
     return [{"id": r.id, "topic": r.topic, "date": r.created_at.strftime("%b %d, %H:%M")} for r in reports]
 
+@app.get("/api/search")
+def search_documents(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=database.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    kinds = kind or list(search_index.KINDS)
+    unknown = [k for k in kinds if k not in search_index.KINDS]
+    if unknown:
+        return JSONResponse(status_code=400, content={"error": f"Unknown kind: {', '.join(unknown)}"})
+    hits, next_cursor = database.search_documents(q, kinds, limit, cursor)
+    _set_next_cursor(response, next_cursor)
+    return [
+        {"type": h.kind, "id": h.ref_id, "session_id": h.parent_id, "title": h.title, "snippet": h.snippet, "score": round(h.score, 4)}
+        for h in hits
+    ]
+
 @app.get("/api/report/{id}")
 def get_rep(id: int):
     r = database.get_report_content(id)
     return {"topic": r.topic, "content": r.content} if r else {"error": "Not found"}
 
+@app.get("/api/report/{id}/usage")
+def get_rep_usage(id: int):
+    r = database.get_report_usage(id)
+    if r is None:
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+    return {"id": r.id, "topic": r.topic, "usage": r.llm_usage}
+
 @app.delete("/api/report/{id}")
 def del_rep(id: int):
     if database.delete_report(id): return {"status": "success"}
@@ -368,15 +491,17 @@ async def start_report(
             if not format_content: return JSONResponse({'error': 'Custom format needed'}, status_code=400)
             user_fmt = "custom" 
 
+        # Only blob references go through the broker; the worker reads the bytes from the spool
         file_data_list = []
         if pdf_files:
             for file in pdf_files:
                 if file.filename: 
-                    content = await file.read()
-                    file_data_list.append({'filename': file.filename, 'content': content})
+                    file_data_list.append(await blob_store.save_upload(file))
         
         task = generate_report_task.delay(query, user_fmt, page_count, file_data_list, use_council)
         logger.info(f"Report task queued with ID: {task.id}")
+        # Opens the task's event stream, so /report-stream can tell a queued task from an unknown one
+        await asyncio.to_thread(report_events.publish, task.id, report_events.STATUS, {"message": "Queued..."})
         return {"task_id": task.id}
     except Exception as e:
         logger.error(f"Report generation error: {e}", exc_info=e)
@@ -392,6 +517,63 @@ async def report_status(task_id: str):
     elif task.state == 'FAILURE': return {'status': 'FAILURE', 'error': str(task.info)}
     return {'status': task.state, 'message': task.info.get('message', 'Running...') if isinstance(task.info, dict) else 'Running...'}
 
+def _finished_task_event(task_id: str):
+    """(event, payload) for a task Celery has finished, or None while it is still pending or running."""
+    task = AsyncResult(task_id, app=celery_app)
+    if task.state == 'SUCCESS':
+        res = task.result
+        if not isinstance(res, dict):
+            return "unavailable", {"error": "Report events are unavailable"}
+        if res.get('status') == 'FAILURE':
+            return report_events.FAILED, {'error': res.get('error')}
+        return report_events.COMPLETE, {'report_content': res.get('report_content'), 'chart_path': res.get('chart_path')}
+    if task.state == 'FAILURE':
+        return report_events.FAILED, {'error': str(task.info)}
+    return None
+
+@app.get("/report-stream/{task_id}")
+async def report_stream(task_id: str, request: Request):
+    """
+    Server-Sent Events feed for a report task: `status`, `outline` and `section` events
+    as the worker progresses, ending with `complete` or `failed`. Supports resuming via
+    the Last-Event-ID header. If the event store is unreachable, or the task's events have
+    expired, an `unavailable` event is sent and clients should fall back to polling
+    /report-status. An unknown task id ends the stream with a `failed` event. While the
+    stream is idle the task's Celery state is checked, so a task whose terminal event never
+    reached the stream still ends it.
+    """
+    last_id = request.headers.get("last-event-id") or "0-0"
+
+    async def event_stream():
+        try:
+            async for stream_id, event, payload in report_events.subscribe(task_id, last_id):
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    finished = await asyncio.to_thread(_finished_task_event, task_id)
+                    if finished:
+                        yield _sse(*finished)
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {stream_id}\n" + _sse(event, payload)
+        except report_events.StreamNotFound:
+            state = await asyncio.to_thread(lambda: AsyncResult(task_id, app=celery_app).state)
+            if state == "PENDING":
+                # Celery reports unknown ids as PENDING; a queued task would already have a stream
+                yield _sse(report_events.FAILED, {"error": "Unknown or expired report task"})
+            else:
+                yield _sse("unavailable", {"error": "Report events have expired"})
+        except Exception as e:
+            logger.warning(f"Report stream unavailable for {task_id}: {e}")
+            yield _sse("unavailable", {"error": "Event stream unavailable"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 def cleanup(path):
     try: os.remove(path) 
     except Exception:
@@ -424,12 +606,13 @@ async def download(
 
 @app.post("/add-hook")
 async def add_hook(data: HookRequest):
-    try: database.save_hook(data.content); return {'status': 'success'}
+    try: await async_database.save_hook(data.content); return {'status': 'success'}
     except Exception as e: return {'status': 'error', 'message': str(e)}
 
 @app.get("/api/hooks")
-def get_hooks():
-    hooks = database.get_all_hooks()
+def get_hooks(response: Response, limit: int = PageLimit, cursor: Optional[str] = None):
+    hooks, next_cursor = database.get_hooks_page(limit, cursor)
+    _set_next_cursor(response, next_cursor)
     return [{"id": h.id, "content": h.content, "date": h.created_at.strftime("%b %d, %H:%M")} for h in hooks]
 
 @app.delete("/api/hooks/{hook_id}")
@@ -442,17 +625,8 @@ async def update_report_content(id: int, request: Request):
     try:
         data = await request.json()
         content = data.get('content', '')
-        report = database.get_report_content(id)
-        if report:
-            db = database.SessionLocal()
-            try:
-                db_report = db.query(database.ReportDB).filter(database.ReportDB.id == id).first()
-                if db_report:
-                    db_report.content = content
-                    db.commit()
-                    return {"status": "success"}
-            finally:
-                db.close()
+        if await async_database.update_report_content(id, content):
+            return {"status": "success"}
         return JSONResponse(status_code=404, content={"error": "Report not found"})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -483,7 +657,8 @@ Hook Content to Merge:
 Please merge the hook content into the report intelligently, maintaining proper structure and flow."""
         
         
-        merged_content = await chat_engine.get_chat_response_async(user_prompt, [{"role": "system", "content": system_prompt}])
+        with llm_usage.stage("merge_hook"):
+            merged_content = await chat_engine.get_chat_response_async(user_prompt, [{"role": "system", "content": system_prompt}])
         
         return {"status": "success", "merged_content": merged_content}
     except Exception as e:
@@ -0,0 +1,78 @@
+"""
+Prometheus Metrics for ScholarForge
+Application-level counters registered on the default registry, so they are served
+by the existing prometheus_fastapi_instrumentator endpoint at GET /metrics.
+Celery workers serve the same metrics on WORKER_METRICS_PORT.
+"""
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, start_http_server
+
+CACHE_REQUESTS = Counter(
+    "scholarforge_cache_requests_total",
+    "Cache lookups by cache name and result (hit_memory, hit_redis, hit_disk, miss)",
+    ["cache", "result"],
+)
+
+CACHE_EVICTIONS = Counter(
+    "scholarforge_cache_evictions_total",
+    "Cache entries evicted for size",
+    ["cache"],
+)
+
+LLM_CALLS = Counter(
+    "scholarforge_llm_calls_total",
+    "LLM calls by pipeline stage, model and outcome (ok, error)",
+    ["stage", "model", "outcome"],
+)
+
+LLM_TOKENS = Counter(
+    "scholarforge_llm_tokens_total",
+    "Tokens reported in provider usage blocks, by stage, model and type (prompt, completion)",
+    ["stage", "model", "type"],
+)
+
+LLM_LATENCY = Histogram(
+    "scholarforge_llm_call_seconds",
+    "Wall time of one LLM call, including failed ones",
+    ["stage", "model"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 90, 120, 180),
+)
+
+LLM_FALLBACKS = Counter(
+    "scholarforge_llm_fallbacks_total",
+    "Calls answered by a fallback model instead of the one requested",
+    ["stage", "requested", "served"],
+)
+
+LLM_ERRORS = Counter(
+    "scholarforge_llm_errors_total",
+    "Failed LLM calls by stage, model and code (HTTP status, timeout or exception name)",
+    ["stage", "model", "code"],
+)
+
+LLM_QUEUE_SECONDS = Histogram(
+    "scholarforge_llm_queue_seconds",
+    "Time an LLM call waited for rate-limit quota before being sent",
+    ["model"],
+    buckets=(0, 0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+
+
+def start_worker_exporter(port: int):
+    """
+    Serves metrics over HTTP from a Celery worker. Prefork pool children only share samples
+    when PROMETHEUS_MULTIPROC_DIR is set, in which case they are aggregated from that directory.
+    """
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, registry=registry)
+
+
+def mark_worker_process_dead(pid: int):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
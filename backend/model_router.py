@@ -0,0 +1,268 @@
+"""
+Model Router for ScholarForge
+Tracks rolling latency and error rates of every model and provider, opens a circuit breaker on
+those that keep failing, and orders candidate models so calls go to the fastest healthy one.
+Also races a backup model against a slow primary (hedged requests) for latency-critical chat.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.model_router")
+
+ROUTER_ENABLED = os.environ.get("ROUTER_ENABLED", "true").lower() != "false"
+# Outcomes older than this stop counting towards a model's error rate and latency
+ROUTER_WINDOW_SECONDS = float(os.environ.get("ROUTER_WINDOW_SECONDS", "300"))
+ROUTER_WINDOW_SAMPLES = 50
+# A model's circuit opens after this many failures in a row, or once at least MIN_SAMPLES
+# outcomes in the window fail at ERROR_RATE or more
+ROUTER_FAILURE_THRESHOLD = int(os.environ.get("ROUTER_FAILURE_THRESHOLD", "3"))
+ROUTER_ERROR_RATE = float(os.environ.get("ROUTER_ERROR_RATE", "0.5"))
+ROUTER_MIN_SAMPLES = 6
+# A provider's circuit needs more evidence, since one bad model should not take its siblings down
+ROUTER_PROVIDER_FAILURE_THRESHOLD = 6
+# Open circuits let a trial call through after this long, doubling on each failed trial
+ROUTER_OPEN_SECONDS = float(os.environ.get("ROUTER_OPEN_SECONDS", "30"))
+ROUTER_MAX_OPEN_SECONDS = 600.0
+# A trial whose outcome never arrives (e.g. a cancelled hedge) stops blocking the next one after this long
+ROUTER_TRIAL_TIMEOUT = 120.0
+# Models without a successful call yet are ranked as if they took this long
+ROUTER_DEFAULT_LATENCY = 10.0
+LATENCY_SMOOTHING = 0.3
+
+# Chat starts the next model when the current one has not answered within its p90 latency
+CHAT_HEDGE_ENABLED = os.environ.get("CHAT_HEDGE_ENABLED", "true").lower() != "false"
+HEDGE_MIN_DELAY = float(os.environ.get("HEDGE_MIN_DELAY", "3"))
+HEDGE_DEFAULT_DELAY = float(os.environ.get("HEDGE_DEFAULT_DELAY", "15"))
+HEDGE_MAX_IN_FLIGHT = 2
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def provider_for(model: str) -> str:
+    """Groq serves the bare llama-* names; everything else goes through OpenRouter."""
+    return "groq" if model.startswith("llama-") else "openrouter"
+
+
+@dataclass
+class Health:
+    failure_threshold: int
+    samples: deque = field(default_factory=lambda: deque(maxlen=ROUTER_WINDOW_SAMPLES))
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None
+    cooldown: float = ROUTER_OPEN_SECONDS
+    latency: Optional[float] = None
+    trial_started: Optional[float] = None
+
+    def _trim(self, now: float):
+        while self.samples and now - self.samples[0][0] > ROUTER_WINDOW_SECONDS:
+            self.samples.popleft()
+
+    def error_rate(self, now: float) -> float:
+        self._trim(now)
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok, _ in self.samples if not ok) / len(self.samples)
+
+    def state(self, now: float) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        return HALF_OPEN if now - self.opened_at >= self.cooldown else OPEN
+
+    def admits(self, now: float) -> bool:
+        """Closed circuits take every call, half-open ones a single trial at a time."""
+        state = self.state(now)
+        if state == HALF_OPEN:
+            return self.trial_started is None or now - self.trial_started >= ROUTER_TRIAL_TIMEOUT
+        return state == CLOSED
+
+    def record(self, ok: bool, seconds: float, now: float):
+        was = self.state(now)
+        self.trial_started = None
+        self._trim(now)
+        self.samples.append((now, ok, seconds))
+        if ok:
+            self.consecutive_failures = 0
+            self.latency = seconds if self.latency is None else (
+                LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * self.latency
+            )
+            if was != CLOSED:
+                self.opened_at, self.cooldown = None, ROUTER_OPEN_SECONDS
+            return
+        self.consecutive_failures += 1
+        if was == HALF_OPEN:
+            # The trial failed: stay open for longer
+            self.opened_at, self.cooldown = now, min(self.cooldown * 2, ROUTER_MAX_OPEN_SECONDS)
+        elif was == CLOSED and (
+            self.consecutive_failures >= self.failure_threshold
+            or (len(self.samples) >= ROUTER_MIN_SAMPLES and self.error_rate(now) >= ROUTER_ERROR_RATE)
+        ):
+            self.opened_at = now
+
+    def latency_quantile(self, q: float, now: float) -> Optional[float]:
+        self._trim(now)
+        latencies = sorted(seconds for _, ok, seconds in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+
+class ModelRouter:
+    """Health of each model and provider in this process."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._models = {}
+        self._providers = {}
+
+    def _model(self, model: str) -> Health:
+        return self._models.setdefault(model, Health(ROUTER_FAILURE_THRESHOLD))
+
+    def _provider(self, model: str) -> Health:
+        return self._providers.setdefault(provider_for(model), Health(ROUTER_PROVIDER_FAILURE_THRESHOLD))
+
+    def reset(self):
+        with self._lock:
+            self._models.clear()
+            self._providers.clear()
+
+    def record(self, model: str, ok: bool, seconds: float):
+        now = self._clock()
+        with self._lock:
+            model_health, provider_health = self._model(model), self._provider(model)
+            was_closed = model_health.state(now) == CLOSED
+            model_health.record(ok, seconds, now)
+            provider_health.record(ok, seconds, now)
+            if was_closed and model_health.state(now) == OPEN:
+                logger.warning(f"Circuit opened for {model} ({model_health.consecutive_failures} failures in a row)")
+
+    def end_trial(self, model: str):
+        """Ends a call that says nothing about health (e.g. a 429), so another call can be the trial."""
+        with self._lock:
+            self._model(model).trial_started = None
+            self._provider(model).trial_started = None
+
+    def state(self, model: str) -> str:
+        """The worse of the model's and its provider's circuit states."""
+        now = self._clock()
+        with self._lock:
+            states = (self._model(model).state(now), self._provider(model).state(now))
+        for state in (OPEN, HALF_OPEN):
+            if state in states:
+                return state
+        return CLOSED
+
+    def available(self, model: str) -> bool:
+        """Whether `model` would take a call now: its circuits are closed, or half-open with no trial running."""
+        if not ROUTER_ENABLED:
+            return True
+        now = self._clock()
+        with self._lock:
+            return self._model(model).admits(now) and self._provider(model).admits(now)
+
+    def admit(self, model: str) -> bool:
+        """
+        Called as a call to `model` starts. Returns False only while a half-open circuit's trial
+        call is running; otherwise the call goes ahead, and on a half-open circuit it becomes the
+        trial. Open circuits are not refused here: order() already puts them last, as a last resort.
+        """
+        if not ROUTER_ENABLED:
+            return True
+        now = self._clock()
+        with self._lock:
+            healths = [h for h in (self._model(model), self._provider(model)) if h.state(now) == HALF_OPEN]
+            if not all(h.admits(now) for h in healths):
+                return False
+            for health in healths:
+                health.trial_started = now
+            return True
+
+    def score(self, model: str) -> float:
+        """Expected seconds per useful answer: smoothed latency inflated by the error rate."""
+        now = self._clock()
+        with self._lock:
+            health = self._model(model)
+            latency = health.latency if health.latency is not None else ROUTER_DEFAULT_LATENCY
+            return latency * (1 + 2 * health.error_rate(now))
+
+    def order(self, candidates: Iterable, key: Callable = None, pin_first: bool = False) -> List:
+        """
+        Candidates (model names, or items mapped to one by `key`) with duplicates removed, healthy
+        ones fastest first, and open circuits last as a last resort. With `pin_first` the first
+        candidate keeps its place while its circuit is not open.
+        """
+        key = key or (lambda item: item)
+        unique, seen = [], set()
+        for item in candidates:
+            if key(item) not in seen:
+                seen.add(key(item))
+                unique.append(item)
+        if not ROUTER_ENABLED:
+            return unique
+        healthy = [item for item in unique if self.available(key(item))]
+        tripped = [item for item in unique if item not in healthy]
+        pinned = healthy[:1] if pin_first and unique and healthy[:1] == unique[:1] else []
+        rest = sorted(healthy[len(pinned):], key=lambda item: self.score(key(item)))
+        return pinned + rest + tripped
+
+    def hedge_delay(self, model: str) -> float:
+        """How long to wait on `model` before racing another: its recent p90 latency."""
+        with self._lock:
+            p90 = self._model(model).latency_quantile(0.9, self._clock())
+        return HEDGE_DEFAULT_DELAY if p90 is None else max(HEDGE_MIN_DELAY, p90)
+
+
+router = ModelRouter()
+
+
+async def hedged(attempt: Callable[[object], Awaitable[Tuple[bool, object]]], candidates: List,
+                 delay_for: Optional[Callable[[object], float]] = None) -> Tuple[bool, object]:
+    """
+    Runs `attempt` on candidates in order until one returns (True, value). A failure starts the
+    next candidate at once; a candidate still running after `delay_for(candidate)` seconds gets a
+    backup started alongside it, up to HEDGE_MAX_IN_FLIGHT at a time. The first success wins and
+    the others are cancelled. Without `delay_for` candidates are tried strictly one at a time.
+    Returns (False, last failure value) if every candidate fails.
+    """
+    remaining = list(candidates)
+    pending = {}
+    last_failure = None
+
+    def start():
+        candidate = remaining.pop(0)
+        pending[asyncio.ensure_future(attempt(candidate))] = candidate
+
+    if not remaining:
+        return False, None
+    start()
+    try:
+        while pending:
+            timeout = None
+            if delay_for is not None and remaining and len(pending) < HEDGE_MAX_IN_FLIGHT:
+                timeout = min(delay_for(candidate) for candidate in pending.values())
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.pop(task)
+                try:
+                    ok, value = task.result()
+                except Exception as e:
+                    ok, value = False, e
+                if ok:
+                    return True, value
+                last_failure = value
+                if remaining:
+                    start()
+            if not done and remaining:
+                logger.info(f"Hedging: starting a backup after {timeout:.1f}s without an answer")
+                start()
+        return False, last_failure
+    finally:
+        for task in pending:
+            task.cancel()
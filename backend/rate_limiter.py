@@ -0,0 +1,304 @@
+"""
+Outbound Rate Limiter for ScholarForge
+Token buckets for requests and tokens per minute, per provider and per model, so LLM calls queue
+and pace themselves instead of running into 429s. Buckets live in Redis so the API and every
+Celery worker draw from the same quota, with in-process buckets while Redis is unreachable.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .logging_config import setup_logging
+from .metrics import LLM_QUEUE_SECONDS
+from .model_router import provider_for
+
+logger = setup_logging("scholarforge.rate_limiter")
+
+RATE_LIMIT_ENABLED = os.environ.get("LLM_RATE_LIMIT_ENABLED", "true").lower() != "false"
+RATE_LIMIT_REDIS_ENABLED = os.environ.get("LLM_RATE_LIMIT_REDIS_ENABLED", "true").lower() != "false"
+RATE_LIMIT_REDIS_URL = os.environ.get(
+    "LLM_RATE_LIMIT_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
+)
+# A call waits at most this long for quota, then goes ahead and lets the provider decide
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("LLM_RATE_LIMIT_MAX_WAIT", "120"))
+REDIS_RETRY_AFTER = 60.0
+
+# Free-tier quotas. Groq limits each model separately; OpenRouter limits its :free models together.
+# Entries are keyed by model name or provider scope, and LLM_RATE_LIMITS (JSON) overrides them.
+DEFAULT_LIMITS = {
+    "openrouter-free": {"rpm": 20},
+    "llama-3.1-8b-instant": {"rpm": 30, "tpm": 6000},
+    "llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+}
+# Completion tokens reserved up front; the reservation is settled against the usage block afterwards
+EXPECTED_COMPLETION_TOKENS = 1000
+# Used when a 429 carries no Retry-After header
+DEFAULT_RETRY_AFTER = 2.0
+
+# Takes `amount` from every bucket, or from none and returns the seconds until all could give it.
+# KEYS: bucket keys. ARGV: per key capacity, refill rate per second, amount.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local levels, wait = {}, 0
+for i, key in ipairs(KEYS) do
+  local capacity, rate, amount = tonumber(ARGV[i*3-2]), tonumber(ARGV[i*3-1]), tonumber(ARGV[i*3])
+  local state = redis.call('HMGET', key, 'level', 'ts')
+  local level = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  level = math.min(capacity, level + math.max(0, now - ts) * rate)
+  levels[i] = level
+  if level < amount then wait = math.max(wait, (amount - level) / rate) end
+end
+if wait > 0 then return tostring(wait) end
+for i, key in ipairs(KEYS) do
+  local capacity, rate, amount = tonumber(ARGV[i*3-2]), tonumber(ARGV[i*3-1]), tonumber(ARGV[i*3])
+  redis.call('HSET', key, 'level', levels[i] - amount, 'ts', now)
+  redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+end
+return '0'
+"""
+
+# Adds `delta` to one bucket (a refund or a charge), then lowers it to `floor` if that is lower.
+# KEYS: bucket key. ARGV: capacity, refill rate per second, delta, floor.
+_ADJUST_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local capacity, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'level', 'ts')
+local level = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+level = math.min(capacity, level + math.max(0, now - ts) * rate + tonumber(ARGV[3]))
+level = math.min(level, tonumber(ARGV[4]))
+redis.call('HSET', KEYS[1], 'level', level, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return '0'
+"""
+
+# (key, capacity, refill per second, amount)
+Bucket = Tuple[str, float, float, float]
+
+
+def _load_limits() -> Dict[str, dict]:
+    limits = {name: dict(values) for name, values in DEFAULT_LIMITS.items()}
+    raw = os.environ.get("LLM_RATE_LIMITS")
+    if raw:
+        try:
+            for name, values in json.loads(raw).items():
+                limits[name] = dict(values)
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring invalid LLM_RATE_LIMITS: {e}")
+    return limits
+
+
+def provider_scope(model: str) -> str:
+    """The provider quota a model draws from; OpenRouter's free models share their own."""
+    provider = provider_for(model)
+    return f"{provider}-free" if provider == "openrouter" and model.endswith(":free") else provider
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count (about four characters per token) for reserving quota before a call."""
+    return sum(len(text or "") for text in texts) // 4 + 1
+
+
+def retry_after(response, default: float = DEFAULT_RETRY_AFTER) -> float:
+    """Seconds from a 429 response's Retry-After header, or `default`."""
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return default
+
+
+class _LocalBuckets:
+    """Process-local buckets with the same semantics as the Redis scripts."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _level(self, key: str, capacity: float, rate: float, now: float) -> float:
+        level, ts = self._state.get(key, (capacity, now))
+        return min(capacity, level + max(0.0, now - ts) * rate)
+
+    def acquire(self, buckets: List[Bucket]) -> float:
+        now = self._clock()
+        with self._lock:
+            levels = [self._level(key, capacity, rate, now) for key, capacity, rate, _ in buckets]
+            wait = max([(amount - level) / rate for (_, _, rate, amount), level in zip(buckets, levels) if level < amount],
+                       default=0.0)
+            if wait > 0:
+                return wait
+            for (key, _, _, amount), level in zip(buckets, levels):
+                self._state[key] = (level - amount, now)
+            return 0.0
+
+    def adjust(self, key: str, capacity: float, rate: float, delta: float, floor: float):
+        now = self._clock()
+        with self._lock:
+            level = min(capacity, self._level(key, capacity, rate, now) + delta)
+            self._state[key] = (min(level, floor), now)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for each provider scope and model with a
+    configured limit. A bucket holds one minute of quota and refills continuously.
+    """
+
+    def __init__(self, limits: Dict[str, dict] = None, enabled: bool = RATE_LIMIT_ENABLED,
+                 use_redis: bool = RATE_LIMIT_REDIS_ENABLED, clock=time.monotonic):
+        self.limits = _load_limits() if limits is None else limits
+        self.enabled = enabled
+        self.use_redis = use_redis
+        self._clock = clock
+        self._local = _LocalBuckets(clock)
+        self._redis = None
+        self._redis_down_until = 0.0
+        self._scripts = {}
+
+    def _get_redis(self):
+        if not self.use_redis or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(
+                    RATE_LIMIT_REDIS_URL, socket_connect_timeout=0.5, socket_timeout=1.0
+                )
+                self._scripts = {
+                    "acquire": self._redis.register_script(_ACQUIRE_SCRIPT),
+                    "adjust": self._redis.register_script(_ADJUST_SCRIPT),
+                }
+            except Exception as e:
+                logger.warning(f"Rate limiter: Redis unavailable, using per-process buckets: {e}")
+                self.use_redis = False
+                return None
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        logger.warning(f"Rate limiter: Redis error, using per-process buckets for {REDIS_RETRY_AFTER:.0f}s: {e}")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+    def _limits_for(self, model: str) -> List[Tuple[str, str, float]]:
+        """(bucket key, kind, per-minute limit) for every limit that applies to `model`."""
+        found = []
+        for scope in (provider_scope(model), model):
+            for kind, per_minute in self.limits.get(scope, {}).items():
+                if kind in ("rpm", "tpm") and per_minute:
+                    found.append((f"scholarforge:ratelimit:{scope}:{kind}", kind, float(per_minute)))
+        return found
+
+    def _try_acquire(self, model: str, tokens: int) -> float:
+        buckets = [
+            # A prompt larger than a whole minute of quota is capped, or it could never be sent
+            (key, per_minute, per_minute / 60.0, 1.0 if kind == "rpm" else min(float(tokens), per_minute))
+            for key, kind, per_minute in self._limits_for(model)
+        ]
+        if not buckets:
+            return 0.0
+        client = self._get_redis()
+        if client is not None:
+            try:
+                keys = [key for key, _, _, _ in buckets]
+                args = [value for _, capacity, rate, amount in buckets for value in (capacity, rate, amount)]
+                return float(self._scripts["acquire"](keys=keys, args=args))
+            except Exception as e:
+                self._redis_failed(e)
+        return self._local.acquire(buckets)
+
+    def _adjust(self, model: str, kind: str, delta: float = 0.0, floor_seconds: Optional[float] = None):
+        for key, bucket_kind, per_minute in self._limits_for(model):
+            if bucket_kind != kind:
+                continue
+            rate = per_minute / 60.0
+            # The floor leaves the bucket exactly `floor_seconds` of refill short of one request
+            floor = 1 - floor_seconds * rate if floor_seconds is not None else per_minute
+            client = self._get_redis()
+            if client is not None:
+                try:
+                    self._scripts["adjust"](keys=[key], args=[per_minute, rate, delta, floor])
+                    continue
+                except Exception as e:
+                    self._redis_failed(e)
+            self._local.adjust(key, per_minute, rate, delta, floor)
+
+    async def _offload(self, fn, *args):
+        """Runs `fn` on a worker thread while it may block on Redis, inline otherwise."""
+        if self._get_redis() is not None:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def acquire(self, model: str, tokens: int = 0, max_wait: float = RATE_LIMIT_MAX_WAIT) -> float:
+        """Waits until `model` has quota for one request of `tokens` tokens. Returns seconds waited."""
+        if not self.enabled:
+            return 0.0
+        started = self._clock()
+        while True:
+            wait = await self._offload(self._try_acquire, model, tokens)
+            waited = self._clock() - started
+            if wait <= 0 or waited + wait > max_wait:
+                break
+            # Jitter keeps callers released by the same refill from arriving together
+            await asyncio.sleep(wait + random.uniform(0, 0.25))
+        self._waited(model, waited, wait)
+        return waited
+
+    def _waited(self, model: str, waited: float, still_short: float):
+        if still_short > 0:
+            logger.warning(f"Rate limiter: {model} still throttled after {waited:.1f}s, sending anyway")
+        LLM_QUEUE_SECONDS.labels(model=model).observe(waited)
+
+    def settle(self, model: str, reserved: int, body: Optional[dict]):
+        """Corrects a token reservation with the usage block of the response, when there is one."""
+        usage = (body or {}).get("usage") or {}
+        used = usage.get("total_tokens") or (usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0))
+        if self.enabled and used:
+            self._adjust(model, "tpm", delta=reserved - used)
+
+    async def asettle(self, model: str, reserved: int, body: Optional[dict]):
+        if self.enabled:
+            await self._offload(self.settle, model, reserved, body)
+
+    def refund(self, model: str, reserved: int):
+        """Returns the tokens reserved for a call that got no completion (error, 429, timeout or cancellation)."""
+        if self.enabled and reserved:
+            self._adjust(model, "tpm", delta=reserved)
+
+    async def arefund(self, model: str, reserved: int):
+        if self.enabled:
+            await self._offload(self.refund, model, reserved)
+
+    def penalize(self, model: str, seconds: float):
+        """After a 429: no request goes to `model` for `seconds`."""
+        if self.enabled:
+            self._adjust(model, "rpm", floor_seconds=seconds)
+
+    async def apenalize(self, model: str, seconds: float):
+        if self.enabled:
+            await self._offload(self.penalize, model, seconds)
+
+    async def backoff(self, model: str, seconds: float):
+        """
+        Handles a 429. With the limiter on, the model's request bucket is emptied for `seconds`
+        so the next acquire waits (across workers); with it off, this simply sleeps.
+        """
+        if self.enabled and self._limits_for(model):
+            await self.apenalize(model, seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+
+limiter = RateLimiter()
+
+
+def reserve_tokens(*prompts: str, max_tokens: int = None) -> int:
+    """Tokens to reserve for a call: the estimated prompt plus the expected completion."""
+    completion = EXPECTED_COMPLETION_TOKENS if max_tokens is None else min(max_tokens, EXPECTED_COMPLETION_TOKENS)
+    return estimate_tokens(*prompts) + completion
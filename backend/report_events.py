@@ -0,0 +1,165 @@
+"""
+Report Event Stream for ScholarForge
+Publishes report progress and finished sections to a per-task Redis stream, so the API
+can push them to clients over SSE instead of clients polling the Celery result backend.
+"""
+import os
+import json
+import time
+import queue
+import threading
+
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.report_events")
+
+REPORT_EVENTS_REDIS_URL = os.environ.get(
+    "REPORT_EVENTS_REDIS_URL", os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
+)
+# Streams outlive the task long enough for late subscribers and reconnects.
+STREAM_TTL_SECONDS = int(os.environ.get("REPORT_EVENTS_TTL", "3600"))
+STREAM_MAXLEN = 2000
+# Terminal events are how clients learn a report finished, so they are retried instead of dropped
+TERMINAL_PUBLISH_ATTEMPTS = 3
+TERMINAL_RETRY_DELAY = 0.5
+
+# Event types
+STATUS = "status"
+OUTLINE = "outline"
+SECTION = "section"
+COMPLETE = "complete"
+FAILED = "failed"
+TERMINAL_EVENTS = (COMPLETE, FAILED)
+
+_redis = None
+_redis_down_until = 0.0
+
+
+class StreamNotFound(Exception):
+    """The task has no event stream: the id is unknown or its events have expired."""
+
+
+def stream_key(task_id: str) -> str:
+    return f"scholarforge:report:{task_id}:events"
+
+
+def _get_redis(force: bool = False):
+    global _redis
+    if not force and time.monotonic() < _redis_down_until:
+        return None
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(REPORT_EVENTS_REDIS_URL, socket_connect_timeout=1.0, socket_timeout=2.0)
+    return _redis
+
+
+def publish(task_id: str, event: str, payload: dict):
+    """
+    Appends one event to the task's stream. Failures are logged and swallowed:
+    clients can always fall back to /report-status, so events must never fail a report.
+    After a failure, progress events are skipped for 30s; terminal events are always
+    attempted, with retries.
+    """
+    global _redis_down_until
+    if not task_id:
+        return
+    terminal = event in TERMINAL_EVENTS
+    attempts = TERMINAL_PUBLISH_ATTEMPTS if terminal else 1
+    for attempt in range(1, attempts + 1):
+        try:
+            client = _get_redis(force=terminal)
+            if client is None:
+                return
+            key = stream_key(task_id)
+            pipe = client.pipeline()
+            pipe.xadd(key, {"event": event, "data": json.dumps(payload)}, maxlen=STREAM_MAXLEN, approximate=True)
+            pipe.expire(key, STREAM_TTL_SECONDS)
+            pipe.execute()
+            _redis_down_until = 0.0
+            return
+        except Exception as e:
+            logger.warning(f"Report event publish failed ({event}, task {task_id}, attempt {attempt}): {e}")
+            _redis_down_until = time.monotonic() + 30.0
+            if attempt < attempts:
+                time.sleep(TERMINAL_RETRY_DELAY * attempt)
+
+
+class ReportEventPublisher:
+    """Binds publish() to one task so pipeline code does not have to carry the task id."""
+
+    def __init__(self, task_id: str = None):
+        self.task_id = task_id
+
+    def __call__(self, event: str, payload: dict):
+        publish(self.task_id, event, payload)
+
+    @classmethod
+    def for_task(cls, task) -> "ReportEventPublisher":
+        request = getattr(task, "request", None)
+        return cls(getattr(request, "id", None))
+
+
+class StatusWriter:
+    """
+    Runs a report's status writes (Celery state updates, event publishes) one at a time on a
+    worker thread, in the order they were submitted, so the pipeline's event loop never waits
+    on Redis. close() waits for everything queued so far.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+
+    def submit(self, fn, *args, **kwargs):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="report-status-writer", daemon=True)
+            self._thread.start()
+        self._queue.put((fn, args, kwargs))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            fn, args, kwargs = item
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Report status write failed: {e}")
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+async def subscribe(task_id: str, last_id: str = "0-0", block_ms: int = 15000):
+    """
+    Async generator over (stream_id, event, payload) for a task, starting after `last_id`.
+    Yields (None, None, None) when `block_ms` passes without events so callers can send keep-alives.
+    Stops after a terminal event. Raises StreamNotFound if the task has no stream, rather than
+    waiting on it forever.
+    """
+    import redis.asyncio as aioredis
+
+    client = aioredis.Redis.from_url(REPORT_EVENTS_REDIS_URL)
+    key = stream_key(task_id)
+    try:
+        if not await client.exists(key):
+            raise StreamNotFound(task_id)
+        while True:
+            response = await client.xread({key: last_id}, block=block_ms, count=100)
+            if not response:
+                yield None, None, None
+                continue
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                    event = fields[b"event"].decode()
+                    payload = json.loads(fields[b"data"])
+                    yield last_id, event, payload
+                    if event in TERMINAL_EVENTS:
+                        return
+    finally:
+        await client.aclose()
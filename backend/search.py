@@ -0,0 +1,109 @@
+"""
+Tavily Search Client for ScholarForge
+Single entry point for web search shared by the report pipeline and the council tools.
+Queries are normalized, identical in-flight requests are merged into one upstream call,
+and results are cached (memory + Redis) so repeated topics cost no extra search calls.
+"""
+import os
+import re
+import asyncio
+import weakref
+
+from . import http_client
+from .cache import ResponseCache, make_key
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.search")
+
+TAVILY_URL = "https://api.tavily.com/search"
+# Every upstream call asks for this many results; callers slice locally so that
+# requests for 1, 3 or 5 results all share one cache entry.
+UPSTREAM_MAX_RESULTS = 5
+SEARCH_TIMEOUT = 15.0
+
+search_cache = ResponseCache(
+    "search",
+    ttl=float(os.environ.get("SEARCH_CACHE_TTL", str(6 * 3600))),
+    max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.environ.get("SEARCH_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+
+class SearchError(Exception):
+    """Raised when Tavily cannot be queried; the message is safe to show in a report."""
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form used for cache keys and in-flight deduplication."""
+    query = query.strip().lower()
+    query = re.sub(r'["\'`]', '', query)
+    query = re.sub(r'\s+', ' ', query)
+    return query.strip(" .?!,;:")
+
+
+def _cache_key(normalized: str) -> str:
+    return make_key("tavily", normalized, UPSTREAM_MAX_RESULTS)
+
+
+def _payload(query: str) -> dict:
+    api_key = os.environ.get("SERP_KEY")
+    if not api_key:
+        raise SearchError("Error: SERP_KEY not set.")
+    return {
+        "api_key": api_key,
+        "query": query,
+        "search_depth": "basic",
+        "include_answer": False,
+        "include_images": False,
+        "include_item_list": False,
+        "max_results": UPSTREAM_MAX_RESULTS
+    }
+
+
+def _parse(response) -> list:
+    if response.status_code != 200:
+        raise SearchError(f"Tavily Search Error: {response.status_code} - {response.text}")
+    return response.json().get("results", [])
+
+
+# In-flight tasks are tracked per event loop, since asyncio futures cannot be shared across loops.
+_async_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+async def _fetch_async(query: str) -> list:
+    logger.info(f"Searching Tavily for: {query}")
+    try:
+        client = http_client.get_async_client(TAVILY_URL)
+        response = await client.post(TAVILY_URL, json=_payload(query), timeout=SEARCH_TIMEOUT)
+    except SearchError:
+        raise
+    except Exception as e:
+        raise SearchError(f"Tavily Request Error: {e}")
+    return _parse(response)
+
+
+async def _fetch_and_store(query: str, key: str) -> list:
+    results = await _fetch_async(query)
+    await search_cache.aset(key, results)
+    return results
+
+
+async def tavily_search_async(query: str, max_results: int = UPSTREAM_MAX_RESULTS) -> list:
+    """Return up to `max_results` Tavily result dicts for `query`. Raises SearchError."""
+    normalized = normalize_query(query)
+    key = _cache_key(normalized)
+    cached = await search_cache.aget(key)
+    if cached is not None:
+        return cached[:max_results]
+
+    inflight = _async_inflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_store(query, key))
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    else:
+        logger.debug(f"Joining in-flight search for: {normalized}")
+    # Shield so one cancelled caller does not cancel the search for everyone else.
+    results = await asyncio.shield(task)
+    return results[:max_results]
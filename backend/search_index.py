@@ -0,0 +1,176 @@
+"""
+Full-Text Search Index for ScholarForge
+One search document per report, hook and chat message: a PostgreSQL table with a generated
+tsvector column and GIN index, or an SQLite FTS5 table. Returns ranked hits with snippets.
+"""
+import re
+import html
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Connection
+
+KINDS = ("report", "hook", "message")
+# SQLite documents are keyed by rowid = ref_id * 4 + kind code, so updates and deletes are point lookups
+_KIND_CODES = {"report": 1, "hook": 2, "message": 3}
+_KIND_SLOTS = 4
+
+# Private-use characters mark matches inside snippets; they are turned into <mark> after escaping
+_MATCH_START, _MATCH_END = "\ue000", "\ue001"
+SNIPPET_WORDS = 24
+MAX_QUERY_TERMS = 16
+
+TABLE_NAMES = {"postgresql": "search_documents", "sqlite": "search_fts"}
+
+_CREATE = {
+    "postgresql": [
+        """
+        CREATE TABLE IF NOT EXISTS search_documents (
+            kind VARCHAR(16) NOT NULL,
+            ref_id INTEGER NOT NULL,
+            parent_id INTEGER,
+            title TEXT,
+            body TEXT NOT NULL,
+            tsv tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', body), 'B')
+            ) STORED,
+            PRIMARY KEY (kind, ref_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+    ],
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+            title, body, kind UNINDEXED, ref_id UNINDEXED, parent_id UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+        """,
+    ],
+}
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    ref_id: int
+    parent_id: Optional[int]
+    title: Optional[str]
+    snippet: str
+    score: float
+
+
+def is_supported(connection: Connection) -> bool:
+    return connection.dialect.name in TABLE_NAMES
+
+
+def exists(connection: Connection) -> bool:
+    return is_supported(connection) and inspect(connection).has_table(TABLE_NAMES[connection.dialect.name])
+
+
+def create(connection: Connection):
+    for statement in _CREATE.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
+
+def drop(connection: Connection):
+    if is_supported(connection):
+        connection.execute(text(f"DROP TABLE IF EXISTS {TABLE_NAMES[connection.dialect.name]}"))
+
+
+def _rowid(kind: str, ref_id: int) -> int:
+    return ref_id * _KIND_SLOTS + _KIND_CODES[kind]
+
+
+def index_document(connection: Connection, kind: str, ref_id: int, body: str,
+                   title: str = None, parent_id: int = None):
+    """Adds or replaces the search document for one row."""
+    if not is_supported(connection):
+        return
+    params = {"kind": kind, "ref_id": ref_id, "parent_id": parent_id, "title": title, "body": body or ""}
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "INSERT INTO search_documents (kind, ref_id, parent_id, title, body) "
+            "VALUES (:kind, :ref_id, :parent_id, :title, :body) "
+            "ON CONFLICT (kind, ref_id) DO UPDATE SET "
+            "parent_id = EXCLUDED.parent_id, title = EXCLUDED.title, body = EXCLUDED.body"
+        ), params)
+    else:
+        params["rowid"] = _rowid(kind, ref_id)
+        connection.execute(text("DELETE FROM search_fts WHERE rowid = :rowid"), params)
+        connection.execute(text(
+            "INSERT INTO search_fts (rowid, title, body, kind, ref_id, parent_id) "
+            "VALUES (:rowid, :title, :body, :kind, :ref_id, :parent_id)"
+        ), params)
+
+
+def remove_documents(connection: Connection, kind: str, ref_ids: Iterable[int]):
+    ref_ids = list(ref_ids)
+    if not ref_ids or not is_supported(connection):
+        return
+    if connection.dialect.name == "postgresql":
+        statement = text("DELETE FROM search_documents WHERE kind = :kind AND ref_id IN :ids")
+        params = {"kind": kind, "ids": ref_ids}
+    else:
+        statement = text("DELETE FROM search_fts WHERE rowid IN :ids")
+        params = {"ids": [_rowid(kind, ref_id) for ref_id in ref_ids]}
+    connection.execute(statement.bindparams(bindparam("ids", expanding=True)), params)
+
+
+def clear(connection: Connection, kind: str):
+    """Removes every document of one kind."""
+    if is_supported(connection):
+        table = TABLE_NAMES[connection.dialect.name]
+        connection.execute(text(f"DELETE FROM {table} WHERE kind = :kind"), {"kind": kind})
+
+
+def query_terms(query: str) -> List[str]:
+    """Words of a user query; operators and punctuation are dropped so any input is a valid query."""
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+def render_snippet(raw: str) -> str:
+    """HTML-escapes a snippet and wraps matched terms in <mark>."""
+    return html.escape(raw or "").replace(_MATCH_START, "<mark>").replace(_MATCH_END, "</mark>")
+
+
+def search(connection: Connection, query: str, kinds: Sequence[str] = KINDS,
+           limit: int = 20, offset: int = 0) -> List[SearchHit]:
+    """
+    Documents matching every term of `query` (the last term as a prefix), best first.
+    """
+    terms = query_terms(query)
+    if not terms or not is_supported(connection):
+        return []
+    params = {"kinds": list(kinds), "limit": limit, "offset": offset}
+    if connection.dialect.name == "postgresql":
+        params["query"] = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        params["options"] = (
+            f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, "
+            f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, MaxFragments=1"
+        )
+        # Headlines are the expensive part, so they are built for the returned page only
+        statement = text(
+            "SELECT page.kind, page.ref_id, page.parent_id, page.title, page.score, "
+            "ts_headline('english', page.body, page.q, :options) AS snippet "
+            "FROM (SELECT d.kind, d.ref_id, d.parent_id, d.title, d.body, q, ts_rank_cd(d.tsv, q) AS score "
+            "      FROM search_documents d, to_tsquery('english', :query) q "
+            "      WHERE d.tsv @@ q AND d.kind IN :kinds "
+            "      ORDER BY score DESC, d.kind, d.ref_id LIMIT :limit OFFSET :offset) page "
+            "ORDER BY page.score DESC, page.kind, page.ref_id"
+        )
+    else:
+        params["query"] = " ".join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+        statement = text(
+            "SELECT kind, ref_id, parent_id, title, -bm25(search_fts, 4.0, 1.0) AS score, "
+            f"snippet(search_fts, 1, '{_MATCH_START}', '{_MATCH_END}', '…', {SNIPPET_WORDS}) AS snippet "
+            "FROM search_fts WHERE search_fts MATCH :query AND kind IN :kinds "
+            "ORDER BY bm25(search_fts, 4.0, 1.0), rowid LIMIT :limit OFFSET :offset"
+        )
+    rows = connection.execute(statement.bindparams(bindparam("kinds", expanding=True)), params).all()
+    return [
+        SearchHit(row.kind, int(row.ref_id), row.parent_id, row.title, render_snippet(row.snippet), float(row.score))
+        for row in rows
+    ]
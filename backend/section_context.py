@@ -0,0 +1,121 @@
+"""
+Section Context Selection for ScholarForge
+Scores passages of the research summary and web sources against each outline section with BM25
+and keeps the best ones within a character budget, so each section prompt carries the material
+relevant to it instead of the same truncated summary.
+"""
+import os
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from .doc_index import chunk_text, tokenize
+from .logging_config import setup_logging
+
+logger = setup_logging("scholarforge.section_context")
+
+SECTION_CONTEXT_ENABLED = os.environ.get("SECTION_CONTEXT_ENABLED", "true").lower() != "false"
+# Summary and source passages sent with one section are capped at this many characters
+SECTION_CONTEXT_CHARS = int(os.environ.get("SECTION_CONTEXT_CHARS", "6000"))
+PASSAGE_CHARS = 800
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Topic words match nearly every passage, so they only break ties between the section's own terms
+TOPIC_WEIGHT = 0.3
+
+SOURCES_HEADER = "--- VERIFIED SOURCES ---"
+_SOURCE_START = re.compile(r"^(?=SOURCE \[\d+\])", re.MULTILINE)
+_SECTION_NUMBER = re.compile(r"^\s*\d+[.)]\s*")
+
+
+def split_passages(text: str) -> List[str]:
+    """
+    Splits a summary or formatted search results into passages. Each web source stays whole so
+    its [n] citation number travels with it; other text is chunked on paragraph boundaries.
+    """
+    passages = []
+    for block in _SOURCE_START.split((text or "").replace(SOURCES_HEADER, "")):
+        if block.startswith("SOURCE ["):
+            passages.append(block.strip())
+        else:
+            passages.extend(chunk_text(block, size=PASSAGE_CHARS, overlap=0))
+    return passages
+
+
+class BM25:
+    """Okapi BM25 over a fixed list of passages."""
+
+    def __init__(self, passages: Sequence[str], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1, self.b = k1, b
+        self.term_counts = [Counter(tokenize(p)) for p in passages]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        n = len(passages)
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def scores(self, weights: Dict[str, float]) -> List[float]:
+        """Scores every passage against weighted query terms."""
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1.0))
+            score = 0.0
+            for term, weight in weights.items():
+                tf = counts.get(term)
+                if tf:
+                    score += weight * self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def query_weights(section_title: str, topic: str) -> Dict[str, float]:
+    weights = {term: TOPIC_WEIGHT for term in tokenize(topic)}
+    weights.update({term: 1.0 for term in tokenize(_SECTION_NUMBER.sub("", section_title))})
+    return weights
+
+
+def select_passages(passages: Sequence[str], scores: Sequence[float], max_chars: int) -> List[str]:
+    """
+    Best-scoring passages first, topped up with unmatched ones in their original order, until
+    `max_chars` is used. A passage that does not fit is skipped so a shorter one can take its place.
+    """
+    order = sorted(range(len(passages)), key=lambda i: -scores[i])
+    chosen, used = [], 0
+    for i in order:
+        if used + len(passages[i]) > max_chars:
+            continue
+        chosen.append(passages[i])
+        used += len(passages[i]) + 2
+    return chosen
+
+
+def build_contexts(outline: Sequence[str], topic: str, summary: str, search_content: str = "",
+                   excerpts: Sequence[str] = None, max_chars: int = SECTION_CONTEXT_CHARS) -> Dict[str, str]:
+    """
+    The context for each outline section: the summary and web-source passages that best match its
+    title within `max_chars`, followed by its upload excerpts if it has any. When everything fits
+    the budget, every section gets all of it in the original order.
+    """
+    excerpts = list(excerpts or [""] * len(outline))
+    sources = search_content if (search_content or "").startswith(SOURCES_HEADER) else ""
+    passages = split_passages(summary) + split_passages(sources)
+
+    if sum(len(p) + 2 for p in passages) <= max_chars:
+        selected = {section: "\n\n".join(passages) for section in outline}
+    else:
+        bm25 = BM25(passages)
+        selected = {
+            section: "\n\n".join(select_passages(passages, bm25.scores(query_weights(section, topic)), max_chars))
+            for section in outline
+        }
+
+    contexts = {
+        section: f"{selected[section]}\n\n{found}" if found else selected[section]
+        for section, found in zip(outline, excerpts)
+    }
+    if contexts:
+        available = len(summary or "") + len(sources)
+        average = sum(len(c) for c in contexts.values()) // len(contexts)
+        logger.info(f"Section contexts average {average} chars ({available} chars of summary and sources available)")
+    return contexts
@@ -1,9 +1,16 @@
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 from . import AI_engine
 from . import database
+from . import http_client
+from . import report_events
+from . import llm_usage
+from . import metrics
 
 REDIS_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
+# LLM and cache metrics are served from the worker on this port when set
+WORKER_METRICS_PORT = os.environ.get('WORKER_METRICS_PORT')
 
 celery_app = Celery(
     'scholarforge_tasks',
@@ -11,6 +18,21 @@ celery_app = Celery(
     backend=REDIS_URL
 )
 
+@worker_init.connect
+def _init_worker(**kwargs):
+    if WORKER_METRICS_PORT:
+        metrics.start_worker_exporter(int(WORKER_METRICS_PORT))
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    # Pooled connections must not be shared with the parent across fork
+    http_client.reset_after_fork()
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(pid=None, **kwargs):
+    http_client.close_clients()
+    metrics.mark_worker_process_dead(pid or os.getpid())
+
 @celery_app.task(bind=True)
 def generate_report_task(self, query: str, format_content: str, page_count: int, file_data_list: list = None, use_council: bool = False):
     """
@@ -19,17 +41,22 @@ def generate_report_task(self, query: str, format_content: str, page_count: int,
     try:
         self.update_state(state='PROGRESS', meta={'message': 'Initializing Deep Research...'})
         
-        search_content, report_content, chart_path = AI_engine.run_ai_engine_with_return(
-            query, 
-            format_content, 
-            page_count,
-            file_data_list,
-            task=self,
-            use_council=use_council
-        )
+        with llm_usage.track() as usage:
+            search_content, report_content, chart_path = AI_engine.run_ai_engine_with_return(
+                query, 
+                format_content, 
+                page_count,
+                file_data_list,
+                task=self,
+                use_council=use_council
+            )
 
         self.update_state(state='PROGRESS', meta={'message': 'Archiving Report...'})
-        database.save_report(query, report_content)
+        database.save_report(query, report_content, llm_usage=usage.to_dict())
+        report_events.publish(self.request.id, report_events.COMPLETE, {
+            'report_content': report_content,
+            'chart_path': chart_path
+        })
 
         return {
             'status': 'SUCCESS',
@@ -38,4 +65,5 @@ def generate_report_task(self, query: str, format_content: str, page_count: int,
             'chart_path': chart_path
         }
     except Exception as e:
+        report_events.publish(self.request.id, report_events.FAILED, {'error': str(e)})
         return {'status': 'FAILURE', 'error': str(e)}
\ No newline at end of file
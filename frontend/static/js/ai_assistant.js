@@ -2,6 +2,7 @@
   let currentSessionId = null;
   let hasMessages = false;
   let attachedFiles = [];
+  let olderMessages = null; // Pager over the open session's history, newest page first
 
   document.addEventListener('DOMContentLoaded', () => {
     const params = new URLSearchParams(window.location.search);
@@ -19,6 +20,11 @@
 
     initFileUpload();
     initChatForm();
+
+    // Earlier history is loaded a page at a time as the user scrolls up
+    document.getElementById('messages-container')?.addEventListener('scroll', (e) => {
+      if (e.target.scrollTop < 200) loadOlderMessages();
+    });
   });
 
   function initFileUpload() {
@@ -139,18 +145,25 @@
           formData.append('files', file);
         });
 
-        const response = await fetch('/chat', {
-          method: 'POST',
-          body: formData
-        });
+        const msgId = 'asst-msg-' + Date.now();
+        let textEl = null;
 
-        const data = await response.json();
+        const result = await streamChat(formData, (fullText) => {
+          if (!textEl) {
+            hideTypingIndicator();
+            renderAssistantMessage('', msgId, true);
+            textEl = document.querySelector(`#${msgId} .message-text`);
+          }
+          textEl.innerHTML = formatMarkdown(fullText);
+          document.getElementById(msgId).dataset.rawText = escapeHtml(fullText).replace(/"/g, '&quot;');
+          scrollToBottom();
+        });
         hideTypingIndicator();
 
-        if (data.error) {
-          renderAssistantMessage('Error: ' + data.error);
-        } else {
-          renderAssistantMessage(data.response);
+        if (result.error && !textEl) {
+          renderAssistantMessage('Error: ' + result.error);
+        } else if (result.error) {
+          window.showToast('Response interrupted: ' + result.error);
         }
 
         attachedFiles = [];
@@ -168,6 +181,59 @@
     });
   }
 
+  // Reads the Server-Sent Events stream from /chat/stream, calling onUpdate with the
+  // accumulated text after every delta. Resolves with {text, error}.
+  async function streamChat(formData, onUpdate) {
+    const response = await fetch('/chat/stream', {
+      method: 'POST',
+      body: formData
+    });
+
+    if (!response.ok || !response.body) {
+      let error = 'Request failed (' + response.status + ')';
+      try {
+        const data = await response.json();
+        error = data.error || error;
+      } catch (e) { /* non-JSON error body */ }
+      return { text: '', error };
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    let error = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) !== -1) {
+        const frame = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+
+        let event = 'message';
+        let data = '';
+        frame.split('\n').forEach(line => {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        });
+        if (!data) continue;
+
+        const payload = JSON.parse(data);
+        if (event === 'delta') {
+          text += payload.text;
+          onUpdate(text);
+        } else if (event === 'error') {
+          error = payload.error;
+        }
+      }
+    }
+    return { text, error };
+  }
+
   function showSystemPopup(title, message, isWarning = false) {
     const overlay = document.createElement('div');
     overlay.className = 'custom-modal-overlay active';
@@ -524,10 +590,20 @@
     document.body.removeChild(textarea);
   }
 
+  function renderHistoryMessage(msg) {
+    if (msg.role === 'user') {
+      renderUserMessage(msg.content);
+    } else {
+      renderAssistantMessage(msg.content, null, true); // Skip animation for history
+    }
+  }
+
   async function loadSessionMessages(sessionId) {
     try {
-      const response = await fetch(`/api/sessions/${sessionId}/messages`);
-      const messages = await response.json();
+      const pager = window.createPager(`/api/sessions/${sessionId}/messages?order=desc`);
+      olderMessages = pager;
+      const messages = (await pager.next()).reverse();
+      if (olderMessages !== pager) return; // Another session was opened meanwhile
 
       const container = document.getElementById('messages-container');
       container.innerHTML = '';
@@ -535,14 +611,7 @@
       if (messages.length > 0) {
         hasMessages = true;
         transitionInputToBottom();
-
-        messages.forEach(msg => {
-          if (msg.role === 'user') {
-            renderUserMessage(msg.content);
-          } else {
-            renderAssistantMessage(msg.content, null, true); // Skip animation for history
-          }
-        });
+        messages.forEach(renderHistoryMessage);
       } else {
         hasMessages = false;
         resetInputToCenter();
@@ -552,6 +621,28 @@
     }
   }
 
+  // Prepends the next page of earlier messages, keeping the visible messages in place
+  async function loadOlderMessages() {
+    const pager = olderMessages;
+    if (!pager || pager.done) return;
+    try {
+      const messages = await pager.next();
+      if (olderMessages !== pager || messages.length === 0) return;
+
+      const container = document.getElementById('messages-container');
+      const first = container.firstChild;
+      const start = container.children.length;
+      const previousHeight = container.scrollHeight;
+      const previousTop = container.scrollTop;
+
+      messages.reverse().forEach(renderHistoryMessage);
+      Array.from(container.children).slice(start).forEach(el => container.insertBefore(el, first));
+      container.scrollTop = previousTop + container.scrollHeight - previousHeight;
+    } catch (err) {
+      console.error('Error loading earlier messages:', err);
+    }
+  }
+
   window.loadSession = function (id) {
     currentSessionId = id;
 
@@ -591,6 +682,7 @@
 
     const container = document.getElementById('messages-container');
     if (container) container.innerHTML = '';
+    olderMessages = null;
 
     // Clean URL without reloading
     window.history.replaceState({}, document.title, "/chat");
@@ -622,9 +714,14 @@
   // Fetch hooks from API
   async function fetchHooks() {
     try {
-      const response = await fetch('/api/hooks');
-      const hooks = await response.json();
-      renderHooks(hooks);
+      const pager = window.createPager('/api/hooks');
+      renderHooks(await pager.next());
+      const container = document.getElementById('hook-list-content');
+      if (container) {
+        window.appendLoadMore(container, pager, hooks => {
+          container.insertAdjacentHTML('beforeend', hooks.map(hookHtml).join(''));
+        });
+      }
     } catch (err) {
       console.error('Error fetching hooks:', err);
       renderHooks([]);
@@ -650,7 +747,11 @@
       return;
     }
 
-    container.innerHTML = hooks.map(hook => `
+    container.innerHTML = hooks.map(hookHtml).join('');
+  }
+
+  function hookHtml(hook) {
+    return `
       <div class="hook-item group bg-[var(--bg-main)] border border-[var(--border-color)] rounded-lg p-3 mb-2 hover:border-[var(--accent-primary)] transition-colors">
         <div class="flex justify-between items-start gap-2">
           <p class="text-sm text-[var(--text-main)] flex-1 line-clamp-3">${escapeHtml(hook.content)}</p>
@@ -662,7 +763,7 @@
         </div>
         <p class="text-xs text-[var(--text-muted)] mt-2">${hook.date}</p>
       </div>
-    `).join('');
+    `;
   }
 
   // Delete a hook
@@ -46,7 +46,64 @@
     };
     window.hideToast = function () { };
 
+    // List endpoints are paginated: each page is a plain JSON array and the
+    // cursor for the next one comes back in the X-Next-Cursor header.
+    window.fetchPage = async function (url, cursor = null, limit = 100) {
+        const sep = url.includes('?') ? '&' : '?';
+        let pageUrl = `${url}${sep}limit=${limit}`;
+        if (cursor) pageUrl += `&cursor=${encodeURIComponent(cursor)}`;
+        const res = await fetch(pageUrl);
+        if (!res.ok) throw new Error(`Request failed: ${res.status}`);
+        return { items: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
+    };
+
+    // Lists are loaded a page at a time: next() returns the following page,
+    // or an empty list once the last page has been read.
+    window.createPager = function (url, limit = 50) {
+        let cursor = null;
+        let loading = false;
+        const pager = {
+            done: false,
+            async next() {
+                if (pager.done || loading) return [];
+                loading = true;
+                try {
+                    const page = await window.fetchPage(url, cursor, limit);
+                    cursor = page.nextCursor;
+                    pager.done = !cursor;
+                    return page.items;
+                } finally {
+                    loading = false;
+                }
+            }
+        };
+        return pager;
+    };
+
+    // Puts a "Load more" button at the end of `container` while the pager has pages left;
+    // clicking it hands the next page to `render`, which appends it.
+    window.appendLoadMore = function (container, pager, render, label = 'Load more') {
+        container.querySelector(':scope > .load-more-btn')?.remove();
+        if (pager.done) return;
+        const btn = document.createElement('button');
+        btn.className = 'load-more-btn w-full text-center text-xs text-[var(--text-muted)] hover:text-[var(--text-main)] py-2';
+        btn.textContent = label;
+        btn.onclick = async (e) => {
+            e.stopPropagation();
+            btn.disabled = true;
+            btn.textContent = 'Loading...';
+            try {
+                render(await pager.next());
+            } catch (err) {
+                console.error('Error loading more:', err);
+            }
+            window.appendLoadMore(container, pager, render, label);
+        };
+        container.appendChild(btn);
+    };
+
     let currentFolders = [];
+    let folderPager = null;
 
     document.addEventListener('DOMContentLoaded', () => {
         initTheme();
@@ -93,24 +150,17 @@
 
     async function fetchFolders() {
         try {
-            const res = await fetch('/api/folders');
-            currentFolders = await res.json();
+            folderPager = window.createPager('/api/folders');
+            currentFolders = await folderPager.next();
             renderFolderTree();
 
             // Check if we need to reset to welcome state (only on chat page)
             if (window.resetToWelcomeState && typeof window.resetToWelcomeState === 'function') {
                 const currentSessionId = localStorage.getItem('currentChatSessionId');
                 if (currentSessionId) {
-                    let sessionExists = false;
-                    // Deep search for session in folders
-                    for (const folder of currentFolders) {
-                        if (folder.sessions && folder.sessions.some(s => s.id.toString() === currentSessionId.toString())) {
-                            sessionExists = true;
-                            break;
-                        }
-                    }
-
-                    if (!sessionExists) {
+                    // The session's folder may be on a page that has not been loaded, so ask the server
+                    const res = await fetch(`/api/sessions/${currentSessionId}/info`);
+                    if (res.status === 404) {
                         window.resetToWelcomeState();
                         showToast('Session closed or deleted');
                     }
@@ -136,58 +186,64 @@
 
         if (currentFolders.length === 0) return;
 
-        currentFolders.forEach(folder => {
-            const folderEl = document.createElement('div');
-            folderEl.className = 'mb-1';
-
-            const header = document.createElement('div');
-            header.className = 'group flex items-center justify-between px-3 py-2 hover:bg-[var(--hover-bg)] rounded-lg cursor-pointer transition-colors';
+        currentFolders.forEach(folder => container.appendChild(renderFolder(folder)));
+        window.appendLoadMore(container, folderPager, folders => {
+            currentFolders.push(...folders);
+            folders.forEach(folder => container.appendChild(renderFolder(folder)));
+        }, 'Load more projects');
+    }
 
-            header.onclick = (e) => {
-                if (!e.target.closest('.folder-action')) toggleFolder(folder.id);
+    function renderFolder(folder) {
+        const folderEl = document.createElement('div');
+        folderEl.className = 'mb-1';
+
+        const header = document.createElement('div');
+        header.className = 'group flex items-center justify-between px-3 py-2 hover:bg-[var(--hover-bg)] rounded-lg cursor-pointer transition-colors';
+
+        header.onclick = (e) => {
+            if (!e.target.closest('.folder-action')) toggleFolder(folder.id);
+        };
+
+        header.innerHTML = `
+            <div class="flex items-center gap-2 overflow-hidden">
+                <svg id="arrow-${folder.id}" class="w-3 h-3 text-[var(--text-muted)] transition-transform duration-200 transform -rotate-90" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                     <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 9l-7 7-7-7"></path>
+                </svg>
+                <span class="text-sm font-medium text-[var(--text-main)] whitespace-nowrap overflow-hidden text-ellipsis">${folder.name}</span>
+            </div>
+            <div class="flex items-center gap-1 opacity-0 group-hover:opacity-100 transition-opacity">
+                <button onclick="createSession(${folder.id}, 'New Chat')" class="folder-action p-1 hover:bg-blue-100 text-[var(--text-muted)] hover:text-blue-600 rounded" title="New Chat">
+                    <svg class="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 4v16m8-8H4"></path></svg>
+                </button>
+                <button onclick="showFolderOptions(event, ${folder.id}, '${folder.name}')" class="folder-action p-1 hover:bg-gray-200 text-[var(--text-muted)] rounded" title="Options">
+                     <svg class="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 5v.01M12 12v.01M12 19v.01M12 6a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2z"></path></svg>
+                </button>
+            </div>
+        `;
+
+        const children = document.createElement('div');
+        children.id = `folder-content-${folder.id}`;
+        children.className = 'hidden ml-3 border-l border-[var(--border-color)] mt-1 space-y-0.5';
+
+        folder.sessions.forEach(session => {
+            const sessEl = document.createElement('div');
+            sessEl.className = 'group flex items-center justify-between px-3 py-1.5 hover:bg-[var(--hover-bg)] rounded-r-lg cursor-pointer text-xs text-[var(--text-muted)] hover:text-[var(--text-main)]';
+            sessEl.onclick = (e) => {
+                if (!e.target.closest('.sess-action')) loadSessionGlobal(session.id);
             };
 
-            header.innerHTML = `
-                <div class="flex items-center gap-2 overflow-hidden">
-                    <svg id="arrow-${folder.id}" class="w-3 h-3 text-[var(--text-muted)] transition-transform duration-200 transform -rotate-90" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                         <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 9l-7 7-7-7"></path>
-                    </svg>
-                    <span class="text-sm font-medium text-[var(--text-main)] whitespace-nowrap overflow-hidden text-ellipsis">${folder.name}</span>
-                </div>
-                <div class="flex items-center gap-1 opacity-0 group-hover:opacity-100 transition-opacity">
-                    <button onclick="createSession(${folder.id}, 'New Chat')" class="folder-action p-1 hover:bg-blue-100 text-[var(--text-muted)] hover:text-blue-600 rounded" title="New Chat">
-                        <svg class="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 4v16m8-8H4"></path></svg>
-                    </button>
-                    <button onclick="showFolderOptions(event, ${folder.id}, '${folder.name}')" class="folder-action p-1 hover:bg-gray-200 text-[var(--text-muted)] rounded" title="Options">
-                         <svg class="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 5v.01M12 12v.01M12 19v.01M12 6a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2z"></path></svg>
-                    </button>
-                </div>
+            sessEl.innerHTML = `
+                <span class="truncate pr-2">${session.title}</span>
+                <button onclick="showSessionOptions(event, ${session.id}, '${session.title}')" class="sess-action opacity-0 group-hover:opacity-100 p-0.5 hover:bg-gray-200 rounded">
+                    <svg class="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 5v.01M12 12v.01M12 19v.01M12 6a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2z"></path></svg>
+                </button>
             `;
-
-            const children = document.createElement('div');
-            children.id = `folder-content-${folder.id}`;
-            children.className = 'hidden ml-3 border-l border-[var(--border-color)] mt-1 space-y-0.5';
-
-            folder.sessions.forEach(session => {
-                const sessEl = document.createElement('div');
-                sessEl.className = 'group flex items-center justify-between px-3 py-1.5 hover:bg-[var(--hover-bg)] rounded-r-lg cursor-pointer text-xs text-[var(--text-muted)] hover:text-[var(--text-main)]';
-                sessEl.onclick = (e) => {
-                    if (!e.target.closest('.sess-action')) loadSessionGlobal(session.id);
-                };
-
-                sessEl.innerHTML = `
-                    <span class="truncate pr-2">${session.title}</span>
-                    <button onclick="showSessionOptions(event, ${session.id}, '${session.title}')" class="sess-action opacity-0 group-hover:opacity-100 p-0.5 hover:bg-gray-200 rounded">
-                        <svg class="w-3 h-3" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 5v.01M12 12v.01M12 19v.01M12 6a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2z"></path></svg>
-                    </button>
-                `;
-                children.appendChild(sessEl);
-            });
-
-            folderEl.appendChild(header);
-            folderEl.appendChild(children);
-            container.appendChild(folderEl);
+            children.appendChild(sessEl);
         });
+
+        folderEl.appendChild(header);
+        folderEl.appendChild(children);
+        return folderEl;
     }
 
     window.toggleFolder = function (id) {
@@ -366,8 +422,8 @@
         if (!container) return;
 
         try {
-            const res = await fetch('/api/history');
-            const reports = await res.json();
+            const pager = window.createPager('/api/history');
+            const reports = await pager.next();
 
             if (!reports || reports.length === 0) {
                 container.innerHTML = `
@@ -381,19 +437,26 @@
                 return;
             }
 
-            container.innerHTML = reports.map(report => `
-                <button onclick="selectMergeReport(${report.id}, '${escapeAttr(report.topic)}')" 
-                    class="merge-report-item w-full text-left p-2 rounded-lg text-xs hover:bg-[var(--hover-bg)] transition-colors truncate ${currentMergeReportId === report.id ? 'bg-[var(--accent-primary)]/10 text-[var(--accent-primary)]' : 'text-[var(--text-main)]'}"
-                    title="${escapeAttr(report.topic)}">
-                    ${escapeHtml(report.topic)}
-                </button>
-            `).join('');
+            container.innerHTML = reports.map(mergeReportHtml).join('');
+            window.appendLoadMore(container, pager, more => {
+                container.insertAdjacentHTML('beforeend', more.map(mergeReportHtml).join(''));
+            });
         } catch (e) {
             console.error('Failed to load merge reports', e);
             container.innerHTML = '<div class="text-xs text-red-400 p-2">Failed to load</div>';
         }
     }
 
+    function mergeReportHtml(report) {
+        return `
+            <button onclick="selectMergeReport(${report.id}, '${escapeAttr(report.topic)}')" 
+                class="merge-report-item w-full text-left p-2 rounded-lg text-xs hover:bg-[var(--hover-bg)] transition-colors truncate ${currentMergeReportId === report.id ? 'bg-[var(--accent-primary)]/10 text-[var(--accent-primary)]' : 'text-[var(--text-main)]'}"
+                title="${escapeAttr(report.topic)}">
+                ${escapeHtml(report.topic)}
+            </button>
+        `;
+    }
+
     window.selectMergeReport = async function (id, topic) {
         currentMergeReportId = id;
         byId('merge-report-title').textContent = topic;
@@ -428,8 +491,8 @@
         if (!container) return;
 
         try {
-            const res = await fetch('/api/hooks');
-            const hooks = await res.json();
+            const pager = window.createPager('/api/hooks');
+            const hooks = await pager.next();
 
             if (!hooks || hooks.length === 0) {
                 container.innerHTML = `
@@ -444,28 +507,35 @@
                 return;
             }
 
-            container.innerHTML = hooks.map(hook => `
-                <div class="hook-merge-item group bg-[var(--bg-panel)] border border-[var(--border-color)] rounded-lg p-3 hover:border-[var(--accent-primary)] transition-colors">
-                    <p class="text-sm text-[var(--text-main)] mb-3 line-clamp-4">${escapeHtml(hook.content)}</p>
-                    <div class="flex items-center justify-between">
-                        <span class="text-xs text-[var(--text-muted)]">${hook.date || ''}</span>
-                        <button onclick="smartPushHook(${hook.id}, \`${escapeAttr(hook.content)}\`)" 
-                            class="px-3 py-1.5 text-xs font-medium bg-gradient-to-r from-purple-500 to-indigo-500 hover:opacity-90 text-white rounded-lg shadow-sm transition-all flex items-center gap-1.5"
-                            title="Smart Push: AI will intelligently merge this hook into the report">
-                            <svg class="w-3.5 h-3.5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 10V3L4 14h7v7l9-11h-7z"></path>
-                            </svg>
-                            Smart Push
-                        </button>
-                    </div>
-                </div>
-            `).join('');
+            container.innerHTML = hooks.map(mergeHookHtml).join('');
+            window.appendLoadMore(container, pager, more => {
+                container.insertAdjacentHTML('beforeend', more.map(mergeHookHtml).join(''));
+            });
         } catch (e) {
             console.error('Failed to load merge hooks', e);
             container.innerHTML = '<div class="text-xs text-red-400 p-2">Failed to load hooks</div>';
         }
     }
 
+    function mergeHookHtml(hook) {
+        return `
+            <div class="hook-merge-item group bg-[var(--bg-panel)] border border-[var(--border-color)] rounded-lg p-3 hover:border-[var(--accent-primary)] transition-colors">
+                <p class="text-sm text-[var(--text-main)] mb-3 line-clamp-4">${escapeHtml(hook.content)}</p>
+                <div class="flex items-center justify-between">
+                    <span class="text-xs text-[var(--text-muted)]">${hook.date || ''}</span>
+                    <button onclick="smartPushHook(${hook.id}, \`${escapeAttr(hook.content)}\`)" 
+                        class="px-3 py-1.5 text-xs font-medium bg-gradient-to-r from-purple-500 to-indigo-500 hover:opacity-90 text-white rounded-lg shadow-sm transition-all flex items-center gap-1.5"
+                        title="Smart Push: AI will intelligently merge this hook into the report">
+                        <svg class="w-3.5 h-3.5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 10V3L4 14h7v7l9-11h-7z"></path>
+                        </svg>
+                        Smart Push
+                    </button>
+                </div>
+            </div>
+        `;
+    }
+
     window.saveMergeReport = async function () {
         if (!currentMergeReportId) {
             showToast('Please select a report first');
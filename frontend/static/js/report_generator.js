@@ -157,7 +157,7 @@
       .then(data => {
         if (data.error) throw new Error(data.error);
         if (data.task_id) {
-          pollTaskStatus(data.task_id, useCouncil);
+          streamTaskEvents(data.task_id, useCouncil);
         } else {
           throw new Error('No task ID returned');
         }
@@ -269,6 +269,93 @@
   }
 
 
+  function handleProgressMessage(msg, useCouncil) {
+    if (useCouncil) {
+      updateCouncilAnim(msg);
+    } else {
+      // Standard Linear Update
+      if (msg.includes('Step 1') || msg.includes('Step 2')) animateStep(1);
+      else if (msg.includes('Step 3') || msg.includes('Search')) animateStep(1);
+      else if (msg.includes('Step 4') || msg.includes('Visuals')) animateStep(2);
+      else if (msg.includes('Step 5') || msg.includes('Structure')) animateStep(2);
+      else if (msg.includes('Step 6') || msg.includes('Writing')) animateStep(3);
+      else if (msg.includes('Step 7')) animateStep(4);
+
+      const activeStep = document.querySelector('.scale-100.opacity-100 p.text-xs');
+      if (activeStep) activeStep.textContent = msg.length > 50 ? msg.substring(0, 47) + '...' : msg;
+    }
+  }
+
+  function finishTask(data, useCouncil) {
+    if (useCouncil) {
+      updateCouncilAnim('Finalizing: Merging Reports...');
+      finishCouncilAnim();
+      setTimeout(() => displayResults(data), 1200);
+    } else {
+      animateStep(4);
+      setTimeout(() => displayResults(data), 1000);
+    }
+  }
+
+  // Renders finished sections while the rest of the report is still being written
+  function displayPartialReport(sections) {
+    const resSec = document.getElementById('results-container');
+    if (!resSec) return;
+    resSec.classList.remove('hidden');
+
+    const markdown = sections
+      .filter(Boolean)
+      .map(s => `## ${s.title}\n${s.content}`)
+      .join('\n\n');
+    const output = document.getElementById('report-output');
+    if (typeof marked !== 'undefined') output.innerHTML = marked.parse(markdown);
+    else output.textContent = markdown;
+    document.getElementById('result-topic-display').textContent = document.getElementById('query').value;
+  }
+
+  // Subscribes to the report's Server-Sent Events feed; falls back to polling
+  // /report-status if the browser or server cannot stream.
+  function streamTaskEvents(taskId, useCouncil = false) {
+    if (!window.EventSource) {
+      pollTaskStatus(taskId, useCouncil);
+      return;
+    }
+
+    const source = new EventSource('/report-stream/' + encodeURIComponent(taskId));
+    const sections = [];
+    let finished = false;
+
+    const fallback = () => {
+      source.close();
+      if (!finished) {
+        finished = true;
+        pollTaskStatus(taskId, useCouncil);
+      }
+    };
+
+    source.addEventListener('status', e => {
+      handleProgressMessage(JSON.parse(e.data).message || '', useCouncil);
+    });
+    source.addEventListener('section', e => {
+      const data = JSON.parse(e.data);
+      sections[data.index] = data;
+      displayPartialReport(sections);
+    });
+    source.addEventListener('complete', e => {
+      finished = true;
+      source.close();
+      finishTask(JSON.parse(e.data), useCouncil);
+    });
+    source.addEventListener('failed', e => {
+      finished = true;
+      source.close();
+      showToast('Error: ' + (JSON.parse(e.data).error || 'Unknown error'));
+      setTimeout(resetView, 3000);
+    });
+    source.addEventListener('unavailable', fallback);
+    source.onerror = fallback;
+  }
+
   function pollTaskStatus(taskId, useCouncil = false) {
     const url = window.REPORT_STATUS_URL_TEMPLATE.replace('TASK_ID_PLACEHOLDER', taskId);
 
@@ -276,35 +363,12 @@
       .then(r => r.json())
       .then(data => {
         if (data.status === 'SUCCESS') {
-          if (useCouncil) {
-            updateCouncilAnim('Finalizing: Merging Reports...');
-            finishCouncilAnim();
-            setTimeout(() => displayResults(data), 1200);
-          } else {
-            animateStep(4);
-            setTimeout(() => displayResults(data), 1000);
-          }
+          finishTask(data, useCouncil);
         } else if (data.status === 'FAILURE') {
           showToast('Error: ' + (data.error || 'Unknown error'));
           setTimeout(resetView, 3000);
         } else {
-          const msg = data.message || '';
-
-          if (useCouncil) {
-            updateCouncilAnim(msg);
-          } else {
-            // Standard Linear Update
-            if (msg.includes('Step 1') || msg.includes('Step 2')) animateStep(1);
-            else if (msg.includes('Step 3') || msg.includes('Search')) animateStep(1);
-            else if (msg.includes('Step 4') || msg.includes('Visuals')) animateStep(2);
-            else if (msg.includes('Step 5') || msg.includes('Structure')) animateStep(2);
-            else if (msg.includes('Step 6') || msg.includes('Writing')) animateStep(3);
-            else if (msg.includes('Step 7')) animateStep(4);
-
-            const activeStep = document.querySelector('.scale-100.opacity-100 p.text-xs');
-            if (activeStep) activeStep.textContent = msg.length > 50 ? msg.substring(0, 47) + '...' : msg;
-          }
-
+          handleProgressMessage(data.message || '', useCouncil);
           setTimeout(() => pollTaskStatus(taskId, useCouncil), 2000);
         }
       })
@@ -366,40 +430,63 @@
     }
   };
 
+  function renderHistoryItem(container, item) {
+    const div = document.createElement('div');
+    div.className = 'p-3 hover:bg-[var(--hover-bg)] cursor-pointer border-b border-[var(--border-color)] group transition-colors';
+    div.innerHTML = `
+      <div class="flex justify-between items-start mb-1">
+        <h4 class="text-xs font-bold text-[var(--text-main)] line-clamp-2 group-hover:text-blue-500 transition-colors">${item.topic}</h4>
+      </div>
+      <div class="flex justify-between items-center text-[10px] text-[var(--text-muted)]">
+        <span>${item.date}</span>
+        <button onclick="showReportOptions(event, ${item.id}, '${item.topic.replace(/'/g, "\\'")}')" class="p-0.5 hover:bg-[var(--hover-bg)] rounded opacity-0 group-hover:opacity-100 transition-opacity" title="Options">
+          <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 5v.01M12 12v.01M12 19v.01M12 6a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2z"></path></svg>
+        </button>
+      </div>
+    `;
+    div.onclick = (e) => {
+      if (!e.target.closest('button')) viewReport(item.id);
+    };
+    container.appendChild(div);
+  }
+
+  // Loads one page of history; the "Load more" button fetches the next page via its cursor.
+  async function loadHistoryPage(container, cursor) {
+    const page = await window.fetchPage('/api/history', cursor, 50);
+    container.querySelector('.history-load-more')?.remove();
+    page.items.forEach(item => renderHistoryItem(container, item));
+
+    if (page.nextCursor) {
+      const more = document.createElement('button');
+      more.className = 'history-load-more w-full p-2 text-xs text-[var(--text-muted)] hover:text-[var(--text-main)] hover:bg-[var(--hover-bg)] transition-colors';
+      more.textContent = 'Load more';
+      more.onclick = () => {
+        more.disabled = true;
+        loadHistoryPage(container, page.nextCursor).catch(e => {
+          console.error(e);
+          more.disabled = false;
+        });
+      };
+      container.appendChild(more);
+    }
+    return page.items.length;
+  }
+
   function loadHistory() {
     const container = document.getElementById('history-list-content');
     if (!container) return;
 
     container.innerHTML = '<div class="text-xs text-[var(--text-muted)] p-2">Loading...</div>';
 
-    fetch('/api/history')
-      .then(r => r.json())
-      .then(data => {
+    const list = document.createElement('div');
+    loadHistoryPage(list, null)
+      .then(count => {
         container.innerHTML = '';
-        if (data.length === 0) {
+        if (count === 0) {
           container.innerHTML = '<div class="text-xs text-[var(--text-muted)] p-4 text-center">No reports generated yet.</div>';
           return;
         }
-
-        data.forEach(item => {
-          const div = document.createElement('div');
-          div.className = 'p-3 hover:bg-[var(--hover-bg)] cursor-pointer border-b border-[var(--border-color)] group transition-colors';
-          div.innerHTML = `
-            <div class="flex justify-between items-start mb-1">
-              <h4 class="text-xs font-bold text-[var(--text-main)] line-clamp-2 group-hover:text-blue-500 transition-colors">${item.topic}</h4>
-            </div>
-            <div class="flex justify-between items-center text-[10px] text-[var(--text-muted)]">
-              <span>${item.date}</span>
-              <button onclick="showReportOptions(event, ${item.id}, '${item.topic.replace(/'/g, "\\'")}')" class="p-0.5 hover:bg-[var(--hover-bg)] rounded opacity-0 group-hover:opacity-100 transition-opacity" title="Options">
-                <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 5v.01M12 12v.01M12 19v.01M12 6a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2zm0 7a1 1 0 110-2 1 1 0 010 2z"></path></svg>
-              </button>
-            </div>
-          `;
-          div.onclick = (e) => {
-            if (!e.target.closest('button')) viewReport(item.id);
-          };
-          container.appendChild(div);
-        });
+        container.appendChild(list);
       })
       .catch(e => {
         console.error(e);
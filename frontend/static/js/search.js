@@ -36,12 +36,11 @@
     document.addEventListener('DOMContentLoaded', ()=>{ initTheme(); });
 })();
 
-let searchData = { reports: [], chats: [] };
 let currentSearchTab = 'all';
 let selectedSearchIndex = -1;
 let filteredResults = [];
-
-document.addEventListener('DOMContentLoaded', loadSearchData);
+// The list being shown: its pager, how to turn a page into results, and the render mode
+let resultPager = null;
 
 document.addEventListener('keydown', function (e) {
     if (e.key === 'Escape') {
@@ -49,79 +48,87 @@ document.addEventListener('keydown', function (e) {
     }
 });
 
-async function loadSearchData() {
+const SEARCH_KINDS = { all: ['report', 'hook', 'message'], reports: ['report'], chats: ['message'] };
+const SEARCH_DEBOUNCE_MS = 200;
+let searchTimer = null;
+let searchSeq = 0;
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text == null ? '' : String(text);
+    return div.innerHTML;
+}
+
+function reportResults(reports) {
+    return reports.map(r => ({ id: r.id, type: 'report', title: r.topic || 'Untitled Report', date: r.date }));
+}
+
+function chatResults(folders) {
+    const chats = [];
+    folders.forEach(f => (f.sessions || []).forEach(s => {
+        chats.push({ id: s.id, type: 'chat', title: s.title || 'Untitled Chat', folder: f.name, date: s.created_at || null });
+    }));
+    return chats;
+}
+
+function hitResults(hits) {
+    return hits.map(h => {
+        if (h.type === 'report') return { id: h.id, type: 'report', title: h.title || 'Untitled Report', snippet: h.snippet };
+        if (h.type === 'message') return { id: h.session_id, type: 'chat', title: h.title || 'Untitled Chat', snippet: h.snippet };
+        return { id: h.id, type: 'hook', title: 'Research note', snippet: h.snippet };
+    });
+}
+
+function showResults(results, showAllMode = false) {
+    filteredResults = results;
+    selectedSearchIndex = results.length > 0 ? 0 : -1;
+    renderSearchResults(results, showAllMode);
+}
+
+// Shows the first page of a list; further pages are fetched by loadMoreResults
+async function showPagedResults(pager, toResults, showAllMode = false) {
+    const seq = ++searchSeq;
+    resultPager = { pager, toResults, showAllMode };
+    let results = [];
     try {
-        const container = document.getElementById('search-results');
-        container.innerHTML = `
-            <div class="text-center text-[var(--text-muted)] py-16">
-                <div class="animate-pulse">
-                    <div class="w-12 h-12 mx-auto mb-4 rounded-full bg-[var(--hover-bg)]"></div>
-                    <p class="text-sm">Loading your data...</p>
-                </div>
-            </div>`;
-
-        const reportsRes = await fetch('/api/history');
-        const reports = await reportsRes.json();
-        searchData.reports = reports.map(r => ({ id: r.id, type: 'report', title: r.topic || 'Untitled Report', date: r.date }));
-
-        const contentPromises = searchData.reports.map(async (r) => {
-            try {
-                const contentRes = await fetch(`/api/report/${r.id}`);
-                const content = await contentRes.json();
-                r.preview = content.content ? content.content.substring(0, 150).replace(/[#*_`]/g, '') + '...' : '';
-            } catch (e) { r.preview = ''; }
-        });
-        await Promise.all(contentPromises);
-
-        const foldersRes = await fetch('/api/folders');
-        const folders = await foldersRes.json();
-        searchData.chats = [];
-        folders.forEach(f => {
-            if (f.sessions && f.sessions.length > 0) {
-                f.sessions.forEach(s => {
-                    searchData.chats.push({ id: s.id, type: 'chat', title: s.title || 'Untitled Chat', folder: f.name, date: s.created_at || null });
-                });
-            }
-        });
-
-        container.innerHTML = `
-            <div class="text-center text-[var(--text-muted)] py-16">
-                <svg class="w-16 h-16 mx-auto mb-4 opacity-30" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="1.5">
-                    <circle cx="11" cy="11" r="8"></circle>
-                    <line x1="21" y1="21" x2="16.65" y2="16.65"></line>
-                </svg>
-                <h2 class="text-xl font-semibold text-[var(--text-main)] mb-2">Search ScholarForge</h2>
-                <p class="text-sm">Find your reports and chat sessions quickly</p>
-                <p class="text-xs mt-3 text-[var(--accent-primary)]">
-                    ${searchData.reports.length} reports • ${searchData.chats.length} chats loaded
-                </p>
-            </div>`;
-
-    } catch (err) {
-        console.error('Failed to load search data:', err);
-        document.getElementById('search-results').innerHTML = `<div class="text-center text-red-400 py-16"><p class="text-sm">Failed to load data. Please try refreshing.</p></div>`;
-    }
+        results = toResults(await pager.next());
+    } catch (e) { console.error('Search failed:', e); }
+    if (seq !== searchSeq) return;
+    showResults(results, showAllMode);
+}
+
+async function loadMoreResults() {
+    const current = resultPager;
+    if (!current) return;
+    let results = [];
+    try {
+        results = current.toResults(await current.pager.next());
+    } catch (e) { console.error('Search failed:', e); }
+    if (current !== resultPager) return;
+    filteredResults = filteredResults.concat(results);
+    renderSearchResults(filteredResults, current.showAllMode);
 }
 
 function performSearch(query) {
     const q = query.trim().toLowerCase();
-    let results = [];
+    clearTimeout(searchTimer);
     if (!q) {
-        if (currentSearchTab === 'reports') results = [...searchData.reports];
-        else if (currentSearchTab === 'chats') results = [...searchData.chats];
-        else { renderSearchResults([]); return; }
-    } else {
-        if (currentSearchTab === 'all' || currentSearchTab === 'reports') {
-            searchData.reports.forEach(r => { if (r.title.toLowerCase().includes(q) || (r.preview && r.preview.toLowerCase().includes(q))) results.push(r); });
-        }
-        if (currentSearchTab === 'all' || currentSearchTab === 'chats') {
-            searchData.chats.forEach(c => { if (c.title.toLowerCase().includes(q) || (c.folder && c.folder.toLowerCase().includes(q))) results.push(c); });
+        if (currentSearchTab === 'reports') showPagedResults(window.createPager('/api/history'), reportResults, true);
+        else if (currentSearchTab === 'chats') showPagedResults(window.createPager('/api/folders'), chatResults, true);
+        else {
+            searchSeq++;
+            resultPager = null;
+            showResults([]);
         }
+        return;
     }
+    searchTimer = setTimeout(() => runServerSearch(q), SEARCH_DEBOUNCE_MS);
+}
 
-    filteredResults = results;
-    selectedSearchIndex = results.length > 0 ? 0 : -1;
-    renderSearchResults(results, !q && currentSearchTab !== 'all');
+function runServerSearch(q) {
+    const params = new URLSearchParams({ q });
+    SEARCH_KINDS[currentSearchTab].forEach(k => params.append('kind', k));
+    showPagedResults(window.createPager(`/api/search?${params}`, 20), hitResults);
 }
 
 function switchSearchTab(tab) {
@@ -148,10 +155,12 @@ function renderSearchResults(results, showAllMode = false) {
         return;
     }
 
-    let headerText = `${results.length} result${results.length !== 1 ? 's' : ''} found`;
+    const hasMore = resultPager && !resultPager.pager.done;
+    const count = `${results.length}${hasMore ? '+' : ''}`;
+    let headerText = `${count} result${results.length !== 1 ? 's' : ''} found`;
     if (showAllMode) {
-        if (currentSearchTab === 'reports') headerText = `📄 All Reports (${results.length})`;
-        else if (currentSearchTab === 'chats') headerText = `💬 All Chat Sessions (${results.length})`;
+        if (currentSearchTab === 'reports') headerText = `📄 All Reports (${count})`;
+        else if (currentSearchTab === 'chats') headerText = `💬 All Chat Sessions (${count})`;
     }
 
     container.innerHTML = `<div class="text-sm font-medium text-[var(--text-main)] mb-4">${headerText}</div><div class="space-y-2">${results.map((r, idx) => `
@@ -159,21 +168,22 @@ function renderSearchResults(results, showAllMode = false) {
             <div class="flex items-start gap-4">
                 <div class="mt-1 p-2 rounded-lg bg-[var(--hover-bg)]">${r.type === 'report' ? `<svg class="w-5 h-5 text-[var(--accent-primary)]" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12h6m-6 4h6m2 5H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z"></path></svg>` : `<svg class="w-5 h-5 text-green-400" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M8 12h.01M12 12h.01M16 12h.01M21 12c0 4.418-4.03 8-9 8a9.863 9.863 0 01-4.255-.949L3 20l1.395-3.72C3.512 15.042 3 13.574 3 12c0-4.418 4.03-8 9-8s9 3.582 9 8z"></path></svg>`}</div>
                 <div class="flex-1 min-w-0">
-                    <div class="flex items-center gap-2 mb-1"><span class="font-medium text-[var(--text-main)]">${r.title}</span><span class="text-xs px-2 py-0.5 rounded-full bg-[var(--hover-bg)] text-[var(--text-muted)]">${r.type === 'report' ? 'Report' : 'Chat'}</span></div>
-                    ${r.preview ? `<p class="text-sm text-[var(--text-muted)] line-clamp-2">${r.preview}</p>` : ''}
-                    ${r.folder ? `<p class="text-xs text-[var(--text-muted)] mt-1">📁 ${r.folder}</p>` : ''}
+                    <div class="flex items-center gap-2 mb-1"><span class="font-medium text-[var(--text-main)]">${escapeHtml(r.title)}</span><span class="text-xs px-2 py-0.5 rounded-full bg-[var(--hover-bg)] text-[var(--text-muted)]">${r.type === 'report' ? 'Report' : r.type === 'hook' ? 'Hook' : 'Chat'}</span></div>
+                    ${r.snippet ? `<p class="text-sm text-[var(--text-muted)] line-clamp-2">${r.snippet}</p>` : ''}
+                    ${r.folder ? `<p class="text-xs text-[var(--text-muted)] mt-1">📁 ${escapeHtml(r.folder)}</p>` : ''}
                     ${r.date ? `<p class="text-xs text-[var(--text-muted)] mt-1">${r.date}</p>` : ''}
                 </div>
                 <div class="text-[var(--text-muted)]"><svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 5l7 7-7 7"></path></svg></div>
             </div>
         </div>
-    `).join('')}</div>`;
+    `).join('')}</div>${hasMore ? `<button onclick="loadMoreResults()" class="w-full mt-4 py-2 text-sm text-[var(--text-muted)] hover:text-[var(--text-main)]">Load more</button>` : ''}`;
 }
 
 function selectSearchResult(index) {
     const result = filteredResults[index]; if (!result) return;
     if (result.type === 'report') window.location.href = '/?show_report=' + result.id;
     else if (result.type === 'chat') window.location.href = `/chat?session_id=${result.id}`;
+    else if (result.type === 'hook') window.location.href = '/';
 }
 
 function handleSearchKeydown(e) {
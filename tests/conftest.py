@@ -8,6 +8,7 @@ This module provides pytest fixtures for:
 """
 
 import os
+import asyncio
 import pytest
 import tempfile
 from sqlalchemy import create_engine, event, pool
@@ -23,9 +24,14 @@ os.environ["APP_SECRET_KEY"] = "test-secret-key"
 os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
 os.environ.setdefault("SERP_KEY", "test-key")
 os.environ.setdefault("CELERY_BROKER_URL", "redis://redis:6379/0")
+os.environ.setdefault("CACHE_REDIS_ENABLED", "false")
+os.environ.setdefault("EXTRACTION_CACHE_ENABLED", "false")
+os.environ.setdefault("VECTOR_STORE_ENABLED", "false")
+os.environ.setdefault("LLM_RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("EMBEDDING_MODEL", "hashing")
 
 # Import after setting environment
-from backend import database
+from backend import async_database, database, model_router
 from backend.database import ProjectFolder, ChatSession, ChatMessage, ReportDB, Hook, Base
 from backend.main import app
 
@@ -54,6 +60,14 @@ def cleanup_test_db():
         print(f"Failed to cleanup test DB: {e}")
 
 
+@pytest.fixture(autouse=True)
+def reset_model_router():
+    """Model health is process-wide; start each test with every circuit closed."""
+    model_router.router.reset()
+    yield
+    model_router.router.reset()
+
+
 @pytest.fixture
 def test_db(monkeypatch):
     """Create a clean database session for each test."""
@@ -86,6 +100,9 @@ def test_db(monkeypatch):
             pass
     
     app.dependency_overrides[database.get_db] = override_get_db
+
+    # The async engine cannot see this connection's transaction: use the sync code path
+    monkeypatch.setattr(async_database, "AsyncSessionLocal", None)
     
     yield test_session
     
@@ -97,6 +114,30 @@ def test_db(monkeypatch):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def async_db(tmp_path, monkeypatch):
+    """
+    A fresh database file behind both the sync session factory and a real aiosqlite engine,
+    so request-path calls take the async code path. Data is committed, not rolled back.
+    """
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(
+        autocommit=False, autoflush=False, bind=sync_engine, expire_on_commit=False
+    ))
+    assert async_database.init_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield
+    asyncio.run(async_database.dispose())
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def async_client(async_db):
+    """A FastAPI TestClient whose request-path database calls go through the async engine."""
+    return TestClient(app)
+
+
 @pytest.fixture
 def db_session(test_db):
     """Alias for test_db fixture."""
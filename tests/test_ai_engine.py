@@ -0,0 +1,247 @@
+"""
+Report Pipeline Tests
+
+Tests for the report generation pipeline in AI_engine:
+- Concurrent section writing
+- Section ordering and progress reporting
+- Async pipeline and its sync Celery entry point
+- Event publishing when Redis fails
+"""
+
+import asyncio
+import threading
+
+import pytest
+from backend import AI_engine
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    """Stub out every network-bound pipeline step."""
+    async def assess(query, ctx):
+        return "SKIP_SEARCH"
+
+    async def summarize(search, topic, pdf=""):
+        return "summary"
+
+    async def chart(summary, topic):
+        return None
+
+    async def outline(topic, summary, fmt, pages):
+        return [f"{i}. Section {i}" for i in range(1, 7)]
+
+    monkeypatch.setattr(AI_engine, "assess_search_need_async", assess)
+    monkeypatch.setattr(AI_engine, "generate_summary_async", summarize)
+    monkeypatch.setattr(AI_engine, "generate_chart_from_data_async", chart)
+    monkeypatch.setattr(AI_engine, "generate_outline_async", outline)
+
+
+def section_writer(fn):
+    """Wrap a plain function as an async write_section_async replacement."""
+    async def writer(section_title, *args):
+        return fn(section_title, *args)
+    return writer
+
+
+class FakeTask:
+    def __init__(self):
+        self.messages = []
+        self.threads = set()
+
+    def update_state(self, task_id=None, state=None, meta=None):
+        self.messages.append(meta["message"])
+        self.threads.add(threading.get_ident())
+
+
+class TestParallelSections:
+    """Test concurrent section writing."""
+
+    @pytest.mark.unit
+    def test_sections_keep_outline_order(self, fake_pipeline, monkeypatch):
+        """Sections finishing out of order are still assembled in outline order."""
+        async def slow_first(section_title, topic, summary, full_report_context, word_limit):
+            # Earlier sections take longer so they complete last
+            await asyncio.sleep(0.01 * (7 - int(section_title.split(".")[0])))
+            return f"body of {section_title}"
+
+        monkeypatch.setattr(AI_engine, "write_section_async", slow_first)
+        _, report, _ = AI_engine.run_ai_engine_with_return("topic", "literature_review", 5)
+
+        positions = [report.index(f"body of {i}. Section {i}") for i in range(1, 7)]
+        assert positions == sorted(positions)
+
+    @pytest.mark.unit
+    def test_concurrency_limit_respected(self, fake_pipeline, monkeypatch):
+        """No more than section_concurrency sections run at once."""
+        state = {"active": 0, "peak": 0}
+
+        async def tracked(section_title, topic, summary, full_report_context, word_limit):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.02)
+            state["active"] -= 1
+            return "body"
+
+        monkeypatch.setattr(AI_engine, "write_section_async", tracked)
+        AI_engine.run_ai_engine_with_return("topic", "literature_review", 5, section_concurrency=2)
+
+        assert state["peak"] == 2
+
+    @pytest.mark.unit
+    def test_progress_reported_per_section(self, fake_pipeline, monkeypatch):
+        """Each finished section is reported through task.update_state."""
+        monkeypatch.setattr(AI_engine, "write_section_async", section_writer(lambda *args: "body"))
+        task = FakeTask()
+        AI_engine.run_ai_engine_with_return("topic", "literature_review", 5, task=task)
+
+        section_updates = [m for m in task.messages if m.startswith("Step 6/7: Wrote Section")]
+        assert len(section_updates) == 6
+        assert section_updates[-1].startswith("Step 6/7: Wrote Section 6/6")
+
+    @pytest.mark.unit
+    def test_status_writes_run_off_the_event_loop(self, fake_pipeline, monkeypatch):
+        """Celery state updates go through the writer thread, in order, and are all done on return."""
+        monkeypatch.setattr(AI_engine, "write_section_async", section_writer(lambda *args: "body"))
+        task = FakeTask()
+        AI_engine.run_ai_engine_with_return("topic", "literature_review", 5, task=task)
+
+        assert threading.get_ident() not in task.threads
+        assert task.messages[0] == "Step 1/7: Processing Inputs..."
+        assert task.messages[-1].startswith("    > Critical path")
+
+    @pytest.mark.unit
+    def test_failed_section_does_not_abort_report(self, fake_pipeline, monkeypatch):
+        """A section that raises is left empty instead of failing the whole report."""
+        def flaky(section_title, *args):
+            if section_title.startswith("3."):
+                raise RuntimeError("boom")
+            return f"body of {section_title}"
+
+        monkeypatch.setattr(AI_engine, "write_section_async", section_writer(flaky))
+        _, report, _ = AI_engine.run_ai_engine_with_return("topic", "literature_review", 5)
+
+        assert "## 3. Section 3" in report
+        assert "body of 6. Section 6" in report
+
+
+class TestReportEvents:
+    """Test incremental section publishing."""
+
+    @pytest.mark.unit
+    def test_sections_published_as_they_finish(self, fake_pipeline, monkeypatch):
+        published = []
+        monkeypatch.setattr(
+            AI_engine.report_events, "publish",
+            lambda task_id, event, payload: published.append((task_id, event, payload))
+        )
+        monkeypatch.setattr(AI_engine, "write_section_async", section_writer(lambda title, *args: f"body of {title}"))
+
+        task = FakeTask()
+        task.request = type("Request", (), {"id": "task-123"})()
+        AI_engine.run_ai_engine_with_return("topic", "literature_review", 5, task=task)
+
+        assert {task_id for task_id, _, _ in published} == {"task-123"}
+        outline_events = [p for _, e, p in published if e == "outline"]
+        section_events = [p for _, e, p in published if e == "section"]
+        assert outline_events[0]["sections"][0] == "1. Section 1"
+        assert sorted(p["index"] for p in section_events) == list(range(6))
+        assert all(p["content"] == f"body of {p['title']}" and p["total"] == 6 for p in section_events)
+
+    @pytest.mark.unit
+    def test_terminal_publish_retried_after_failure(self, monkeypatch):
+        from backend import report_events
+        attempts, written = [], []
+
+        class FlakyPipeline:
+            def xadd(self, key, fields, **kwargs):
+                self.event = fields["event"]
+
+            def expire(self, key, ttl):
+                pass
+
+            def execute(self):
+                attempts.append(self.event)
+                if len(attempts) <= 2:
+                    raise ConnectionError("redis down")
+                written.append(self.event)
+
+        class FlakyRedis:
+            def pipeline(self):
+                return FlakyPipeline()
+
+        monkeypatch.setattr(report_events, "_redis", FlakyRedis())
+        monkeypatch.setattr(report_events, "_redis_down_until", 0.0)
+        monkeypatch.setattr(report_events, "TERMINAL_RETRY_DELAY", 0)
+
+        report_events.publish("task-1", report_events.SECTION, {"index": 0})
+        report_events.publish("task-1", report_events.STATUS, {"message": "skipped while Redis is down"})
+        report_events.publish("task-1", report_events.COMPLETE, {"report_content": "# Done"})
+
+        assert attempts == ["section", "complete", "complete"]
+        assert written == ["complete"]
+
+class TestAsyncPipeline:
+    """Test the async-native pipeline."""
+
+    @pytest.mark.unit
+    async def test_runs_inside_existing_loop(self, fake_pipeline, monkeypatch):
+        """run_ai_engine_async can be awaited directly, e.g. from the API's event loop."""
+        monkeypatch.setattr(AI_engine, "write_section_async", section_writer(lambda title, *args: f"body of {title}"))
+        _, report, chart_path = await AI_engine.run_ai_engine_async("topic", "literature_review", 5)
+        assert "body of 6. Section 6" in report
+        assert chart_path is None
+
+    @pytest.mark.unit
+    def test_chart_overlaps_sections(self, fake_pipeline, monkeypatch):
+        """The chart is generated while sections are written, not before them."""
+        order = []
+
+        async def chart(summary, topic):
+            order.append("chart start")
+            await asyncio.sleep(0.05)
+            order.append("chart end")
+            return "static/charts/c.png"
+
+        async def writer(section_title, *args):
+            order.append("section")
+            return "body"
+
+        monkeypatch.setattr(AI_engine, "generate_chart_from_data_async", chart)
+        monkeypatch.setattr(AI_engine, "write_section_async", writer)
+        _, _, chart_path = AI_engine.run_ai_engine_with_return("topic", "literature_review", 5)
+
+        assert chart_path == "static/charts/c.png"
+        assert order.index("section") < order.index("chart end")
+
+    @pytest.mark.unit
+    def test_critical_path_reported(self, fake_pipeline, monkeypatch):
+        monkeypatch.setattr(AI_engine, "write_section_async", section_writer(lambda *args: "body"))
+        task = FakeTask()
+        AI_engine.run_ai_engine_with_return("topic", "literature_review", 5, task=task)
+
+        report = task.messages[-1]
+        assert report.startswith("    > Critical path: inputs")
+        assert "sections" in report
+
+    @pytest.mark.unit
+    def test_call_llm_async_falls_back_to_backup(self, monkeypatch):
+        """A failing primary model switches to the backup without recursion."""
+        models = []
+
+        class FakeResponse:
+            def __init__(self, status_code):
+                self.status_code = status_code
+
+            def json(self):
+                return {"choices": [{"message": {"content": "backup answer"}}]}
+
+        class FakeAsyncClient:
+            async def post(self, url, headers, json, timeout):
+                models.append(json["model"])
+                return FakeResponse(500 if json["model"] == "primary" else 200)
+
+        monkeypatch.setattr(AI_engine.http_client, "get_async_client", lambda url: FakeAsyncClient())
+        result = asyncio.run(AI_engine.call_llm_async("primary", "sys", "prompt", use_cache=False))
+
+        assert result == "backup answer"
+        assert models == ["primary", AI_engine.BACKUP_MODEL]
@@ -8,6 +8,7 @@ Tests for FastAPI endpoints:
 - PUT /api/folders/{id} (rename folder)
 - DELETE /api/folders/{id} (delete folder)
 - Chat and report endpoints
+- GET /api/search (full-text search)
 """
 
 import pytest
@@ -33,7 +34,7 @@ class TestHealthCheck:
         response = client.get("/health")
         data = response.json()
         assert "database" in data["components"]
-        assert "status" in data["components"]["database"]
+        assert data["components"]["database"]["status"] == "ok"
 
 
 class TestFolderEndpoints:
@@ -155,6 +156,15 @@ class TestSessionEndpoints:
         assert len(data) == 3
         assert data[0]["role"] == "user"
         assert data[0]["content"] == "Hello"
+
+    @pytest.mark.unit
+    def test_get_session_messages_newest_first(self, client, sample_session, sample_messages):
+        """Test paging a session's messages from its end."""
+        response = client.get(f"/api/sessions/{sample_session.id}/messages?order=desc&limit=2")
+        assert response.status_code == 200
+        assert [m["content"] for m in response.json()] == [m.content for m in sample_messages[::-1][:2]]
+        assert response.headers["X-Next-Cursor"]
+        assert client.get(f"/api/sessions/{sample_session.id}/messages?order=sideways").status_code == 422
     
     @pytest.mark.unit
     def test_rename_session(self, client, sample_session):
@@ -194,6 +204,31 @@ class TestHistoryEndpoints:
         assert len(data) > 0
         assert data[0]["topic"] == sample_report.topic
     
+    @pytest.mark.unit
+    def test_history_pagination(self, client, test_db):
+        """Test following X-Next-Cursor through every page of history."""
+        from backend import database
+        for i in range(5):
+            database.save_report(f"Topic {i}", "content")
+
+        topics, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/history", params=params)
+            assert response.status_code == 200
+            assert len(response.json()) <= 2
+            topics.extend(r["topic"] for r in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert sorted(topics) == [f"Topic {i}" for i in range(5)]
+
+    @pytest.mark.unit
+    def test_invalid_cursor_rejected(self, client):
+        """Test that a malformed cursor is a client error."""
+        response = client.get("/api/hooks", params={"cursor": "garbage"})
+        assert response.status_code == 400
+
     @pytest.mark.unit
     def test_get_report(self, client, sample_report):
         """Test retrieving a specific report."""
@@ -211,6 +246,19 @@ class TestHistoryEndpoints:
         data = response.json()
         assert "error" in data
     
+    @pytest.mark.unit
+    def test_update_report_content(self, client, sample_report):
+        """Test editing a report's content."""
+        response = client.put(f"/api/report/{sample_report.id}/content", json={"content": "# Edited"})
+        assert response.json()["status"] == "success"
+        assert client.get(f"/api/report/{sample_report.id}").json()["content"] == "# Edited"
+
+    @pytest.mark.unit
+    def test_update_nonexistent_report_content(self, client):
+        """Test editing a report that doesn't exist."""
+        response = client.put("/api/report/99999/content", json={"content": "x"})
+        assert response.status_code == 404
+
     @pytest.mark.unit
     def test_delete_report(self, client, sample_report):
         """Test deleting a report."""
@@ -252,6 +300,33 @@ class TestHookEndpoints:
         assert any(h["id"] == sample_hook.id for h in data)
 
 
+class TestSearchEndpoint:
+    """Test full-text search endpoint."""
+
+    @pytest.mark.unit
+    def test_search_returns_ranked_hits(self, client, sample_report, sample_hook):
+        response = client.get("/api/search", params={"q": "test"})
+        assert response.status_code == 200
+        data = response.json()
+        hits = {h["type"]: h for h in data}
+        assert set(hits) == {"report", "hook"}
+        assert hits["report"]["id"] == sample_report.id
+        assert hits["report"]["snippet"] == "# <mark>Test</mark> Report\n\nThis is a <mark>test</mark> report."
+        assert hits["hook"]["id"] == sample_hook.id
+        assert "a <mark>test</mark> hook" in hits["hook"]["snippet"]
+
+    @pytest.mark.unit
+    def test_search_kind_filter_and_cursor(self, client, sample_report, sample_hook):
+        response = client.get("/api/search", params={"q": "test", "kind": "hook", "limit": 1})
+        assert [h["id"] for h in response.json()] == [sample_hook.id]
+        assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.unit
+    def test_search_rejects_unknown_kind(self, client):
+        response = client.get("/api/search", params={"q": "test", "kind": "folder"})
+        assert response.status_code == 400
+
+
 class TestPageEndpoints:
     """Test page serving endpoints."""
     
@@ -326,3 +401,199 @@ class TestErrorHandling:
             headers={"content-type": "application/json"}
         )
         assert response.status_code == 422
+
+
+class TestChatStreamEndpoint:
+    """Test the Server-Sent Events chat endpoint."""
+    
+    @pytest.mark.unit
+    def test_chat_stream_emits_deltas_and_saves(self, client, sample_session, monkeypatch):
+        """Test that deltas are streamed and the exchange is saved afterwards."""
+        from backend import chat_engine, database
+        
+        async def fake_stream(**kwargs):
+            for piece in ["Hello", ", ", "world"]:
+                yield piece
+        
+        monkeypatch.setattr(chat_engine, "stream_chat_response_async", fake_stream)
+        response = client.post(
+            "/chat/stream",
+            data={"message": "Hi", "session_id": str(sample_session.id)}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.count("event: delta") == 3
+        assert "event: done" in response.text
+        
+        messages = database.get_session_messages(sample_session.id)
+        assert [m.role for m in messages] == ["user", "assistant"]
+        assert messages[-1].content == "Hello, world"
+    
+    @pytest.mark.unit
+    def test_chat_stream_reports_errors(self, client, sample_session, monkeypatch):
+        """Test that an upstream failure becomes an error event."""
+        from backend import chat_engine
+        
+        async def failing_stream(**kwargs):
+            raise chat_engine.ChatStreamError("All models down")
+            yield  # pragma: no cover
+        
+        monkeypatch.setattr(chat_engine, "stream_chat_response_async", failing_stream)
+        response = client.post(
+            "/chat/stream",
+            data={"message": "Hi", "session_id": str(sample_session.id)}
+        )
+        assert "event: error" in response.text
+        assert "All models down" in response.text
+        assert "event: done" not in response.text
+
+    @pytest.mark.unit
+    def test_chat_stream_attachments_extracted(self, client, sample_session, monkeypatch):
+        """Test that attachments reach the model as file context and are noted in the saved message."""
+        from backend import chat_engine, database, extraction
+
+        captured = {}
+
+        async def fake_stream(**kwargs):
+            captured.update(kwargs)
+            yield "ok"
+
+        monkeypatch.setattr(extraction, "EXTRACTION_WORKERS", 0)
+        monkeypatch.setattr(chat_engine, "stream_chat_response_async", fake_stream)
+        extraction.shutdown()
+        response = client.post(
+            "/chat/stream",
+            data={"message": "Summarize", "session_id": str(sample_session.id)},
+            files=[
+                ("files", ("a.txt", b"first notes", "text/plain")),
+                ("files", ("b.png", b"\x89PNG", "image/png")),
+            ]
+        )
+        extraction.shutdown()
+        assert response.status_code == 200
+        assert "--- FILE: a.txt ---\nfirst notes" in captured["file_context"]
+        assert "[Unsupported file type: b.png]" in captured["file_context"]
+        assert database.get_session_messages(sample_session.id)[0].content.endswith("[Attached: a.txt, b.png]")
+
+
+class TestReportStreamEndpoint:
+    """Test the report Server-Sent Events endpoint."""
+    
+    @pytest.mark.unit
+    def test_report_stream_relays_events(self, client, monkeypatch):
+        """Test that stream entries are relayed as SSE frames with ids."""
+        from backend import main, report_events
+        seen = {}
+        
+        async def fake_subscribe(task_id, last_id="0-0", block_ms=15000):
+            seen["args"] = (task_id, last_id)
+            yield "1-0", "section", {"index": 0, "title": "Intro", "content": "Body"}
+            yield None, None, None
+            yield "2-0", "complete", {"report_content": "# Done", "chart_path": None}
+        
+        class RunningResult:
+            def __init__(self, task_id, app=None):
+                self.state = "STARTED"
+
+        monkeypatch.setattr(report_events, "subscribe", fake_subscribe)
+        monkeypatch.setattr(main, "AsyncResult", RunningResult)
+        response = client.get("/report-stream/abc", headers={"Last-Event-ID": "0-5"})
+        assert response.status_code == 200
+        assert seen["args"] == ("abc", "0-5")
+        assert "id: 1-0\nevent: section" in response.text
+        assert ": keep-alive" in response.text
+        assert "event: complete" in response.text
+    
+    @pytest.mark.unit
+    def test_report_stream_unavailable(self, client, monkeypatch):
+        """Test that an unreachable event store tells the client to fall back."""
+        from backend import report_events
+        
+        async def broken_subscribe(task_id, last_id="0-0", block_ms=15000):
+            raise ConnectionError("redis down")
+            yield  # pragma: no cover
+        
+        monkeypatch.setattr(report_events, "subscribe", broken_subscribe)
+        response = client.get("/report-stream/abc")
+        assert "event: unavailable" in response.text
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("state, event", [("PENDING", "failed"), ("SUCCESS", "unavailable")])
+    def test_report_stream_without_events(self, client, monkeypatch, state, event):
+        """Test that a task without a stream ends at once: unknown ids fail, expired ones fall back."""
+        from backend import main, report_events
+
+        async def missing_subscribe(task_id, last_id="0-0", block_ms=15000):
+            raise report_events.StreamNotFound(task_id)
+            yield  # pragma: no cover
+
+        class FakeResult:
+            def __init__(self, task_id, app=None):
+                self.state = state
+
+        monkeypatch.setattr(report_events, "subscribe", missing_subscribe)
+        monkeypatch.setattr(main, "AsyncResult", FakeResult)
+        response = client.get("/report-stream/nope")
+        assert f"event: {event}" in response.text
+        assert "keep-alive" not in response.text
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("state, result, event", [
+        ("SUCCESS", {"status": "SUCCESS", "report_content": "# Done", "chart_path": None}, "complete"),
+        ("SUCCESS", {"status": "FAILURE", "error": "boom"}, "failed"),
+        ("FAILURE", None, "failed"),
+    ])
+    def test_report_stream_ends_when_terminal_event_was_lost(self, client, monkeypatch, state, result, event):
+        """Test that an idle stream for a finished task ends from the Celery result."""
+        from backend import main, report_events
+
+        async def idle_subscribe(task_id, last_id="0-0", block_ms=15000):
+            yield "1-0", "status", {"message": "Queued..."}
+            while True:
+                yield None, None, None
+
+        class FinishedResult:
+            def __init__(self, task_id, app=None):
+                self.state = state
+                self.result = result
+                self.info = RuntimeError("worker lost")
+
+        monkeypatch.setattr(report_events, "subscribe", idle_subscribe)
+        monkeypatch.setattr(main, "AsyncResult", FinishedResult)
+        response = client.get("/report-stream/abc")
+        assert f"event: {event}" in response.text
+        assert "keep-alive" not in response.text
+        if event == "complete":
+            assert '"report_content": "# Done"' in response.text
+
+
+class TestStartReportEndpoint:
+    """Test report task submission."""
+    
+    @pytest.mark.unit
+    def test_uploads_passed_by_reference(self, client, monkeypatch, tmp_path):
+        """Test that uploaded bytes are spooled and only references reach Celery."""
+        from backend import main, blob_store
+        monkeypatch.setattr(blob_store, "SPOOL_DIR", str(tmp_path))
+        captured = {}
+        
+        class FakeTask:
+            id = "task-1"
+        
+        def fake_delay(*args):
+            captured["args"] = args
+            return FakeTask()
+        
+        monkeypatch.setattr(main.generate_report_task, "delay", fake_delay)
+        monkeypatch.setattr(main.report_events, "publish", lambda *args: captured.setdefault("published", args))
+        response = client.post(
+            "/start-report",
+            data={"query": "Topic", "format_key": "literature_review"},
+            files=[("pdf_files", ("notes.txt", b"uploaded notes", "text/plain"))]
+        )
+        assert response.json() == {"task_id": "task-1"}
+        assert captured["published"][:2] == ("task-1", "status")
+        
+        file_data_list = captured["args"][3]
+        assert "content" not in file_data_list[0]
+        assert blob_store.read_file_data(file_data_list[0]) == b"uploaded notes"
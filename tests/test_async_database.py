@@ -0,0 +1,150 @@
+"""
+Async Database Layer Tests
+
+Tests for the async request-path database functions:
+- Async driver URL mapping
+- Fallback to the sync functions
+- aiosqlite engine round trips
+- API endpoints on the async engine
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from backend import async_database, database
+from backend.database import ReportDB
+
+
+@pytest.fixture
+async def async_engine(tmp_path):
+    """A real aiosqlite engine on a fresh database file, outside the test_db transaction."""
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    database.Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    assert async_database.init_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield
+    await async_database.dispose()
+
+
+@pytest.fixture
+async def async_session_id(async_engine):
+    async with async_database.get_async_db_session() as db:
+        folder = database.ProjectFolder(name="Async Folder")
+        session = database.ChatSession(folder=folder, title="Async Session")
+        db.add(session)
+    return session.id
+
+
+class TestAsyncUrl:
+    """Test async driver URL mapping."""
+
+    @pytest.mark.unit
+    def test_sqlite_uses_aiosqlite(self):
+        assert async_database.async_url("sqlite:////data/app.db") == "sqlite+aiosqlite:////data/app.db"
+
+    @pytest.mark.unit
+    def test_postgres_uses_asyncpg(self):
+        url = "postgresql+asyncpg://user:pw@db:5432/app"
+        assert async_database.async_url("postgresql://user:pw@db:5432/app") == url
+        assert async_database.async_url("postgresql+psycopg2://user:pw@db:5432/app") == url
+
+    @pytest.mark.unit
+    def test_unsupported_backend(self):
+        assert async_database.async_url("mysql://user:pw@db/app") is None
+
+
+class TestSyncFallback:
+    """Test that calls run the sync functions when no async engine is configured."""
+
+    @pytest.mark.unit
+    async def test_save_and_read_context(self, test_db, sample_session):
+        await async_database.save_chat_messages(sample_session.id, [("user", "Q"), ("assistant", "A")])
+        summary, through_id, recent = await async_database.get_chat_context(sample_session.id, 10)
+        assert summary is None and through_id is None
+        assert [(m.role, m.content) for m in recent] == [("user", "Q"), ("assistant", "A")]
+
+    @pytest.mark.unit
+    async def test_update_missing_report(self, test_db):
+        assert await async_database.update_report_content(99999, "x") is False
+
+
+class TestAsyncEngine:
+    """Test round trips through the aiosqlite engine."""
+
+    @pytest.mark.unit
+    async def test_ping(self, async_engine):
+        await async_database.ping()
+
+    @pytest.mark.unit
+    async def test_chat_turns_and_summary(self, async_session_id):
+        await async_database.save_chat_messages(async_session_id, [("user", "Q1"), ("assistant", "A1")])
+        await async_database.save_chat_messages(async_session_id, [("user", "Q2"), ("assistant", "A2")])
+
+        _, _, recent = await async_database.get_chat_context(async_session_id, 3)
+        assert [m.content for m in recent] == ["A1", "Q2", "A2"]
+
+        _, _, oldest = await async_database.get_messages_to_fold(async_session_id, 2, 1)
+        assert [m.content for m in oldest] == ["Q1"]
+        _, through_id, older = await async_database.get_messages_to_fold(async_session_id, 2, 10)
+        assert through_id is None and [m.content for m in older] == ["Q1", "A1"]
+
+        assert await async_database.update_session_summary(async_session_id, "s", older[-1].id, None) is True
+        assert await async_database.update_session_summary(async_session_id, "stale", older[0].id, None) is False
+        summary, through_id, recent = await async_database.get_chat_context(async_session_id, 10)
+        assert summary == "s" and through_id == older[-1].id
+        assert [m.content for m in recent] == ["Q2", "A2"]
+
+    @pytest.mark.unit
+    async def test_report_content_update(self, async_engine):
+        async with async_database.get_async_db_session() as db:
+            report = ReportDB(topic="Async", content="old")
+            db.add(report)
+        assert await async_database.update_report_content(report.id, "new") is True
+        async with async_database.get_async_db_session() as db:
+            stored = (await db.execute(database.report_with_body_stmt(report.id))).scalars().first()
+        assert stored.content == "new"
+        assert await async_database.update_report_content(report.id + 1, "x") is False
+
+    @pytest.mark.unit
+    async def test_save_hook(self, async_engine):
+        await async_database.save_hook("note")
+        async with async_database.get_async_db_session() as db:
+            hooks = (await db.execute(select(database.Hook.content))).scalars().all()
+        assert hooks == ["note"]
+
+
+class TestAsyncEndpoints:
+    """Test request-path endpoints against the aiosqlite engine."""
+
+    @pytest.mark.unit
+    def test_health_pings_async_engine(self, async_client):
+        response = async_client.get("/health")
+        assert response.json()["components"]["database"]["status"] == "ok"
+
+    @pytest.mark.unit
+    def test_add_hook(self, async_client):
+        assert async_client.post("/add-hook", json={"content": "async note"}).json()["status"] == "success"
+        assert [hook.content for hook in database.get_hooks_page(10, None)[0]] == ["async note"]
+
+    @pytest.mark.unit
+    def test_update_report_content(self, async_client):
+        database.save_report("Async", "old")
+        report_id = database.get_all_reports()[0].id
+        assert async_client.put(f"/api/report/{report_id}/content", json={"content": "new"}).status_code == 200
+        assert database.get_report_content(report_id).content == "new"
+        assert async_client.put("/api/report/999999/content", json={"content": "x"}).status_code == 404
+
+    @pytest.mark.unit
+    def test_chat_turn_saved(self, async_client, monkeypatch):
+        from backend import chat_engine
+
+        async def fake_response(**kwargs):
+            return "async answer"
+
+        monkeypatch.setattr(chat_engine, "get_chat_response_async", fake_response)
+        folder = database.create_folder("Async")
+        session = database.create_chat_session(folder.id, "Chat")
+        response = async_client.post("/chat", data={"message": "hello", "session_id": session.id})
+        assert response.json() == {"response": "async answer"}
+        assert [m.content for m in database.get_session_messages(session.id)] == ["hello", "async answer"]
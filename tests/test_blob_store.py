@@ -0,0 +1,62 @@
+"""
+Upload Blob Store Tests
+
+Tests for the content-addressed upload spool:
+- Streaming uploads to disk
+- Lazy reads by reference
+- Expiry
+"""
+
+import io
+import os
+import time
+import hashlib
+
+import pytest
+from fastapi import UploadFile
+from backend import blob_store
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "SPOOL_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestBlobStore:
+    """Test saving and reading blobs."""
+
+    @pytest.mark.unit
+    async def test_save_upload_streams_to_disk(self, spool, monkeypatch):
+        monkeypatch.setattr(blob_store, "CHUNK_SIZE", 4)
+        payload = b"%PDF-1.4 some pdf bytes"
+        ref = await blob_store.save_upload(UploadFile(io.BytesIO(payload), filename="paper.pdf"))
+
+        assert ref == {"filename": "paper.pdf", "sha256": hashlib.sha256(payload).hexdigest(), "size": len(payload)}
+        assert blob_store.read_file_data(ref) == payload
+        assert not [n for n in os.listdir(spool) if n.startswith(".tmp-")]
+
+    @pytest.mark.unit
+    def test_identical_uploads_stored_once(self, spool):
+        a = blob_store.save_bytes("a.txt", b"same")
+        b = blob_store.save_bytes("b.txt", b"same")
+        assert a["sha256"] == b["sha256"]
+        assert len(os.listdir(spool)) == 1
+
+    @pytest.mark.unit
+    def test_inline_content_still_supported(self):
+        assert blob_store.read_file_data({"filename": "x.txt", "content": b"inline"}) == b"inline"
+
+    @pytest.mark.unit
+    def test_invalid_reference_rejected(self, spool):
+        with pytest.raises(ValueError):
+            blob_store.read_blob("../../etc/passwd")
+
+    @pytest.mark.unit
+    def test_purge_expired(self, spool):
+        ref = blob_store.save_bytes("old.txt", b"old")
+        old = time.time() - 10_000
+        os.utime(blob_store.blob_path(ref["sha256"]), (old, old))
+        assert blob_store.purge_expired(ttl=3600) == 1
+        with pytest.raises(blob_store.BlobNotFound):
+            blob_store.read_blob(ref["sha256"])
@@ -0,0 +1,157 @@
+"""
+Response Cache Tests
+
+Tests for the two-tier LLM response cache:
+- LRU, TTL and size-based eviction
+- call_llm_async / call_model_async integration and per-call bypass
+- Hit/miss counters on /metrics
+"""
+
+import time
+
+import pytest
+from backend import AI_engine, cache
+from backend.agents import utils as agent_utils
+from backend.cache import ResponseCache, llm_cache, llm_cache_key
+
+
+@pytest.fixture(autouse=True)
+def clear_llm_cache():
+    llm_cache.clear()
+    yield
+    llm_cache.clear()
+
+
+class TestResponseCache:
+    """Test the in-process tier."""
+
+    @pytest.mark.unit
+    def test_roundtrip(self):
+        c = ResponseCache("t_roundtrip", ttl=60, max_entries=10, max_bytes=10_000, use_redis=False)
+        c.set("k", "value")
+        assert c.get("k") == "value"
+        assert c.get("missing") is None
+
+    @pytest.mark.unit
+    def test_ttl_expiry(self):
+        c = ResponseCache("t_ttl", ttl=60, max_entries=10, max_bytes=10_000, use_redis=False)
+        c.set("k", "value", ttl=0.01)
+        time.sleep(0.02)
+        assert c.get("k") is None
+
+    @pytest.mark.unit
+    def test_lru_eviction_by_count(self):
+        c = ResponseCache("t_lru", ttl=60, max_entries=2, max_bytes=10_000, use_redis=False)
+        c.set("a", "1")
+        c.set("b", "2")
+        c.get("a")  # a becomes most recently used
+        c.set("c", "3")
+        assert c.get("a") == "1"
+        assert c.get("b") is None
+        assert c.get("c") == "3"
+
+    @pytest.mark.unit
+    def test_eviction_by_size(self):
+        c = ResponseCache("t_size", ttl=60, max_entries=100, max_bytes=50, use_redis=False)
+        c.set("a", "x" * 30)
+        c.set("b", "y" * 30)
+        assert c.get("a") is None
+        assert c.get("b") == "y" * 30
+
+    @pytest.mark.unit
+    def test_key_depends_on_all_parts(self):
+        base = llm_cache_key("m", "sys", "user", 0.1)
+        assert base == llm_cache_key("m", "sys", "user", 0.1)
+        assert base != llm_cache_key("m2", "sys", "user", 0.1)
+        assert base != llm_cache_key("m", "sys2", "user", 0.1)
+        assert base != llm_cache_key("m", "sys", "user2", 0.1)
+        assert base != llm_cache_key("m", "sys", "user", 0.2)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self._content = content
+
+    def json(self):
+        return {"choices": [{"message": {"content": self._content}}]}
+
+
+class TestLLMCaching:
+    """Test cache integration in the LLM helpers."""
+
+    @pytest.mark.unit
+    async def test_call_llm_cached_and_bypass(self, monkeypatch):
+        calls = []
+
+        class FakeAsyncClient:
+            async def post(self, **kwargs):
+                calls.append(kwargs)
+                return FakeResponse(f"answer {len(calls)}")
+
+        monkeypatch.setattr(AI_engine.http_client, "get_async_client", lambda url: FakeAsyncClient())
+
+        first = await AI_engine.call_llm_async("model", "sys", "prompt", temp=0.1)
+        second = await AI_engine.call_llm_async("model", "sys", "prompt", temp=0.1)
+        bypass = await AI_engine.call_llm_async("model", "sys", "prompt", temp=0.1, use_cache=False)
+
+        assert first == second == "answer 1"
+        assert bypass == "answer 2"
+        assert len(calls) == 2
+
+    @pytest.mark.unit
+    async def test_call_llm_errors_not_cached(self, monkeypatch):
+        class FailingClient:
+            async def post(self, **kwargs):
+                raise RuntimeError("down")
+
+        monkeypatch.setattr(AI_engine.http_client, "get_async_client", lambda url: FailingClient())
+        assert (await AI_engine.call_llm_async("model", "sys", "prompt")).startswith("Error:")
+        assert len(llm_cache) == 0
+
+    @pytest.mark.unit
+    async def test_call_model_async_cached(self, monkeypatch):
+        calls = []
+
+        class FakeAsyncClient:
+            async def post(self, url, **kwargs):
+                calls.append(url)
+                return FakeResponse("draft")
+
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        monkeypatch.setattr(agent_utils.http_client, "get_async_client", lambda url: FakeAsyncClient())
+
+        assert await agent_utils.call_model_async("google/gemini", "sys", "prompt") == "draft"
+        assert await agent_utils.call_model_async("google/gemini", "sys", "prompt") == "draft"
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    async def test_council_slots_and_review_calls_not_shared(self, monkeypatch):
+        calls = []
+
+        class FakeAsyncClient:
+            async def post(self, url, json, **kwargs):
+                calls.append(url)
+                return FakeResponse(f"draft {len(calls)}")
+
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        monkeypatch.setattr(agent_utils.http_client, "get_async_client", lambda url: FakeAsyncClient())
+
+        first = await agent_utils.call_model_async("google/gemini", "sys", "prompt", cache_slot="legion-3")
+        second = await agent_utils.call_model_async("google/gemini", "sys", "prompt", cache_slot="legion-4")
+        assert first != second
+        assert await agent_utils.call_model_async("google/gemini", "sys", "prompt", cache_slot="legion-3") == first
+        await agent_utils.call_model_async("google/gemini", "sys", "prompt", use_cache=False)
+        assert len(calls) == 3
+
+
+class TestCacheMetrics:
+    """Test that cache counters are exported."""
+
+    @pytest.mark.unit
+    def test_metrics_endpoint_exposes_cache_counters(self, client):
+        cache.llm_cache.get("definitely-missing")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert 'scholarforge_cache_requests_total{cache="llm",result="miss"}' in response.text
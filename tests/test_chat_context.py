@@ -0,0 +1,149 @@
+"""
+Chat History Context Tests
+
+Tests for the bounded chat history window:
+- Token-aware truncation
+- Recent-message window
+- Rolling summary folding
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from backend import chat_context, database
+from backend.database import ChatMessage
+
+
+def add_messages(test_db, session_id, count, start=0):
+    base = datetime(2026, 1, 1)
+    test_db.add_all([
+        ChatMessage(
+            session_id=session_id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"message {i}",
+            created_at=base + timedelta(minutes=i)
+        )
+        for i in range(start, start + count)
+    ])
+    test_db.commit()
+
+
+@pytest.fixture
+def fake_summarizer(monkeypatch):
+    """Replace the summary LLM call and record the prompts it receives."""
+    prompts = []
+
+    async def fake_call(model, system_prompt, user_prompt, temp=0.4, use_cache=True):
+        prompts.append(user_prompt)
+        return f"summary #{len(prompts)}"
+
+    monkeypatch.setattr(chat_context.AI_engine, "call_llm_async", fake_call)
+    return prompts
+
+
+class TestFitHistory:
+    """Test token-aware truncation."""
+
+    @pytest.mark.unit
+    def test_oldest_messages_dropped_first(self):
+        messages = [{"role": "user", "content": "x" * 400} for _ in range(5)]
+        turns = chat_context.fit_history(None, messages, budget=350)
+        assert len(turns) == 3
+
+    @pytest.mark.unit
+    def test_summary_leads_and_counts_against_budget(self):
+        messages = [{"role": "user", "content": "x" * 400} for _ in range(5)]
+        turns = chat_context.fit_history("y" * 400, messages, budget=350)
+        assert turns[0]["role"] == "system" and "y" * 400 in turns[0]["content"]
+        assert len(turns) == 3
+
+    @pytest.mark.unit
+    def test_newest_message_always_kept(self):
+        turns = chat_context.fit_history(None, [{"role": "user", "content": "z" * 10_000}], budget=100)
+        assert len(turns) == 1
+        assert len(turns[0]["content"]) <= 400
+
+
+class TestBuildHistory:
+    """Test the recent-message window."""
+
+    @pytest.mark.unit
+    async def test_prompt_size_constant_as_session_grows(self, test_db, sample_session, fake_summarizer):
+        sizes = []
+        for _ in range(4):
+            add_messages(test_db, sample_session.id, 25, start=len(sizes) * 25)
+            await chat_context.fold_history(sample_session.id)
+            sizes.append(len(await chat_context.build_history(sample_session.id)))
+        # The summary turn plus the window
+        assert sizes == [chat_context.HISTORY_WINDOW_MESSAGES + 1] * 4
+
+    @pytest.mark.unit
+    async def test_unfolded_messages_stay_until_summarized(self, test_db, sample_session):
+        window = chat_context.HISTORY_WINDOW_MESSAGES
+        count = window + chat_context.FOLD_BATCH_MESSAGES - 1
+        add_messages(test_db, sample_session.id, count)
+        turns = await chat_context.build_history(sample_session.id)
+        assert [t["content"] for t in turns] == [f"message {i}" for i in range(count)]
+
+    @pytest.mark.unit
+    async def test_unsummarized_backlog_is_capped(self, test_db, sample_session):
+        add_messages(test_db, sample_session.id, 100)
+        turns = await chat_context.build_history(sample_session.id)
+        limit = chat_context.HISTORY_WINDOW_MESSAGES + chat_context.FOLD_MAX_MESSAGES
+        assert [t["content"] for t in turns] == [f"message {i}" for i in range(100 - limit, 100)]
+
+
+class TestFoldHistory:
+    """Test rolling summary folding."""
+
+    @pytest.mark.unit
+    async def test_small_sessions_not_summarized(self, test_db, sample_session, fake_summarizer):
+        add_messages(test_db, sample_session.id, chat_context.HISTORY_WINDOW_MESSAGES + 2)
+        assert await chat_context.fold_history(sample_session.id) is False
+        assert fake_summarizer == []
+
+    @pytest.mark.unit
+    async def test_fold_stores_summary_and_advances(self, test_db, sample_session, fake_summarizer):
+        window = chat_context.HISTORY_WINDOW_MESSAGES
+        add_messages(test_db, sample_session.id, window + 10)
+
+        assert await chat_context.fold_history(sample_session.id) is True
+        assert "message 0" in fake_summarizer[0] and f"message {window}" not in fake_summarizer[0]
+
+        turns = await chat_context.build_history(sample_session.id)
+        assert turns[0]["content"].endswith("summary #1")
+        assert turns[1]["content"] == "message 10"
+
+        # Nothing new has fallen out of the window yet
+        assert await chat_context.fold_history(sample_session.id) is False
+
+        add_messages(test_db, sample_session.id, 10, start=window + 10)
+        assert await chat_context.fold_history(sample_session.id) is True
+        assert "summary #1" in fake_summarizer[1]
+        assert "message 9" not in fake_summarizer[1]
+
+    @pytest.mark.unit
+    def test_long_backlog_folded_oldest_first(self, test_db, sample_session):
+        window = chat_context.HISTORY_WINDOW_MESSAGES
+        add_messages(test_db, sample_session.id, 100)
+        _, _, to_fold = database.get_messages_to_fold(sample_session.id, window, 40)
+        assert [m.content for m in to_fold] == [f"message {i}" for i in range(40)]
+        _, _, rest = database.get_messages_to_fold(sample_session.id, window, 100)
+        assert rest[-1].content == f"message {100 - window - 1}"
+
+    @pytest.mark.unit
+    async def test_failed_summary_keeps_previous(self, test_db, sample_session, monkeypatch):
+        async def failing(*args, **kwargs):
+            return "Error: AI models unavailable."
+
+        monkeypatch.setattr(chat_context.AI_engine, "call_llm_async", failing)
+        add_messages(test_db, sample_session.id, chat_context.HISTORY_WINDOW_MESSAGES + 10)
+        assert await chat_context.fold_history(sample_session.id) is False
+        summary, through_id, _ = database.get_chat_context(sample_session.id, 1)
+        assert summary is None and through_id is None
+
+    @pytest.mark.unit
+    def test_stale_summary_update_rejected(self, test_db, sample_session):
+        assert database.update_session_summary(sample_session.id, "first", 5, None) is True
+        assert database.update_session_summary(sample_session.id, "stale", 3, None) is False
+        assert database.get_chat_context(sample_session.id, 1)[0] == "first"
@@ -0,0 +1,87 @@
+"""
+Chat Engine Tests
+
+Tests for chat response helpers:
+- Incremental <think> block stripping
+- Streaming response parsing and model fallback
+"""
+
+import asyncio
+
+import pytest
+from backend import chat_engine
+from backend.chat_engine import ThinkTagFilter
+
+
+def run_filter(chunks):
+    f = ThinkTagFilter()
+    out = "".join(f.feed(c) for c in chunks)
+    return out + f.flush()
+
+
+class TestThinkTagFilter:
+    """Test streaming <think> removal."""
+
+    @pytest.mark.unit
+    def test_whole_block_removed(self):
+        assert run_filter(["<think>plan</think>Answer"]) == "Answer"
+
+    @pytest.mark.unit
+    def test_tags_split_across_chunks(self):
+        chunks = ["<thi", "nk>reason", "ing</th", "ink>", "Final ", "answer"]
+        assert run_filter(chunks) == "Final answer"
+
+    @pytest.mark.unit
+    def test_text_without_tags_passes_through(self):
+        assert run_filter(["a < b", " and c <", "t"]) == "a < b and c <t"
+
+    @pytest.mark.unit
+    def test_unclosed_block_dropped(self):
+        assert run_filter(["Intro <think>never closed"]) == "Intro "
+
+
+class FakeStreamResponse:
+    def __init__(self, status_code, lines):
+        self.status_code = status_code
+        self._lines = lines
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def aiter_lines(self):
+        for line in self._lines:
+            yield line
+
+
+class TestStreamChatResponse:
+    """Test the SSE parsing and fallback of stream_chat_response_async."""
+
+    @pytest.mark.unit
+    def test_parses_deltas_and_falls_back(self, monkeypatch):
+        monkeypatch.setenv("GROQ_API_KEY", "test-key")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        requested = []
+
+        class FakeClient:
+            def stream(self, method, url, headers, json, timeout):
+                requested.append(json["model"])
+                if len(requested) == 1:
+                    return FakeStreamResponse(503, [])
+                return FakeStreamResponse(200, [
+                    ": OPENROUTER PROCESSING",
+                    'data: {"choices": [{"delta": {"content": "<think>x</think>Hel"}}]}',
+                    "",
+                    'data: {"choices": [{"delta": {"content": "lo"}}]}',
+                    "data: [DONE]",
+                ])
+
+        monkeypatch.setattr(chat_engine.http_client, "get_async_client", lambda url: FakeClient())
+
+        async def collect():
+            return [d async for d in chat_engine.stream_chat_response_async("hi", [], model="llama-70b")]
+
+        assert "".join(asyncio.run(collect())) == "Hello"
+        assert requested == ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"]
@@ -0,0 +1,176 @@
+"""
+Council Tests
+
+Tests for the council's review loop:
+- Early exit once the Inquisitor approves at the target score
+- Call and time budgets
+- Per-section call reports
+- Legion quorum and deadline
+"""
+
+import asyncio
+
+import pytest
+
+from backend import council, llm_usage
+from backend.agents import legion
+
+
+def spend(calls):
+    for _ in range(calls):
+        llm_usage.record_call("m", 0.0)
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    """Fake agents that record their real call counts; `reviews` feeds the Inquisitor's verdicts."""
+    log = {"reviews": [], "artisan": []}
+
+    async def legion(section_title, topic, context):
+        spend(5)
+        return ["draft a", "draft b"]
+
+    async def nexus(drafts, section_title):
+        spend(2)
+        return "master draft"
+
+    async def inquisitor(content, topic):
+        spend(2)
+        return log["reviews"].pop(0)
+
+    async def artisan(content, critique=""):
+        spend(1)
+        log["artisan"].append(critique)
+        return f"rewrite {len(log['artisan'])}"
+
+    monkeypatch.setattr(council, "agent_legion", legion)
+    monkeypatch.setattr(council, "agent_nexus", nexus)
+    monkeypatch.setattr(council, "agent_inquisitor", inquisitor)
+    monkeypatch.setattr(council, "agent_artisan", artisan)
+    return log
+
+
+APPROVED = {"status": "APPROVED", "score": 92}
+REJECTED = {"status": "REJECTED", "score": 60, "critique": "cite sources"}
+
+
+def run(budget=None):
+    with llm_usage.track() as ledger:
+        content = asyncio.run(council.run_council("Intro", "topic", "context", budget=budget))
+    return content, ledger.to_dict()["sections"]["Intro"]
+
+
+class TestEarlyExit:
+    """Test stopping the review loop at the target score."""
+
+    @pytest.mark.unit
+    def test_approved_nexus_draft_gets_one_polish(self, agents):
+        agents["reviews"] = [APPROVED]
+        content, section = run()
+        assert content == "rewrite 1" and agents["artisan"] == [""]
+        assert section["calls"] == 10 and section["stop_reason"] == "target_score"
+
+    @pytest.mark.unit
+    def test_approved_rewrite_is_not_polished_again(self, agents):
+        agents["reviews"] = [REJECTED, APPROVED]
+        content, section = run()
+        assert content == "rewrite 1" and agents["artisan"] == ["cite sources"]
+        assert (section["calls"], section["review_cycles"], section["score"]) == (12, 2, 92)
+
+    @pytest.mark.unit
+    def test_template_score_does_not_pass(self, agents):
+        agents["reviews"] = [{"status": "APPROVED", "score": "85"}, APPROVED]
+        content, section = run()
+        assert section["review_cycles"] == 2
+
+    @pytest.mark.unit
+    def test_runs_out_of_loops(self, agents):
+        agents["reviews"] = [REJECTED] * 3
+        content, section = run()
+        assert content == "rewrite 3" and section["stop_reason"] == "max_loops" and section["calls"] == 16
+
+
+class TestBudget:
+    """Test call and time budgets."""
+
+    @pytest.mark.unit
+    def test_max_calls_skips_cycles_that_do_not_fit(self, agents):
+        agents["reviews"] = [REJECTED] * 3
+        content, section = run(council.CouncilBudget(max_calls=12))
+        assert content == "rewrite 1"
+        assert (section["calls"], section["review_cycles"], section["stop_reason"]) == (10, 1, "max_calls")
+
+    @pytest.mark.unit
+    def test_max_seconds_returns_nexus_draft(self, agents):
+        content, section = run(council.CouncilBudget(max_seconds=0))
+        assert content == "master draft" and section["stop_reason"] == "max_seconds"
+
+    @pytest.mark.unit
+    def test_concurrent_sections_metered_separately(self, agents):
+        agents["reviews"] = [APPROVED, REJECTED, APPROVED]
+
+        async def both():
+            return await asyncio.gather(
+                council.run_council("A", "topic", "context"), council.run_council("B", "topic", "context")
+            )
+
+        with llm_usage.track() as ledger:
+            asyncio.run(both())
+        sections = ledger.to_dict()["sections"]
+        assert sections["A"]["calls"] + sections["B"]["calls"] == 22
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """Fake Legion models: `delays` and `answers` per model, and the calls that finished or were cancelled."""
+    state = {"delays": {}, "answers": {}, "finished": [], "cancelled": []}
+
+    async def call(model, system_prompt, prompt, cache_slot=""):
+        try:
+            await asyncio.sleep(state["delays"].get(model, 0))
+        except asyncio.CancelledError:
+            state["cancelled"].append(model)
+            raise
+        state["finished"].append(model)
+        return state["answers"].get(model, f"draft from {model} " + "x" * 100)
+
+    monkeypatch.setattr(legion, "LEGION_MODELS", ["a", "b", "c", "d", "e"])
+    monkeypatch.setattr(legion, "call_model_async", call)
+    return state
+
+
+class TestLegionQuorum:
+    """Test taking the first valid drafts and cancelling stragglers."""
+
+    @pytest.mark.unit
+    def test_first_k_valid_drafts_in_model_order(self, models):
+        models["delays"] = {"a": 5, "b": 0.02, "c": 0, "d": 0.01, "e": 5}
+        drafts = asyncio.run(legion.agent_legion("Intro", "topic", "context", quorum=3, deadline=10))
+        assert [draft.split()[2] for draft in drafts] == ["b", "c", "d"]
+        assert sorted(models["cancelled"]) == ["a", "e"]
+
+    @pytest.mark.unit
+    def test_failures_do_not_count(self, models):
+        models["answers"] = {"a": "[Agent Failure: a]", "b": "too short"}
+        models["delays"] = {"c": 0.01, "d": 0.02, "e": 0.03}
+        drafts = asyncio.run(legion.agent_legion("Intro", "topic", "context", quorum=3, deadline=10))
+        assert len(drafts) == 3 and models["cancelled"] == []
+
+    @pytest.mark.unit
+    def test_deadline_takes_what_is_ready(self, models):
+        models["delays"] = {"a": 0, "b": 5, "c": 5, "d": 5, "e": 5}
+        drafts = asyncio.run(legion.agent_legion("Intro", "topic", "context", quorum=3, deadline=0.05))
+        assert len(drafts) == 1 and len(models["cancelled"]) == 4
+
+    @pytest.mark.unit
+    def test_past_deadline_waits_for_first_valid(self, models):
+        models["delays"] = {model: 0.1 for model in "abcde"}
+        models["delays"]["a"] = 0.05
+        drafts = asyncio.run(legion.agent_legion("Intro", "topic", "context", quorum=3, deadline=0.01))
+        assert [draft.split()[2] for draft in drafts] == ["a"]
+
+    @pytest.mark.unit
+    def test_zero_quorum_waits_for_all(self, models):
+        models["delays"] = {"e": 0.05}
+        drafts = asyncio.run(legion.agent_legion("Intro", "topic", "context", quorum=0, deadline=10))
+        assert len(drafts) == 5
@@ -6,9 +6,17 @@ Tests for database operations:
 - Chat session management
 - Message storage and retrieval
 - Report storage and retrieval
+- Compressed report bodies and metadata-only reads
+- Keyset pagination
+- Folder tree query count and latency
 """
 
+import time
+from datetime import datetime
+
 import pytest
+from sqlalchemy import event
+from backend import database
 from backend.database import (
     create_folder, rename_folder, delete_folder, get_folders_with_sessions,
     create_chat_session, rename_chat_session, delete_chat_session, get_chat_session,
@@ -184,6 +192,24 @@ class TestChatMessageOperations:
         for i, msg in enumerate(messages):
             assert f"Message {i}" in msg.content
 
+    @pytest.mark.unit
+    def test_save_chat_messages_single_commit(self, test_db, sample_session):
+        """Test that a chat turn is written in one transaction, in order."""
+        commits = []
+
+        def after_commit(session):
+            commits.append(session)
+
+        event.listen(test_db, "after_commit", after_commit)
+        try:
+            database.save_chat_messages(sample_session.id, [("user", "Question"), ("assistant", "Answer")])
+        finally:
+            event.remove(test_db, "after_commit", after_commit)
+        assert len(commits) == 1
+        assert [(m.role, m.content) for m in get_session_messages(sample_session.id)] == [
+            ("user", "Question"), ("assistant", "Answer")
+        ]
+
 
 class TestReportOperations:
     """Test report storage and retrieval."""
@@ -258,6 +284,58 @@ class TestReportOperations:
         assert len(all_reports_after) == 0
 
 
+class TestReportBodies:
+    """Test compressed report bodies and metadata-only reads."""
+
+    @pytest.mark.unit
+    def test_body_stored_compressed(self, test_db):
+        content = "# Findings\n\n" + "Repeated paragraph about results. " * 500
+        save_report("Big Report", content)
+        body = test_db.query(database.ReportBody).one()
+        assert body.size == len(content.encode("utf-8"))
+        assert len(body.data) < body.size // 10
+        assert get_report_content(body.report_id).content == content
+
+    @pytest.mark.unit
+    def test_listing_does_not_read_bodies(self, test_db, sample_report, query_counter):
+        expected_size = len(sample_report.content.encode("utf-8"))
+        query_counter.clear()
+        database.get_reports_page()
+        meta = database.get_report_meta(sample_report.id)
+        assert meta.topic == "Test Report"
+        assert meta.size == expected_size
+        assert not any("report_bodies.data" in statement for statement in query_counter)
+
+    @pytest.mark.unit
+    def test_content_readable_after_session_closes(self, test_db, sample_report):
+        report = get_report_content(sample_report.id)
+        test_db.expire_all()
+        assert report.content == "# Test Report\n\nThis is a test report."
+
+    @pytest.mark.unit
+    def test_update_content(self, test_db, sample_report):
+        assert database.update_report_content(sample_report.id, "# Rewritten ✓") is True
+        assert get_report_content(sample_report.id).content == "# Rewritten ✓"
+        assert database.update_report_content(99999, "x") is False
+
+    @pytest.mark.unit
+    def test_update_adds_missing_body(self, test_db):
+        report = ReportDB(topic="Empty")
+        test_db.add(report)
+        test_db.commit()
+        assert get_report_content(report.id).content is None
+        assert database.update_report_content(report.id, "filled") is True
+        assert get_report_content(report.id).content == "filled"
+
+    @pytest.mark.unit
+    def test_delete_removes_bodies(self, test_db, sample_report):
+        save_report("Second", "More")
+        delete_report(sample_report.id)
+        assert test_db.query(database.ReportBody).count() == 1
+        delete_all_reports()
+        assert test_db.query(database.ReportBody).count() == 0
+
+
 class TestHookOperations:
     """Test hooks (research notes) storage and retrieval."""
     
@@ -326,3 +404,104 @@ class TestDatabaseConstraints:
         # Verify messages are also deleted (cascade)
         messages = test_db.query(ChatMessage).filter_by(session_id=session_id).all()
         assert len(messages) == 0
+
+
+class TestKeysetPagination:
+    """Test cursor-based pagination."""
+
+    @pytest.mark.unit
+    def test_pages_cover_every_row_once(self, test_db):
+        """Rows sharing a created_at are split across pages without gaps or repeats."""
+        same_time = datetime(2026, 1, 1, 12, 0, 0)
+        for i in range(7):
+            test_db.add(ReportDB(topic=f"Report {i}", content="body", created_at=same_time if i < 4 else datetime(2026, 1, i)))
+        test_db.flush()
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = database.get_reports_page(limit=3, cursor=cursor)
+            seen.extend(r.id for r in rows)
+            if not cursor:
+                break
+        expected = [r.id for r in test_db.query(ReportDB).order_by(ReportDB.created_at.desc(), ReportDB.id.desc())]
+        assert seen == expected
+
+    @pytest.mark.unit
+    def test_messages_page_chronologically(self, test_db, sample_session, sample_messages):
+        first, cursor = database.get_session_messages_page(sample_session.id, limit=2)
+        rest, last_cursor = database.get_session_messages_page(sample_session.id, limit=2, cursor=cursor)
+        assert [m.content for m in first + rest] == [m.content for m in get_session_messages(sample_session.id)]
+        assert last_cursor is None
+
+    @pytest.mark.unit
+    def test_messages_page_newest_first(self, test_db, sample_session, sample_messages):
+        first, cursor = database.get_session_messages_page(sample_session.id, limit=2, newest_first=True)
+        rest, _ = database.get_session_messages_page(sample_session.id, limit=2, cursor=cursor, newest_first=True)
+        expected = [m.content for m in get_session_messages(sample_session.id)]
+        assert [m.content for m in first + rest] == expected[::-1]
+
+    @pytest.mark.unit
+    def test_limit_clamped(self, test_db):
+        for i in range(3):
+            save_hook(f"hook {i}")
+        rows, _ = database.get_hooks_page(limit=10_000)
+        assert len(rows) == 3
+
+    @pytest.mark.unit
+    def test_invalid_cursor(self, test_db):
+        with pytest.raises(database.InvalidCursor):
+            database.get_hooks_page(cursor="not-a-cursor")
+
+
+@pytest.fixture
+def query_counter():
+    """Count SQL statements executed through the engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestFolderTreeQueries:
+    """Benchmark the folder tree as the number of folders grows."""
+
+    @pytest.mark.unit
+    def test_sessions_ordered_by_database(self, test_db, sample_folder):
+        for title, day in [("Old", 1), ("New", 3), ("Middle", 2)]:
+            test_db.add(ChatSession(folder_id=sample_folder.id, title=title, created_at=datetime(2026, 1, day)))
+        test_db.flush()
+
+        folder = next(f for f in get_folders_with_sessions() if f["id"] == sample_folder.id)
+        assert [s["title"] for s in folder["sessions"]] == ["New", "Middle", "Old"]
+
+    @pytest.mark.slow
+    def test_query_count_constant_as_folders_grow(self, test_db, query_counter):
+        timings = {}
+        created = 0
+        for total in (10, 100, 400):
+            while created < total:
+                folder = ProjectFolder(name=f"Folder {created}")
+                folder.sessions = [ChatSession(title=f"Chat {i}") for i in range(3)]
+                test_db.add(folder)
+                created += 1
+            test_db.flush()
+
+            query_counter.clear()
+            started = time.perf_counter()
+            folders = get_folders_with_sessions()
+            timings[total] = time.perf_counter() - started
+
+            assert len(folders) == total
+            assert len(query_counter) == 1
+            query_counter.clear()
+            page, _ = database.get_folders_page(limit=50)
+            assert len(page) == min(total, 50)
+            assert len(query_counter) == 1
+
+        print("\nget_folders_with_sessions latency: " + ", ".join(
+            f"{n} folders {t * 1000:.1f}ms" for n, t in timings.items()
+        ))
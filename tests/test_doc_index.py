@@ -0,0 +1,180 @@
+"""
+Document Retrieval Index Tests
+
+Tests for per-section retrieval over uploaded documents:
+- Chunking boundaries and overlap
+- Embedder selection, hashing embedder and flat top-k search
+- On-disk vector store
+- Section-specific excerpts in the report pipeline
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+from backend import doc_index, extraction, AI_engine
+
+
+SOLAR = (
+    "Photovoltaic panels convert sunlight into electricity. Solar farm capacity factors depend on "
+    "latitude, panel tilt and cloud cover. Perovskite cells promise higher photovoltaic efficiency. "
+)
+SOIL = (
+    "Soil erosion strips topsoil from farmland. Cover crops and terracing reduce erosion, and "
+    "no-till farming keeps soil structure intact across seasons. "
+)
+
+
+@pytest.fixture
+def vector_store(monkeypatch, tmp_path):
+    """Enable the on-disk vector store in a temp directory and count embedding calls."""
+    monkeypatch.setattr(doc_index, "VECTOR_STORE_ENABLED", True)
+    monkeypatch.setattr(doc_index, "VECTOR_STORE_DIR", str(tmp_path))
+    embedder = doc_index.HashingEmbedder()
+    calls = []
+    real_embed = embedder.embed
+
+    def counting(texts):
+        calls.append(len(texts))
+        return real_embed(texts)
+
+    embedder.embed = counting
+    return embedder, calls
+
+
+class TestChunking:
+    """Test chunk boundaries and overlap."""
+
+    @pytest.mark.unit
+    def test_chunks_respect_size_and_cover_text(self):
+        text = " ".join(f"word{i}." for i in range(2000))
+        chunks = doc_index.chunk_text(text, size=500, overlap=100)
+        assert all(len(c) <= 500 for c in chunks)
+        assert chunks[0].startswith("word0.") and chunks[-1].endswith("word1999.")
+
+    @pytest.mark.unit
+    def test_chunks_overlap_on_word_boundaries(self):
+        text = " ".join(f"w{i}" for i in range(600))
+        first, second = doc_index.chunk_text(text, size=300, overlap=60)[:2]
+        assert second.split()[0] in first.split()
+        assert not second.startswith(" ") and second.split()[0].startswith("w")
+
+    @pytest.mark.unit
+    def test_prefers_paragraph_breaks(self):
+        text = "A" * 400 + "\n\n" + "B" * 400
+        assert doc_index.chunk_text(text, size=600, overlap=0)[0] == "A" * 400
+
+    @pytest.mark.unit
+    def test_empty_text(self):
+        assert doc_index.chunk_text("   ") == []
+
+
+class TestRetrieval:
+    """Test embeddings and top-k search."""
+
+    @pytest.mark.unit
+    def test_hashing_embedder_normalised_and_deterministic(self):
+        embedder = doc_index.HashingEmbedder(dim=256)
+        a, b = embedder.embed(["solar panel efficiency", "solar panel efficiency"])
+        assert np.allclose(a, b) and np.isclose(np.linalg.norm(a), 1.0)
+
+    @pytest.mark.unit
+    def test_missing_model_package_falls_back_to_hashing(self, monkeypatch, caplog):
+        monkeypatch.setattr(doc_index, "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        monkeypatch.setattr(doc_index, "_embedder", None)
+        monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+        assert isinstance(doc_index.get_embedder(), doc_index.HashingEmbedder)
+        assert "semantic" in caplog.text
+
+    @pytest.mark.unit
+    def test_relevant_document_ranks_first(self):
+        index = doc_index.build_index([("solar.txt", SOLAR * 10), ("soil.txt", SOIL * 10)])
+        solar_hits, soil_hits = index.search_many(["photovoltaic efficiency", "soil erosion on farmland"], k=3)
+        assert solar_hits[0][1].doc == "solar.txt" and soil_hits[0][1].doc == "soil.txt"
+        assert all(score < doc_index.RETRIEVAL_MIN_SCORE for score, chunk in solar_hits if chunk.doc == "soil.txt")
+
+    @pytest.mark.unit
+    def test_excerpts_respect_budget_and_threshold(self):
+        index = doc_index.build_index([("solar.txt", SOLAR * 40)])
+        relevant, unrelated = index.excerpts_for(["photovoltaic panels", "medieval poetry"], k=6, max_chars=1500)
+        assert relevant.startswith("--- RELEVANT EXCERPTS") and len(relevant) <= 1500 + 60
+        assert unrelated == ""
+
+    @pytest.mark.unit
+    def test_nothing_to_index(self):
+        assert doc_index.build_index([("empty.txt", ""), ("blank.txt", "  \n ")]) is None
+
+
+class TestVectorStore:
+    """Test the on-disk vector store."""
+
+    @pytest.mark.unit
+    def test_second_build_reuses_stored_vectors(self, vector_store):
+        embedder, calls = vector_store
+        first = doc_index.build_index([("solar.txt", SOLAR * 10)], embedder=embedder)
+        second = doc_index.build_index([("solar.txt", SOLAR * 10)], embedder=embedder)
+        assert len(calls) == 1
+        assert [c.text for c in second.chunks] == [c.text for c in first.chunks]
+        assert np.allclose(second.vectors, first.vectors, atol=1e-3)
+
+    @pytest.mark.unit
+    def test_eviction_uses_shared_lru(self, vector_store, tmp_path):
+        embedder, _ = vector_store
+        doc_index.build_index([("solar.txt", SOLAR * 10), ("soil.txt", SOIL * 10)], embedder=embedder)
+        assert doc_index.evict(max_bytes=1) == 2
+        assert list(tmp_path.rglob("*.npz")) == []
+
+
+class TestSectionRetrieval:
+    """Test that each section is written with its own excerpts."""
+
+    @pytest.fixture
+    def pipeline(self, monkeypatch):
+        extraction.shutdown()
+        monkeypatch.setattr(extraction, "EXTRACTION_WORKERS", 0)
+
+        async def assess(query, ctx):
+            return "SKIP_SEARCH"
+
+        async def summarize(search, topic, pdf=""):
+            return "global summary"
+
+        async def chart(summary, topic):
+            return None
+
+        async def outline(topic, summary, fmt, pages):
+            return ["1. Photovoltaic Efficiency", "2. Soil Erosion Control"]
+
+        contexts = {}
+
+        async def write(section_title, topic, summary, full_report_context, word_limit):
+            contexts[section_title] = summary
+            return "body"
+
+        monkeypatch.setattr(AI_engine, "assess_search_need_async", assess)
+        monkeypatch.setattr(AI_engine, "generate_summary_async", summarize)
+        monkeypatch.setattr(AI_engine, "generate_chart_from_data_async", chart)
+        monkeypatch.setattr(AI_engine, "generate_outline_async", outline)
+        monkeypatch.setattr(AI_engine, "write_section_async", write)
+        yield contexts
+        extraction.shutdown()
+
+    @pytest.mark.unit
+    def test_sections_get_their_own_passages(self, pipeline):
+        # Both documents are longer than the old per-file prefix, so the matches sit past it
+        files = [
+            {"filename": "solar.txt", "content": (("filler text. " * 1500) + SOLAR * 5).encode()},
+            {"filename": "soil.txt", "content": (("filler text. " * 1500) + SOIL * 5).encode()},
+        ]
+        AI_engine.run_ai_engine_with_return("land use", "literature_review", 3, file_data_list=files)
+
+        solar, soil = pipeline["1. Photovoltaic Efficiency"], pipeline["2. Soil Erosion Control"]
+        assert "[solar.txt, passage" in solar and "[soil.txt" not in solar
+        assert "[soil.txt, passage" in soil and "[solar.txt" not in soil
+        assert solar.startswith("global summary") and soil.startswith("global summary")
+
+    @pytest.mark.unit
+    def test_no_uploads_keeps_global_summary(self, pipeline):
+        AI_engine.run_ai_engine_with_return("land use", "literature_review", 3)
+        assert set(pipeline.values()) == {"global summary"}
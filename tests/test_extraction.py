@@ -0,0 +1,166 @@
+"""
+Document Extraction Tests
+
+Tests for the shared upload extraction engine:
+- PDF, DOCX and text parsing
+- Character and page budgets
+- Parallel extraction and per-file errors
+- Content-hash text cache and LRU eviction
+"""
+
+import os
+from io import BytesIO
+
+import fitz
+import pytest
+from docx import Document
+
+from backend import extraction, AI_engine
+
+
+def make_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {i} " + "x" * 50)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_docx(paragraphs: int) -> bytes:
+    doc = Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Paragraph {i}")
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    """Use the in-process pool so tests do not pay for spawning workers."""
+    extraction.shutdown()
+    monkeypatch.setattr(extraction, "EXTRACTION_WORKERS", 0)
+    yield
+    extraction.shutdown()
+
+
+@pytest.fixture
+def text_cache(monkeypatch, tmp_path, thread_pool):
+    """Enable the extracted-text cache in a temp directory and count parser runs."""
+    monkeypatch.setattr(extraction, "EXTRACTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(extraction, "EXTRACTION_CACHE_DIR", str(tmp_path))
+    calls = []
+    real_extract = extraction.extract_text
+
+    def counting(filename, content, max_chars, max_pages=None):
+        calls.append(filename)
+        return real_extract(filename, content, max_chars, max_pages)
+
+    monkeypatch.setattr(extraction, "extract_text", counting)
+    return calls
+
+
+class TestExtractText:
+    """Test single-file parsing and budgets."""
+
+    @pytest.mark.unit
+    def test_pdf_stops_at_char_budget(self):
+        text = extraction.extract_text("paper.pdf", make_pdf(50), max_chars=200)
+        assert len(text) == 200
+        assert "Page 0" in text and "Page 10" not in text
+
+    @pytest.mark.unit
+    def test_pdf_page_limit(self):
+        text = extraction.extract_text("paper.pdf", make_pdf(5), max_chars=10_000, max_pages=2)
+        assert "Page 1" in text and "Page 2" not in text
+
+    @pytest.mark.unit
+    def test_docx(self):
+        text = extraction.extract_text("notes.DOCX", make_docx(3), max_chars=10_000)
+        assert text == "Paragraph 0\nParagraph 1\nParagraph 2\n"
+
+    @pytest.mark.unit
+    def test_text_budget_with_multibyte_characters(self):
+        text = extraction.extract_text("notes.md", ("é" * 100).encode(), max_chars=30)
+        assert text == "é" * 30
+
+    @pytest.mark.unit
+    def test_unsupported_type(self):
+        with pytest.raises(extraction.UnsupportedFileType):
+            extraction.extract_text("image.png", b"...", max_chars=100)
+
+
+class TestExtractMany:
+    """Test parallel extraction."""
+
+    @pytest.mark.unit
+    def test_results_keep_order_and_isolate_errors(self, thread_pool):
+        results = extraction.extract_many(
+            [("a.txt", b"alpha"), ("broken.pdf", b"not a pdf"), ("b.txt", b"beta")], max_chars=100
+        )
+        assert results[0] == "alpha" and results[2] == "beta"
+        assert isinstance(results[1], Exception)
+
+    @pytest.mark.unit
+    async def test_async_extraction(self, thread_pool):
+        results = await extraction.extract_many_async([("a.txt", b"alpha"), ("c.png", b"")], max_chars=100)
+        assert results[0] == "alpha"
+        assert isinstance(results[1], extraction.UnsupportedFileType)
+
+    @pytest.mark.unit
+    def test_process_pool(self, monkeypatch):
+        extraction.shutdown()
+        monkeypatch.setattr(extraction, "EXTRACTION_WORKERS", 2)
+        try:
+            assert extraction.extract_many([("a.pdf", make_pdf(2))], max_chars=100)[0].startswith("Page 0")
+        finally:
+            extraction.shutdown()
+
+    @pytest.mark.unit
+    def test_report_uploads_combined(self, thread_pool):
+        combined = AI_engine.extract_text_from_files([
+            {"filename": "a.txt", "content": b"alpha"},
+            {"filename": "b.pdf", "content": b"not a pdf"},
+            {"filename": "c.txt", "content": b"gamma"},
+        ])
+        assert "[Document 1 - a.txt]:\nalpha" in combined
+        assert "b.pdf" not in combined
+        assert "[Document 3 - c.txt]:\ngamma" in combined
+
+
+class TestTextCache:
+    """Test the content-hash cache for extracted text."""
+
+    @pytest.mark.unit
+    def test_repeat_upload_skips_parsing(self, text_cache):
+        pdf = make_pdf(3)
+        first = extraction.extract_many([("paper.pdf", pdf)], max_chars=1000)
+        second = extraction.extract_many([("renamed.pdf", pdf)], max_chars=1000)
+        assert first == second
+        assert text_cache == ["paper.pdf"]
+
+    @pytest.mark.unit
+    def test_budget_is_part_of_key(self, text_cache):
+        extraction.extract_many([("a.txt", b"abcdef")], max_chars=3)
+        assert extraction.extract_many([("a.txt", b"abcdef")], max_chars=6) == ["abcdef"]
+        assert len(text_cache) == 2
+
+    @pytest.mark.unit
+    def test_failures_not_cached(self, text_cache):
+        extraction.extract_many([("broken.pdf", b"not a pdf")], max_chars=100)
+        extraction.extract_many([("broken.pdf", b"not a pdf")], max_chars=100)
+        assert len(text_cache) == 2
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used(self, text_cache):
+        for i, body in enumerate([b"a" * 100, b"b" * 100, b"c" * 100]):
+            extraction.extract_many([("f.txt", body)], max_chars=1000)
+            digest = extraction.hashlib.sha256(body).hexdigest()
+            os.utime(extraction._cache_path(digest, 1000, None), (i, i))
+        # Reading "a" again makes it the most recently used entry
+        extraction.extract_many([("f.txt", b"a" * 100)], max_chars=1000)
+
+        assert extraction.evict(max_bytes=200) == 1
+        extraction.extract_many([("f.txt", b"a" * 100), ("f.txt", b"c" * 100)], max_chars=1000)
+        assert len(text_cache) == 3
@@ -0,0 +1,62 @@
+"""
+HTTP Client Registry Tests
+
+Tests for the shared pooled httpx clients:
+- Per-host client reuse
+- Per-event-loop async clients
+- Cleanup
+"""
+
+import asyncio
+
+import pytest
+from backend import http_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    http_client.close_clients()
+    yield
+    http_client.close_clients()
+
+
+class TestSyncClients:
+    """Test the sync client registry."""
+
+    @pytest.mark.unit
+    def test_same_host_reuses_client(self):
+        a = http_client.get_client("https://openrouter.ai/api/v1/chat/completions")
+        b = http_client.get_client("https://openrouter.ai/other")
+        assert a is b
+
+    @pytest.mark.unit
+    def test_hosts_get_separate_pools(self):
+        a = http_client.get_client("https://openrouter.ai/api/v1/chat/completions")
+        b = http_client.get_client("https://api.tavily.com/search")
+        assert a is not b
+
+    @pytest.mark.unit
+    def test_close_clients_replaces_closed_client(self):
+        a = http_client.get_client("https://api.groq.com/openai/v1/chat/completions")
+        http_client.close_clients()
+        assert a.is_closed
+        b = http_client.get_client("https://api.groq.com/openai/v1/chat/completions")
+        assert b is not a and not b.is_closed
+
+
+class TestAsyncClients:
+    """Test the async client registry."""
+
+    @pytest.mark.unit
+    def test_async_client_scoped_to_loop(self):
+        async def grab():
+            first = http_client.get_async_client("https://api.groq.com/x")
+            second = http_client.get_async_client("https://api.groq.com/y")
+            await http_client.aclose_clients()
+            return first, second
+
+        a1, a2 = asyncio.run(grab())
+        b1, _ = asyncio.run(grab())
+        assert a1 is a2
+        assert a1 is not b1
+        assert a1.is_closed and b1.is_closed
@@ -0,0 +1,145 @@
+"""
+LLM Usage Accounting Tests
+
+Tests for per-call metrics and per-report usage:
+- Stage labels carried by the context variable
+- Ledger totals for tokens, fallbacks, errors and cache hits
+- Instrumented LLM helpers
+- Storing and serving a report's breakdown
+"""
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from backend import AI_engine, database, llm_usage
+from backend.agents import utils as agent_utils
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body or {}
+
+    def json(self):
+        return self._body
+
+
+def completion(content, prompt_tokens, completion_tokens):
+    return {
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+    }
+
+
+class TestStages:
+    """Test stage labels and ledger aggregation."""
+
+    @pytest.mark.unit
+    def test_stage_nests_and_resets(self):
+        assert llm_usage.current_stage() == llm_usage.DEFAULT_STAGE
+        with llm_usage.stage("summary"):
+            with llm_usage.stage("outline"):
+                assert llm_usage.current_stage() == "outline"
+            assert llm_usage.current_stage() == "summary"
+        assert llm_usage.current_stage("chat") == "chat"
+
+    @pytest.mark.unit
+    def test_concurrent_tasks_share_ledger_with_own_stages(self):
+        async def call(stage_name, tokens):
+            with llm_usage.stage(stage_name):
+                await asyncio.sleep(0)
+                llm_usage.record_call("m", 0.1, {"usage": {"prompt_tokens": tokens, "completion_tokens": 1}})
+
+        async def run():
+            await asyncio.gather(call("legion", 10), call("legion", 20), call("nexus", 5))
+
+        with llm_usage.track() as ledger:
+            asyncio.run(run())
+        usage = ledger.to_dict()
+        assert usage["stages"]["legion"]["calls"] == 2 and usage["stages"]["legion"]["prompt_tokens"] == 30
+        assert usage["stages"]["nexus"]["prompt_tokens"] == 5
+        assert usage["totals"]["completion_tokens"] == 3 and usage["models"] == {"m": 3}
+
+    @pytest.mark.unit
+    def test_nothing_recorded_outside_track(self):
+        llm_usage.record_call("m", 0.1)
+        assert llm_usage.current_ledger() is None
+
+    @pytest.mark.unit
+    def test_prometheus_counters(self):
+        before = sample("scholarforge_llm_tokens_total", stage="t-prom", model="m", type="completion")
+        with llm_usage.stage("t-prom"):
+            llm_usage.record_call("m", 0.2, completion("x", 7, 3), requested="primary")
+            llm_usage.record_error("m", 1.0, 429)
+        assert sample("scholarforge_llm_tokens_total", stage="t-prom", model="m", type="completion") == before + 3
+        assert sample("scholarforge_llm_fallbacks_total", stage="t-prom", requested="primary", served="m") >= 1
+        assert sample("scholarforge_llm_errors_total", stage="t-prom", model="m", code="429") >= 1
+        assert sample("scholarforge_llm_call_seconds_count", stage="t-prom", model="m") >= 2
+
+
+class TestInstrumentedCalls:
+    """Test that the LLM helpers feed the ledger."""
+
+    @pytest.mark.unit
+    def test_call_llm_async_records_fallback_and_error(self, monkeypatch):
+        class FakeAsyncClient:
+            async def post(self, url, headers, json, timeout):
+                if json["model"] == "primary":
+                    return FakeResponse(503)
+                return FakeResponse(200, completion("backup answer", 120, 40))
+
+        monkeypatch.setattr(AI_engine.http_client, "get_async_client", lambda url: FakeAsyncClient())
+        with llm_usage.track() as ledger, llm_usage.stage("summary"):
+            asyncio.run(AI_engine.call_llm_async("primary", "sys", "prompt", use_cache=False))
+
+        summary = ledger.to_dict()["stages"]["summary"]
+        assert (summary["calls"], summary["errors"], summary["fallbacks"]) == (2, 1, 1)
+        assert (summary["prompt_tokens"], summary["completion_tokens"]) == (120, 40)
+
+    @pytest.mark.unit
+    def test_council_call_records_rate_limits(self, monkeypatch):
+        responses = [FakeResponse(429), FakeResponse(200, completion("draft", 50, 500))]
+
+        class FakeAsyncClient:
+            async def post(self, url, headers, json, timeout):
+                return responses.pop(0)
+
+        async def no_sleep(seconds):
+            return None
+
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+        monkeypatch.setattr(agent_utils.http_client, "get_async_client", lambda url: FakeAsyncClient())
+        monkeypatch.setattr(agent_utils.asyncio, "sleep", no_sleep)
+        with llm_usage.track() as ledger, llm_usage.stage("legion"):
+            asyncio.run(agent_utils.call_model_async("google/gemini-2.0-flash-001", "sys", "prompt", use_cache=False))
+
+        legion = ledger.to_dict()["stages"]["legion"]
+        assert (legion["calls"], legion["errors"], legion["completion_tokens"]) == (2, 1, 500)
+
+
+class TestReportUsage:
+    """Test the stored per-report breakdown."""
+
+    @pytest.mark.unit
+    def test_saved_with_report(self, test_db):
+        with llm_usage.track() as ledger:
+            llm_usage.record_call("m", 0.5, completion("x", 10, 20))
+        database.save_report("Usage", "body", llm_usage=ledger.to_dict())
+        report_id = database.get_all_reports()[0].id
+        stored = database.get_report_usage(report_id).llm_usage
+        assert stored["totals"]["prompt_tokens"] == 10 and stored["stages"]["other"]["calls"] == 1
+
+    @pytest.mark.unit
+    def test_usage_endpoint(self, client, test_db):
+        database.save_report("Usage", "body", llm_usage={"totals": {"calls": 3}})
+        report_id = database.get_all_reports()[0].id
+        response = client.get(f"/api/report/{report_id}/usage")
+        assert response.status_code == 200
+        assert response.json()["usage"] == {"totals": {"calls": 3}}
+        assert client.get("/api/report/999999/usage").status_code == 404
@@ -0,0 +1,255 @@
+"""
+Model Router Tests
+
+Tests for health-ranked routing of LLM calls:
+- Circuit breaker transitions per model and provider
+- Candidate ordering
+- Hedged requests
+- Routing in the chat and council helpers
+"""
+
+import asyncio
+
+import pytest
+
+from backend import chat_engine, llm_usage, model_router
+from backend.agents import utils as agent_utils
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def router(clock):
+    return model_router.ModelRouter(clock=clock)
+
+
+def fail(router, model, times=1):
+    for _ in range(times):
+        router.record(model, False, 1.0)
+
+
+class TestCircuitBreaker:
+    """Test circuit state transitions."""
+
+    @pytest.mark.unit
+    def test_opens_after_consecutive_failures(self, router):
+        fail(router, "m", model_router.ROUTER_FAILURE_THRESHOLD - 1)
+        assert router.available("m")
+        fail(router, "m")
+        assert router.state("m") == model_router.OPEN and not router.available("m")
+
+    @pytest.mark.unit
+    def test_opens_on_error_rate(self, router):
+        for _ in range(model_router.ROUTER_MIN_SAMPLES // 2):
+            router.record("m", True, 1.0)
+            fail(router, "m")
+        assert router.state("m") == model_router.OPEN
+
+    @pytest.mark.unit
+    def test_trial_success_closes(self, router, clock):
+        fail(router, "m", model_router.ROUTER_FAILURE_THRESHOLD)
+        clock.now += model_router.ROUTER_OPEN_SECONDS
+        assert router.state("m") == model_router.HALF_OPEN and router.available("m")
+        router.record("m", True, 2.0)
+        assert router.state("m") == model_router.CLOSED
+
+    @pytest.mark.unit
+    def test_half_open_admits_a_single_trial(self, router, clock):
+        fail(router, "m", model_router.ROUTER_FAILURE_THRESHOLD)
+        clock.now += model_router.ROUTER_OPEN_SECONDS
+        assert router.admit("m")
+        assert not router.admit("m") and not router.available("m")
+        assert router.order(["m", "other"]) == ["other", "m"]
+        router.record("m", True, 1.0)
+        assert router.admit("m") and router.admit("m")
+
+    @pytest.mark.unit
+    def test_throttled_or_lost_trial_frees_the_slot(self, router, clock):
+        fail(router, "m", model_router.ROUTER_FAILURE_THRESHOLD)
+        clock.now += model_router.ROUTER_OPEN_SECONDS
+        assert router.admit("m")
+        router.end_trial("m")
+        assert router.admit("m")
+        clock.now += model_router.ROUTER_TRIAL_TIMEOUT
+        assert router.state("m") == model_router.HALF_OPEN and router.admit("m")
+
+    @pytest.mark.unit
+    def test_throttled_calls_do_not_trip_the_circuit(self):
+        for _ in range(model_router.ROUTER_FAILURE_THRESHOLD * 3):
+            llm_usage.record_error("m", 1.0, 429)
+        assert model_router.router.state("m") == model_router.CLOSED
+        llm_usage.record_error("m", 1.0, 500)
+        assert model_router.router._model("m").consecutive_failures == 1
+
+    @pytest.mark.unit
+    def test_failed_trial_doubles_cooldown(self, router, clock):
+        fail(router, "m", model_router.ROUTER_FAILURE_THRESHOLD)
+        clock.now += model_router.ROUTER_OPEN_SECONDS
+        fail(router, "m")
+        clock.now += model_router.ROUTER_OPEN_SECONDS
+        assert router.state("m") == model_router.OPEN
+        clock.now += model_router.ROUTER_OPEN_SECONDS
+        assert router.state("m") == model_router.HALF_OPEN
+
+    @pytest.mark.unit
+    def test_old_outcomes_expire(self, router, clock):
+        for _ in range(model_router.ROUTER_MIN_SAMPLES):
+            router.record("m", True, 1.0)
+        clock.now += model_router.ROUTER_WINDOW_SECONDS + 1
+        router.record("m", True, 1.0)
+        fail(router, "m")
+        assert router.available("m")
+
+    @pytest.mark.unit
+    def test_failing_provider_blocks_its_other_models(self, router):
+        for model in ("llama-a", "llama-b", "llama-c"):
+            fail(router, model, 2)
+        assert not router.available("llama-d")
+        assert router.available("google/gemini")
+
+
+class TestOrdering:
+    """Test candidate ordering."""
+
+    @pytest.mark.unit
+    def test_fastest_healthy_first_open_last(self, router):
+        router.record("slow", True, 20.0)
+        router.record("fast", True, 2.0)
+        fail(router, "broken", model_router.ROUTER_FAILURE_THRESHOLD)
+        assert router.order(["broken", "slow", "fast", "slow"]) == ["fast", "slow", "broken"]
+
+    @pytest.mark.unit
+    def test_pinned_first_unless_open(self, router):
+        router.record("slow", True, 20.0)
+        router.record("fast", True, 2.0)
+        assert router.order(["slow", "fast"], pin_first=True) == ["slow", "fast"]
+        fail(router, "slow", model_router.ROUTER_FAILURE_THRESHOLD)
+        assert router.order(["slow", "fast"], pin_first=True) == ["fast", "slow"]
+
+    @pytest.mark.unit
+    def test_key_maps_items_to_models(self, router):
+        models = {"a": "model-x", "b": "model-x", "c": "model-y"}
+        fail(router, "model-x", model_router.ROUTER_FAILURE_THRESHOLD)
+        assert router.order(["a", "b", "c"], key=models.get) == ["c", "a"]
+
+    @pytest.mark.unit
+    def test_hedge_delay_follows_latency(self, router):
+        assert router.hedge_delay("new") == model_router.HEDGE_DEFAULT_DELAY
+        for seconds in (4.0, 5.0, 6.0, 30.0):
+            router.record("m", True, seconds)
+        assert router.hedge_delay("m") == 30.0
+        router.record("quick", True, 0.1)
+        assert router.hedge_delay("quick") == model_router.HEDGE_MIN_DELAY
+
+
+class TestHedged:
+    """Test racing candidates."""
+
+    @staticmethod
+    def attempt_with(delays, results, started):
+        async def attempt(candidate):
+            started.append(candidate)
+            await asyncio.sleep(delays[candidate])
+            return results[candidate]
+        return attempt
+
+    @pytest.mark.unit
+    def test_backup_wins_and_primary_is_cancelled(self):
+        started, cancelled = [], []
+
+        async def attempt(candidate):
+            started.append(candidate)
+            try:
+                await asyncio.sleep(5 if candidate == "slow" else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(candidate)
+                raise
+            return True, candidate
+
+        result = asyncio.run(model_router.hedged(attempt, ["slow", "fast"], lambda c: 0.02))
+        assert result == (True, "fast")
+        assert started == ["slow", "fast"] and cancelled == ["slow"]
+
+    @pytest.mark.unit
+    def test_failure_starts_next_at_once(self):
+        started = []
+        attempt = self.attempt_with({"a": 0, "b": 0}, {"a": (False, "a down"), "b": (True, "ok")}, started)
+        assert asyncio.run(model_router.hedged(attempt, ["a", "b"], lambda c: 10)) == (True, "ok")
+
+    @pytest.mark.unit
+    def test_sequential_without_delay(self):
+        started = []
+        attempt = self.attempt_with({"a": 0.05, "b": 0}, {"a": (True, "a"), "b": (True, "b")}, started)
+        assert asyncio.run(model_router.hedged(attempt, ["a", "b"])) == (True, "a")
+        assert started == ["a"]
+
+    @pytest.mark.unit
+    def test_all_fail_returns_last_error(self):
+        started = []
+        attempt = self.attempt_with({"a": 0, "b": 0}, {"a": (False, "a down"), "b": (False, "b down")}, started)
+        assert asyncio.run(model_router.hedged(attempt, ["a", "b"], lambda c: 1)) == (False, "b down")
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=None):
+        self.status_code = status_code
+        self._content = content
+
+    def json(self):
+        return {"choices": [{"message": {"content": self._content}}]}
+
+
+class TestRoutedCalls:
+    """Test routing in the chat and council helpers."""
+
+    @pytest.mark.unit
+    def test_chat_skips_open_circuit(self, monkeypatch):
+        monkeypatch.setenv("GROQ_API_KEY", "test-key")
+        requested = []
+
+        class FakeClient:
+            async def post(self, url, headers, json, timeout):
+                requested.append(json["model"])
+                return FakeResponse(200, f"answer from {json['model']}")
+
+        monkeypatch.setattr(chat_engine.http_client, "get_async_client", lambda url: FakeClient())
+        fail(model_router.router, "llama-3.3-70b-versatile", model_router.ROUTER_FAILURE_THRESHOLD)
+        answer = asyncio.run(chat_engine.get_chat_response_async("hi", [], model="llama-70b"))
+        assert answer == "answer from llama-3.1-8b-instant"
+        assert requested == ["llama-3.1-8b-instant"]
+
+    @pytest.mark.unit
+    def test_chat_hedges_slow_model(self, monkeypatch):
+        monkeypatch.setenv("GROQ_API_KEY", "test-key")
+        monkeypatch.setattr(model_router, "HEDGE_DEFAULT_DELAY", 0.02)
+
+        class FakeClient:
+            async def post(self, url, headers, json, timeout):
+                if json["model"] == "llama-3.3-70b-versatile":
+                    await asyncio.sleep(5)
+                return FakeResponse(200, f"answer from {json['model']}")
+
+        monkeypatch.setattr(chat_engine.http_client, "get_async_client", lambda url: FakeClient())
+        answer = asyncio.run(chat_engine.get_chat_response_async("hi", [], model="llama-70b"))
+        assert answer == "answer from llama-3.1-8b-instant"
+
+    @pytest.mark.unit
+    def test_council_agent_fails_fast_on_open_circuit(self, monkeypatch):
+        def no_client(url):
+            raise AssertionError("no request expected")
+
+        monkeypatch.setattr(agent_utils.http_client, "get_async_client", no_client)
+        fail(model_router.router, "llama-3.1-8b-instant", model_router.ROUTER_FAILURE_THRESHOLD)
+        result = asyncio.run(agent_utils.call_model_async("llama-3.1-8b-instant", "sys", "prompt", use_cache=False))
+        assert result == "[Agent Failure: llama-3.1-8b-instant]"
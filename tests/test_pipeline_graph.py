@@ -0,0 +1,87 @@
+"""
+Pipeline Task Graph Tests
+
+Tests for the async stage graph used by the report pipeline:
+- Dependency ordering and result passing
+- Concurrent independent stages
+- Failure handling
+- Critical path reporting
+"""
+
+import asyncio
+
+import pytest
+from backend.pipeline_graph import PipelineGraph
+
+
+def sleeper(seconds, value=None, log=None, name=None):
+    async def stage(*deps):
+        if log is not None:
+            log.append(f"{name} start")
+        await asyncio.sleep(seconds)
+        if log is not None:
+            log.append(f"{name} end")
+        return value
+    return stage
+
+
+class TestPipelineGraph:
+    """Test stage scheduling."""
+
+    @pytest.mark.unit
+    async def test_results_passed_to_dependents(self):
+        async def add(a, b):
+            return a + b
+
+        graph = PipelineGraph().add("a", sleeper(0, 1)).add("b", sleeper(0, 2)).add("sum", add, deps=("a", "b"))
+        results = await graph.run()
+        assert results == {"a": 1, "b": 2, "sum": 3}
+
+    @pytest.mark.unit
+    async def test_independent_stages_overlap(self):
+        log = []
+        graph = (
+            PipelineGraph()
+            .add("root", sleeper(0))
+            .add("chart", sleeper(0.05, log=log, name="chart"), deps=("root",))
+            .add("outline", sleeper(0.01, log=log, name="outline"), deps=("root",))
+        )
+        await graph.run()
+        assert log.index("outline start") < log.index("chart end")
+
+    @pytest.mark.unit
+    async def test_failure_cancels_other_stages(self):
+        log = []
+
+        async def boom(*deps):
+            raise RuntimeError("boom")
+
+        graph = PipelineGraph().add("slow", sleeper(1, log=log, name="slow")).add("bad", boom)
+        with pytest.raises(RuntimeError):
+            await graph.run()
+        assert "slow end" not in log
+
+    @pytest.mark.unit
+    def test_unknown_and_duplicate_stages_rejected(self):
+        graph = PipelineGraph().add("a", sleeper(0))
+        with pytest.raises(ValueError):
+            graph.add("a", sleeper(0))
+        with pytest.raises(ValueError):
+            graph.add("b", sleeper(0), deps=("missing",))
+
+
+class TestCriticalPath:
+    """Test critical path reporting."""
+
+    @pytest.mark.unit
+    async def test_follows_slowest_dependency(self):
+        graph = (
+            PipelineGraph()
+            .add("summary", sleeper(0.01))
+            .add("chart", sleeper(0.08), deps=("summary",))
+            .add("outline", sleeper(0.01), deps=("summary",))
+            .add("sections", sleeper(0.02), deps=("summary", "outline"))
+        )
+        await graph.run()
+        assert [t.name for t in graph.critical_path()] == ["summary", "chart"]
+        assert graph.describe_critical_path().startswith("summary ")
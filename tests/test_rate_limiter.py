@@ -0,0 +1,255 @@
+"""
+Rate Limiter Tests
+
+Tests for pacing outbound LLM calls:
+- Token bucket refill and multi-bucket acquisition
+- Settling token reservations and 429 backoff
+- Falling back to per-process buckets when Redis fails
+- Pacing and refunds in the council helper
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend import rate_limiter
+from backend.agents import utils as agent_utils
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    limits = {"groq": {"rpm": 60}, "llama-3.1-8b-instant": {"rpm": 30, "tpm": 600}}
+    return rate_limiter.RateLimiter(limits=limits, enabled=True, use_redis=False, clock=clock)
+
+
+@pytest.fixture
+def sleeps(monkeypatch, clock):
+    """Replaces asyncio.sleep in the limiter with one that advances the fake clock."""
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda a, b: 0.0)
+    return slept
+
+
+MODEL = "llama-3.1-8b-instant"
+
+
+class TestBuckets:
+    """Test token bucket arithmetic."""
+
+    @pytest.mark.unit
+    def test_burst_then_refill(self, limiter, clock):
+        for _ in range(30):
+            assert limiter._try_acquire(MODEL, 0) == 0
+        assert limiter._try_acquire(MODEL, 0) == pytest.approx(2.0)
+        clock.now += 2.0
+        assert limiter._try_acquire(MODEL, 0) == 0
+
+    @pytest.mark.unit
+    def test_all_buckets_or_none(self, limiter, clock):
+        assert limiter._try_acquire(MODEL, 500) == 0
+        # The token bucket is short, so the request buckets must not be charged either
+        assert limiter._try_acquire(MODEL, 500) == pytest.approx(40.0)
+        for _ in range(29):
+            assert limiter._try_acquire(MODEL, 0) == 0
+
+    @pytest.mark.unit
+    def test_provider_bucket_shared_across_models(self, clock):
+        limiter = rate_limiter.RateLimiter(limits={"groq": {"rpm": 2}}, enabled=True, use_redis=False, clock=clock)
+        assert limiter._try_acquire("llama-a", 0) == 0
+        assert limiter._try_acquire("llama-b", 0) == 0
+        assert limiter._try_acquire("llama-c", 0) > 0
+        assert limiter._try_acquire("google/gemini", 0) == 0
+
+    @pytest.mark.unit
+    def test_free_models_scope(self):
+        assert rate_limiter.provider_scope("google/gemma-3-27b-it:free") == "openrouter-free"
+        assert rate_limiter.provider_scope("google/gemini-2.0-flash-001") == "openrouter"
+        assert rate_limiter.provider_scope(MODEL) == "groq"
+
+    @pytest.mark.unit
+    def test_oversized_request_capped_at_capacity(self, limiter):
+        assert limiter._try_acquire(MODEL, 10_000) == 0
+
+    @pytest.mark.unit
+    def test_limits_env_override(self, monkeypatch):
+        monkeypatch.setenv("LLM_RATE_LIMITS", '{"openrouter-free": {"rpm": 5}}')
+        assert rate_limiter._load_limits()["openrouter-free"] == {"rpm": 5}
+        monkeypatch.setenv("LLM_RATE_LIMITS", "not json")
+        assert rate_limiter._load_limits()["openrouter-free"] == rate_limiter.DEFAULT_LIMITS["openrouter-free"]
+
+
+class TestSettleAndBackoff:
+    """Test reservation settlement and 429 handling."""
+
+    @pytest.mark.unit
+    def test_settle_refunds_unused_tokens(self, limiter):
+        assert limiter._try_acquire(MODEL, 600) == 0
+        limiter.settle(MODEL, 600, {"usage": {"prompt_tokens": 100, "completion_tokens": 100}})
+        assert limiter._try_acquire(MODEL, 400) == 0
+        assert limiter._try_acquire(MODEL, 1) > 0
+
+    @pytest.mark.unit
+    def test_settle_without_usage_keeps_reservation(self, limiter):
+        assert limiter._try_acquire(MODEL, 600) == 0
+        limiter.settle(MODEL, 600, {})
+        assert limiter._try_acquire(MODEL, 10) > 0
+
+    @pytest.mark.unit
+    def test_penalize_holds_requests_for_retry_after(self, limiter, clock):
+        limiter.penalize(MODEL, 10)
+        assert limiter._try_acquire(MODEL, 0) == pytest.approx(10.0)
+        clock.now += 10
+        assert limiter._try_acquire(MODEL, 0) == 0
+
+    @pytest.mark.unit
+    def test_refund_returns_reservation(self, limiter):
+        assert limiter._try_acquire(MODEL, 600) == 0
+        limiter.refund(MODEL, 600)
+        assert limiter._try_acquire(MODEL, 600) == 0
+
+    @pytest.mark.unit
+    def test_redis_updates_run_off_the_event_loop(self, clock):
+        threads = []
+
+        def script(keys, args):
+            threads.append(threading.get_ident())
+            return "0"
+
+        limiter = rate_limiter.RateLimiter(limits={"groq": {"tpm": 600}}, enabled=True, use_redis=True, clock=clock)
+        limiter._redis = object()
+        limiter._scripts = {"acquire": script, "adjust": script}
+
+        async def run():
+            await limiter.acquire(MODEL, 100)
+            await limiter.asettle(MODEL, 100, {"usage": {"total_tokens": 50}})
+            await limiter.arefund(MODEL, 100)
+            await limiter.apenalize(MODEL, 1.0)
+
+        asyncio.run(run())
+        assert len(threads) == 3 and threading.get_ident() not in threads
+
+    @pytest.mark.unit
+    def test_retry_after_header(self):
+        class Response:
+            headers = {"retry-after": "7"}
+
+        assert rate_limiter.retry_after(Response()) == 7.0
+        assert rate_limiter.retry_after(object(), 3.0) == 3.0
+
+    @pytest.mark.unit
+    def test_backoff_sleeps_when_disabled(self, sleeps):
+        disabled = rate_limiter.RateLimiter(limits={}, enabled=False, use_redis=False)
+        asyncio.run(disabled.backoff(MODEL, 4.0))
+        assert sleeps == [4.0]
+
+
+class TestAcquire:
+    """Test waiting for quota."""
+
+    @pytest.mark.unit
+    def test_waits_for_refill(self, limiter, sleeps):
+        async def run():
+            for _ in range(31):
+                await limiter.acquire(MODEL)
+
+        asyncio.run(run())
+        assert sleeps == [pytest.approx(2.0)]
+
+    @pytest.mark.unit
+    def test_gives_up_after_max_wait(self, limiter, sleeps, caplog):
+        limiter.penalize(MODEL, 300)
+        waited = asyncio.run(limiter.acquire(MODEL, max_wait=60))
+        assert waited == 0 and sleeps == []
+        assert "still throttled" in caplog.text
+
+    @pytest.mark.unit
+    def test_redis_errors_fall_back_to_local(self, clock):
+        def broken_script(keys, args):
+            raise ConnectionError("redis down")
+
+        limiter = rate_limiter.RateLimiter(limits={"groq": {"rpm": 1}}, enabled=True, use_redis=True, clock=clock)
+        limiter._redis = object()
+        limiter._scripts = {"acquire": broken_script, "adjust": broken_script}
+        assert limiter._try_acquire(MODEL, 0) == 0
+        assert limiter._get_redis() is None
+        assert limiter._try_acquire(MODEL, 0) > 0
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.headers = headers or {}
+
+    def json(self):
+        return self._body
+
+
+class TestPacedCalls:
+    """Test the limiter in the council helper."""
+
+    @pytest.mark.unit
+    def test_council_waits_out_retry_after(self, monkeypatch, limiter, sleeps):
+        responses = [
+            FakeResponse(429, headers={"retry-after": "5"}),
+            FakeResponse(200, {"choices": [{"message": {"content": "draft"}}]}),
+        ]
+
+        class FakeAsyncClient:
+            async def post(self, url, headers, json, timeout):
+                return responses.pop(0)
+
+        monkeypatch.setenv("GROQ_API_KEY", "test")
+        monkeypatch.setattr(agent_utils.http_client, "get_async_client", lambda url: FakeAsyncClient())
+        monkeypatch.setattr(agent_utils, "limiter", limiter)
+        result = asyncio.run(agent_utils.call_model_async(MODEL, "sys", "prompt", use_cache=False))
+        assert result == "draft"
+        assert sleeps == [pytest.approx(5.0)]
+
+    @pytest.mark.unit
+    def test_failed_and_cancelled_calls_refund_tokens(self, monkeypatch, limiter, sleeps):
+        class FailingClient:
+            async def post(self, url, headers, json, timeout):
+                raise RuntimeError("down")
+
+        class HangingClient:
+            async def post(self, url, headers, json, timeout):
+                await asyncio.Event().wait()
+
+        async def cancelled_call():
+            task = asyncio.ensure_future(agent_utils.call_model_async(MODEL, "sys", "prompt", use_cache=False))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        monkeypatch.setenv("GROQ_API_KEY", "test")
+        monkeypatch.setattr(agent_utils, "limiter", limiter)
+        monkeypatch.setattr(agent_utils.http_client, "get_async_client", lambda url: FailingClient())
+        assert asyncio.run(agent_utils.call_model_async(MODEL, "sys", "prompt", use_cache=False)).startswith("[Agent Failure")
+        # Only the pauses between attempts: no attempt had to wait for tokens
+        assert sleeps == [2, 2, 2]
+        monkeypatch.setattr(agent_utils.http_client, "get_async_client", lambda url: HangingClient())
+        asyncio.run(cancelled_call())
+        # The cancelled call's reservation is back as well
+        assert limiter._try_acquire(MODEL, 600) == 0
@@ -0,0 +1,86 @@
+"""
+Search Client Tests
+
+Tests for the shared Tavily search layer:
+- Query normalization
+- Result caching
+- In-flight request deduplication
+"""
+
+import asyncio
+
+import pytest
+from backend import search, AI_engine
+from backend.agents import tools
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, query):
+        self._query = query
+
+    def json(self):
+        return {"results": [
+            {"title": f"{self._query} {i}", "url": f"https://example.com/{i}", "content": "snippet"}
+            for i in range(5)
+        ]}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Count Tavily calls made through the pooled clients."""
+    calls = []
+
+    class FakeAsyncClient:
+        async def post(self, url, json, timeout):
+            calls.append(json["query"])
+            await asyncio.sleep(0.05)
+            return FakeResponse(json["query"])
+
+    monkeypatch.setattr(search.http_client, "get_async_client", lambda url: FakeAsyncClient())
+    search.search_cache.clear()
+    yield calls
+    search.search_cache.clear()
+
+
+class TestNormalization:
+    """Test query normalization."""
+
+    @pytest.mark.unit
+    def test_equivalent_queries_normalize_equally(self):
+        assert search.normalize_query('  "Quantum  Computing" trends? ') == "quantum computing trends"
+        assert search.normalize_query("quantum computing trends") == "quantum computing trends"
+
+
+class TestSearchCache:
+    """Test caching and deduplication."""
+
+    @pytest.mark.unit
+    def test_repeat_query_served_from_cache(self, upstream):
+        first = asyncio.run(AI_engine.get_search_results_async("Solar power adoption"))
+        second = asyncio.run(AI_engine.get_search_results_async("solar power adoption."))
+        assert first == second
+        assert len(upstream) == 1
+
+    @pytest.mark.unit
+    async def test_report_and_council_share_cache(self, upstream):
+        await AI_engine.get_search_results_async("fusion energy")
+        result = await tools.perform_web_search("Fusion Energy", max_results=1)
+        assert "SOURCE [1]" in result and "SOURCE [2]" not in result
+        assert len(upstream) == 1
+
+    @pytest.mark.unit
+    async def test_concurrent_async_requests_merged(self, upstream):
+        results = await asyncio.gather(*[
+            search.tavily_search_async("Battery Recycling", max_results=n) for n in (1, 2, 3)
+        ])
+        assert [len(r) for r in results] == [1, 2, 3]
+        assert len(upstream) == 1
+
+    @pytest.mark.unit
+    def test_errors_not_cached(self, monkeypatch, upstream):
+        monkeypatch.delenv("SERP_KEY", raising=False)
+        assert asyncio.run(AI_engine.get_search_results_async("anything")) == "Error: SERP_KEY not set."
+        assert len(search.search_cache) == 0
@@ -0,0 +1,148 @@
+"""
+Full-Text Search Index Tests
+
+Tests for server-side search over reports, hooks and chat messages:
+- Index maintenance on insert, update and delete
+- Ranking, kind filters and snippets
+- Pagination
+- Lookup latency on a large index
+"""
+
+import time
+
+import pytest
+from sqlalchemy import text
+
+from backend import database, search_index
+from backend.database import ChatMessage, Hook
+
+
+def search(query, **kwargs):
+    hits, _ = database.search_documents(query, **kwargs)
+    return hits
+
+
+class TestIndexMaintenance:
+    """Test that the index follows inserts, updates and deletes."""
+
+    @pytest.mark.unit
+    def test_new_rows_are_searchable(self, test_db, sample_session):
+        database.save_report("Photosynthesis", "Chlorophyll absorbs light in the thylakoid.")
+        database.save_hook("Remember the thylakoid membrane figure")
+        database.save_chat_messages(sample_session.id, [("user", "What is a thylakoid?")])
+        assert sorted(h.kind for h in search("thylakoid")) == ["hook", "message", "report"]
+
+    @pytest.mark.unit
+    def test_report_edit_reindexes(self, test_db, sample_report):
+        assert search("test")
+        database.update_report_content(sample_report.id, "# Rewritten\n\nNow about glaciers.")
+        assert [h.ref_id for h in search("glaciers")] == [sample_report.id]
+        assert "glaciers" in search("test", kinds=["report"])[0].snippet
+
+    @pytest.mark.unit
+    def test_deletes_remove_documents(self, test_db, sample_report, sample_hook, sample_messages):
+        database.delete_report(sample_report.id)
+        database.delete_hook(sample_hook.id)
+        database.delete_chat_session(sample_messages[0].session_id)
+        count = test_db.execute(text("SELECT count(*) FROM search_fts")).scalar()
+        assert count == 0
+
+    @pytest.mark.unit
+    def test_delete_all_reports_clears_kind(self, test_db, sample_report, sample_hook):
+        database.delete_all_reports()
+        assert [h.kind for h in search("research")] == ["hook"]
+
+    @pytest.mark.unit
+    def test_rebuild_indexes_existing_rows(self, test_db, sample_report, sample_hook):
+        connection = test_db.connection()
+        search_index.drop(connection)
+        search_index.create(connection)
+        assert search("test") == []
+        database.rebuild_search_index(connection)
+        assert {h.kind for h in search("test")} == {"report", "hook"}
+
+
+class TestSearchResults:
+    """Test ranking, filters and snippets."""
+
+    @pytest.mark.unit
+    def test_title_match_ranks_first(self, test_db):
+        database.save_report("Volcanoes", "Magma chambers and eruptions.")
+        database.save_report("Geology overview", "Brief mention of volcanoes among other landforms.")
+        assert [h.title for h in search("volcanoes")][0] == "Volcanoes"
+
+    @pytest.mark.unit
+    def test_kind_filter_and_session_title(self, test_db, sample_session):
+        database.save_hook("Enzyme kinetics note")
+        database.save_chat_messages(sample_session.id, [("user", "Explain enzyme kinetics")])
+        hits = search("enzyme", kinds=["message"])
+        assert len(hits) == 1
+        assert hits[0].parent_id == sample_session.id and hits[0].title == "Test Session"
+
+    @pytest.mark.unit
+    def test_prefix_and_stemming(self, test_db):
+        database.save_hook("Running experiments on mitochondria")
+        assert search("mitochon")
+        assert search("run experiment")
+
+    @pytest.mark.unit
+    def test_snippet_is_escaped_and_marked(self, test_db):
+        test_db.add(Hook(content="<script>alert(1)</script> oxidation states"))
+        test_db.commit()
+        snippet = search("oxidation")[0].snippet
+        assert "<script>" not in snippet and "&lt;script&gt;" in snippet
+        assert "<mark>oxidation</mark>" in snippet
+
+    @pytest.mark.unit
+    def test_query_syntax_is_neutralised(self, test_db, sample_hook):
+        assert search('"research (notes:') != []
+        assert search("*** ::") == []
+
+
+class TestSearchPagination:
+    """Test offset cursors over ranked hits."""
+
+    @pytest.mark.unit
+    def test_pages_cover_all_hits(self, test_db, sample_session):
+        test_db.add_all([ChatMessage(session_id=sample_session.id, role="user", content=f"plankton sample {i}") for i in range(25)])
+        test_db.commit()
+        seen, cursor = [], None
+        while True:
+            hits, cursor = database.search_documents("plankton", limit=10, cursor=cursor)
+            seen.extend(h.ref_id for h in hits)
+            if not cursor:
+                break
+        assert len(seen) == 25 and len(set(seen)) == 25
+
+    @pytest.mark.unit
+    def test_invalid_cursor(self, test_db):
+        with pytest.raises(database.InvalidCursor):
+            database.search_documents("x", cursor="abc")
+        with pytest.raises(database.InvalidCursor):
+            database.search_documents("x", cursor=str(database.MAX_SEARCH_OFFSET + 1))
+
+
+class TestSearchLatency:
+    """Benchmark lookups on a large index."""
+
+    @pytest.mark.slow
+    def test_lookup_stays_fast_at_100k_documents(self, test_db):
+        words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "theta", "kappa", "lambda", "sigma"]
+        rows = [
+            {
+                "rowid": search_index._rowid("message", i), "title": None, "kind": "message", "ref_id": i, "parent_id": None,
+                "body": f"{words[i % 10]} {words[(i // 10) % 10]} {words[(i // 100) % 10]} document number {i}",
+            }
+            for i in range(1, 100_001)
+        ]
+        test_db.execute(text(
+            "INSERT INTO search_fts (rowid, title, body, kind, ref_id, parent_id) "
+            "VALUES (:rowid, :title, :body, :kind, :ref_id, :parent_id)"
+        ), rows)
+
+        search("alpha beta")  # warm up
+        started = time.perf_counter()
+        hits = search("gamma kappa sigma")
+        elapsed = time.perf_counter() - started
+        assert len(hits) == 20
+        assert elapsed < 0.25, f"search took {elapsed * 1000:.0f} ms"
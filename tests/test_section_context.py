@@ -0,0 +1,93 @@
+"""
+Section Context Selection Tests
+
+Tests for per-section context built from the summary and web sources:
+- Passage splitting
+- BM25 scoring
+- Budgeted, section-specific selection
+"""
+
+import pytest
+
+from backend import section_context
+
+
+THEMES = {
+    "solar": "Solar capacity grew 24% in 2023. Photovoltaic module prices fell below $0.20 per watt. ",
+    "wind": "Offshore wind turbines reached 15 MW. Wind farm capacity factors exceed 45% in the North Sea. ",
+    "grid": "Grid storage batteries smooth demand peaks. Lithium iron phosphate dominates grid storage. ",
+}
+SUMMARY = "\n\n".join(f"## {name.title()}\n{text * 6}" for name, text in THEMES.items())
+SOURCES = (
+    "--- VERIFIED SOURCES ---\n"
+    "SOURCE [1]\nTitle: Wind Outlook\nURL: https://example.com/wind\nSummary: Offshore wind auctions doubled.\n\n"
+    "SOURCE [2]\nTitle: Solar Report\nURL: https://example.com/solar\nSummary: Photovoltaic installs hit records.\n\n"
+)
+
+
+class TestSplitPassages:
+    """Test passage boundaries."""
+
+    @pytest.mark.unit
+    def test_sources_stay_whole_without_header(self):
+        passages = section_context.split_passages(SOURCES)
+        assert len(passages) == 2
+        assert passages[0].startswith("SOURCE [1]") and passages[0].endswith("auctions doubled.")
+
+    @pytest.mark.unit
+    def test_summary_chunked_on_paragraphs(self):
+        passages = section_context.split_passages(SUMMARY)
+        assert all(len(p) <= section_context.PASSAGE_CHARS for p in passages)
+        assert passages[0].startswith("## Solar")
+
+
+class TestBM25:
+    """Test passage scoring."""
+
+    @pytest.mark.unit
+    def test_matching_passage_scores_highest(self):
+        passages = ["offshore wind turbines", "solar photovoltaic modules", "grid storage batteries"]
+        scores = section_context.BM25(passages).scores({"wind": 1.0, "offshore": 1.0})
+        assert scores[0] > 0 and scores[1] == scores[2] == 0
+
+    @pytest.mark.unit
+    def test_rare_terms_outweigh_common_ones(self):
+        passages = ["energy wind", "energy solar", "energy grid"]
+        scores = section_context.BM25(passages).scores({"energy": 1.0, "solar": 1.0})
+        assert scores[1] > scores[0] > 0
+
+    @pytest.mark.unit
+    def test_section_numbering_ignored(self):
+        weights = section_context.query_weights("3. Offshore Wind", "renewable energy")
+        assert "3" not in weights and weights["wind"] == 1.0 and weights["energy"] == section_context.TOPIC_WEIGHT
+
+
+class TestBuildContexts:
+    """Test section-specific contexts."""
+
+    @pytest.mark.unit
+    def test_sections_lead_with_their_own_theme(self):
+        outline = ["1. Solar Photovoltaic Costs", "2. Offshore Wind Growth"]
+        contexts = section_context.build_contexts(outline, "renewable energy", SUMMARY, SOURCES, max_chars=1200)
+        solar, wind = contexts[outline[0]], contexts[outline[1]]
+        assert solar.startswith("## Solar") and "Offshore" not in solar
+        assert [p.split("\n")[0] for p in wind.split("\n\n")[:2]] == ["## Wind", "SOURCE [1]"]
+        assert all(len(c) <= 1200 for c in contexts.values())
+
+    @pytest.mark.unit
+    def test_small_material_passed_whole(self):
+        contexts = section_context.build_contexts(["1. Intro", "2. Outlook"], "energy", "short summary", SOURCES)
+        assert set(contexts.values()) == {"short summary\n\n" + "\n\n".join(section_context.split_passages(SOURCES))}
+
+    @pytest.mark.unit
+    def test_skipped_search_and_excerpts(self):
+        outline = ["1. Intro", "2. Outlook"]
+        contexts = section_context.build_contexts(
+            outline, "energy", "short summary", "[Web Search Skipped]", excerpts=["--- RELEVANT EXCERPTS ---\nx", ""]
+        )
+        assert contexts == {"1. Intro": "short summary\n\n--- RELEVANT EXCERPTS ---\nx", "2. Outlook": "short summary"}
+
+    @pytest.mark.unit
+    def test_unmatched_section_falls_back_to_leading_passages(self):
+        contexts = section_context.build_contexts(["9. Conclusion"], "", SUMMARY, max_chars=700)
+        assert contexts["9. Conclusion"].startswith("## Solar")